@@ -1,8 +1,25 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, send_file, stream_with_context
 from flask_login import login_required, current_user
-from database.models import db, User, Student, Teacher, Group, Subject, Course, Attendance, Grade, BehaviorRecord
-from datetime import datetime, timedelta
+from database.models import db, Student, Group, Course, Grade, BehaviorRecord, Job
+from datetime import datetime
 import json
+import os
+
+from database.loading import load_profile
+from services.attendance import upsert_attendance
+from services.exports import EXPORTS, MIMETYPES as EXPORT_MIMETYPES, export_chunks, gzip_chunks
+from services.grades import upsert_grades, validate_grades
+from services.jobs import can_view, enqueue, job_status
+from services.pagination import keyset_page, page_size
+from services.printing import print_student_ids, print_title, render_transcripts
+from services.principal import current_principal
+from services.report_cache import (
+    cached_attendance_summary, cached_transcripts, invalidate_attendance, invalidate_transcripts, mark_response
+)
+from services.search import search_student_ids, load_ranked
+from services.stats import dashboard_statistics_for, invalidate_statistics
+from services.student_import import import_students
+from services.transcripts import load_students, rank_cohort
 
 api = Blueprint('api', __name__, url_prefix='/api')
 
@@ -13,37 +30,47 @@ def search_students():
     query = request.args.get('q', '').strip()
     group_id = request.args.get('group_id')
     course = request.args.get('course')
-    limit = min(int(request.args.get('limit', 20)), 100)
-    
-    students_query = Student.query.join(User).join(Group)
+    try:
+        limit = page_size(request.args.get('limit'), default=20, maximum=100)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     
-    # Фильтр аз рӯи ҷустуҷӯ
-    if query:
-        students_query = students_query.filter(
-            db.or_(
-                User.first_name.ilike(f'%{query}%'),
-                User.last_name.ilike(f'%{query}%'),
-                Student.student_id.ilike(f'%{query}%')
-            )
-        )
+    students_query = Student.query.join(Student.user).join(Group).options(*load_profile('student_card_joined'))
+    groups_query = db.session.query(Group.id)
     
     # Фильтр аз рӯи гуруҳ
     if group_id:
         students_query = students_query.filter(Student.group_id == group_id)
+        groups_query = groups_query.filter(Group.id == group_id)
     
     # Фильтр аз рӯи курс
     if course:
         students_query = students_query.filter(Group.course_number == course)
+        groups_query = groups_query.filter(Group.course_number == course)
     
     # Маҳдудият дастрасӣ барои муаллим
-    if current_user.role == 'teacher':
-        teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-        if teacher:
-            course_groups = Course.query.filter_by(teacher_id=teacher.id).with_entities(Course.group_id).distinct()
-            group_ids = [cg.group_id for cg in course_groups]
-            students_query = students_query.filter(Student.group_id.in_(group_ids))
+    principal = current_principal()
+    if principal.role == 'teacher' and principal.teacher_id:
+        group_ids = list(principal.group_ids)
+        students_query = students_query.filter(Student.group_id.in_(group_ids))
+        groups_query = groups_query.filter(Group.id.in_(group_ids))
     
-    students = students_query.limit(limit).all()
+    # Ҷустуҷӯ тавассути индекси n-грамма (бо тартиби аҳамият)
+    if query:
+        scope = None
+        if group_id or course:
+            scope = {row.id for row in groups_query}
+        elif principal.role == 'teacher' and principal.teacher_id:
+            scope = principal.group_ids
+        ids = search_student_ids(query, group_ids=scope, limit=limit)
+        students = load_ranked(students_query, ids)
+        next_cursor = None
+    else:
+        # Рӯйхат бе ҷустуҷӯ: саҳифаҳои keyset аз рӯи Student.id
+        try:
+            students, next_cursor = keyset_page(students_query, Student.id, request.args.get('cursor'), limit)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Курсори нодуруст'}), 400
     
     result = []
     for student in students:
@@ -59,9 +86,31 @@ def search_students():
     return jsonify({
         'success': True,
         'data': result,
-        'count': len(result)
+        'count': len(result),
+        'next_cursor': next_cursor
     })
 
+@api.route('/students/import', methods=['POST'])
+@login_required
+def import_students_file():
+    """Воридоти оммавии донишҷӯён аз CSV/XLSX (?dry_run=1 - танҳо санҷиш)"""
+    if current_user.role not in ['dean', 'vice_dean']:
+        return jsonify({'success': False, 'error': 'Дастрасӣ рад карда шуд'}), 403
+    
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({'success': False, 'error': 'Файл интихоб нашудааст'}), 400
+    
+    dry_run = request.values.get('dry_run', '').lower() in ('1', 'true', 'yes')
+    
+    try:
+        report = import_students(upload.stream, upload.filename, dry_run=dry_run)
+    except (ValueError, UnicodeDecodeError) as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    return jsonify({'success': True, **report})
+
 @api.route('/attendance/bulk_save', methods=['POST'])
 @login_required
 def bulk_save_attendance():
@@ -86,47 +135,22 @@ def bulk_save_attendance():
         
         # Текшириши дастрасӣ барои муаллим
         if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-            if not teacher or course.teacher_id != teacher.id:
+            if not current_principal().teaches(course):
                 return jsonify({'success': False, 'error': 'Дастрасӣ рад карда шуд'}), 403
         
-        saved_count = 0
-        for item in attendance_data:
-            student_id = item.get('student_id')
-            status = item.get('status', 'absent')
-            activity_score = item.get('activity_score')
-            comments = item.get('comments', '')
-            
-            # Ёфтан ё сохтани сабти ҳузур
-            attendance = Attendance.query.filter_by(
-                course_id=course_id,
-                student_id=student_id,
-                date=date
-            ).first()
-            
-            if not attendance:
-                attendance = Attendance(
-                    course_id=course_id,
-                    student_id=student_id,
-                    date=date,
-                    created_by=current_user.id
-                )
-            
-            # Текшириши имкони таҳрир
-            if attendance.can_edit(current_user):
-                attendance.status = status
-                attendance.activity_score = float(activity_score) if activity_score else None
-                attendance.comments = comments
-                
-                db.session.add(attendance)
-                saved_count += 1
+        result = upsert_attendance(course_id, date, attendance_data, current_user)
+        invalidate_attendance(course, date, result['saved'])
+        saved_count = len(result['saved'])
         
         db.session.commit()
+        invalidate_statistics('attendance')
         
         return jsonify({
             'success': True,
             'message': f'{saved_count} сабти ҳузур нигоҳ дошта шуд',
-            'saved_count': saved_count
+            'saved_count': saved_count,
+            'rejected_count': len(result['rejected']),
+            'rejected': result['rejected']
         })
         
     except Exception as e:
@@ -158,8 +182,7 @@ def save_grade():
         
         # Текшириши дастрасӣ барои муаллим
         if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-            if not teacher or course.teacher_id != teacher.id:
+            if not current_principal().teaches(course):
                 return jsonify({'success': False, 'error': 'Дастрасӣ рад карда шуд'}), 403
         
         # Ёфтан ё сохтани баҳо
@@ -184,6 +207,7 @@ def save_grade():
             grade.date_taken = datetime.now().date()
             
             db.session.add(grade)
+            invalidate_transcripts(course.group_id, [grade.student_id])
             db.session.commit()
             
             return jsonify({
@@ -200,6 +224,55 @@ def save_grade():
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@api.route('/grades/bulk_save', methods=['POST'])
+@login_required
+def bulk_save_grades():
+    """Сабти якбораи баҳоҳои як навъ барои рӯйхати гуруҳ"""
+    if current_user.role not in ['teacher', 'vice_dean', 'dean']:
+        return jsonify({'success': False, 'error': 'Дастрасӣ рад карда шуд'}), 403
+    
+    data = request.get_json()
+    course_id = data.get('course_id')
+    grade_type = data.get('grade_type')
+    grades_data = data.get('grades', [])
+    
+    if not all([course_id, grade_type, grades_data]) or not isinstance(grades_data, list):
+        return jsonify({'success': False, 'error': 'Маълумоти ноқис'}), 400
+    
+    try:
+        course = Course.query.get(course_id)
+        
+        if not course:
+            return jsonify({'success': False, 'error': 'Дарс ёфт нашуд'}), 404
+        
+        # Текшириши дастрасӣ барои муаллим
+        if current_user.role == 'teacher':
+            if not current_principal().teaches(course):
+                return jsonify({'success': False, 'error': 'Дастрасӣ рад карда шуд'}), 403
+        
+        by_student, errors = validate_grades(course, grade_type, grades_data)
+        if errors:
+            return jsonify({'success': False, 'error': 'Маълумоти нодуруст', 'errors': errors}), 400
+        
+        result = upsert_grades(course, grade_type, by_student, current_user)
+        invalidate_transcripts(course.group_id, result['saved'])
+        saved_count = len(result['saved'])
+        
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'message': f'{saved_count} баҳо сабт карда шуд',
+            'saved_count': saved_count,
+            'rejected_count': len(result['rejected']),
+            'saved': result['saved'],
+            'rejected': result['rejected']
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @api.route('/behavior/save', methods=['POST'])
 @login_required
 def save_behavior():
@@ -245,72 +318,57 @@ def save_behavior():
 @login_required
 def dashboard_statistics():
     """Статистика барои dashboard"""
-    stats = {}
-    
-    if current_user.role in ['dean', 'vice_dean']:
-        # Умумӣ статистика
-        stats['total_students'] = Student.query.filter_by(status='active').count()
-        stats['total_teachers'] = Teacher.query.count()
-        stats['total_groups'] = Group.query.filter_by(is_active=True).count()
-        stats['total_subjects'] = Subject.query.filter_by(is_active=True).count()
-        
-        # Статистикаи ҳузур (ҳафтаи охир)
-        week_ago = datetime.now().date() - timedelta(days=7)
-        total_attendance = Attendance.query.filter(Attendance.date >= week_ago).count()
-        present_count = Attendance.query.filter(
-            Attendance.date >= week_ago,
-            Attendance.status == 'present'
-        ).count()
-        
-        stats['attendance_rate'] = (present_count / total_attendance * 100) if total_attendance > 0 else 0
-        
-        # Статистикаи курсҳо
-        stats['courses_by_year'] = {}
-        for i in range(1, 5):
-            count = Group.query.filter_by(course_number=i, is_active=True).count()
-            stats['courses_by_year'][f'course_{i}'] = count
-    
-    elif current_user.role == 'teacher':
-        teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-        if teacher:
-            # Дарсҳои муаллим
-            my_courses = Course.query.filter_by(teacher_id=teacher.id, is_active=True).all()
-            stats['my_courses_count'] = len(my_courses)
-            
-            # Донишҷӯёни ман
-            group_ids = [course.group_id for course in my_courses]
-            stats['my_students_count'] = Student.query.filter(
-                Student.group_id.in_(group_ids),
-                Student.status == 'active'
-            ).count() if group_ids else 0
-    
-    elif current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.id).first()
-        if student:
-            # Маълумоти донишҷӯ
-            stats['my_group'] = student.group.name if student.group else ''
-            stats['my_course'] = student.group.course_number if student.group else 0
-            
-            # Ҳузури ман (моҳи охир)
-            month_ago = datetime.now().date() - timedelta(days=30)
-            my_attendance = Attendance.query.filter(
-                Attendance.student_id == student.id,
-                Attendance.date >= month_ago
-            ).count()
-            
-            my_present = Attendance.query.filter(
-                Attendance.student_id == student.id,
-                Attendance.date >= month_ago,
-                Attendance.status == 'present'
-            ).count()
-            
-            stats['my_attendance_rate'] = (my_present / my_attendance * 100) if my_attendance > 0 else 0
+    stats = dashboard_statistics_for(current_principal())
     
     return jsonify({
         'success': True,
         'data': stats
     })
 
+@api.route('/exports/<kind>')
+@login_required
+def export_report(kind):
+    """Содироти ҳузур ё баҳоҳо ба CSV/XLSX бо ҷараён (бе нигоҳ доштан дар хотира)"""
+    if current_user.role not in ['dean', 'vice_dean', 'teacher']:
+        return jsonify({'success': False, 'error': 'Дастрасӣ рад карда шуд'}), 403
+    if kind not in EXPORTS:
+        return jsonify({'success': False, 'error': 'Содироти номаълум'}), 404
+    
+    file_format = request.args.get('format', 'csv')
+    if file_format not in EXPORT_MIMETYPES:
+        return jsonify({'success': False, 'error': 'Формат бояд csv ё xlsx бошад'}), 400
+    
+    group_ids = request.args.getlist('group_id', type=int)
+    group_ids += [int(g) for g in request.args.get('group_ids', '').split(',') if g.strip().isdigit()]
+    try:
+        start = datetime.strptime(request.args['start_date'], '%Y-%m-%d').date() \
+            if request.args.get('start_date') else None
+        end = datetime.strptime(request.args['end_date'], '%Y-%m-%d').date() \
+            if request.args.get('end_date') else None
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Санаи нодуруст'}), 400
+    
+    # Муаллим - танҳо дарсҳои худ
+    course_ids = None
+    if current_user.role == 'teacher':
+        course_ids = sorted(current_principal().course_ids)
+    
+    chunks = export_chunks(
+        kind, file_format, start=start, end=end, group_ids=group_ids,
+        course_number=request.args.get('course', type=int), course_ids=course_ids
+    )
+    headers = {
+        'Content-Disposition': f'attachment; filename={kind}.{file_format}',
+        'X-Accel-Buffering': 'no',
+        'Vary': 'Accept-Encoding'
+    }
+    # XLSX аллакай zip аст; CSV ҳангоми фиристодан фишурда мешавад
+    if file_format == 'csv' and 'gzip' in request.accept_encodings:
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    
+    return Response(stream_with_context(chunks), content_type=EXPORT_MIMETYPES[file_format], headers=headers)
+
 @api.route('/reports/attendance_summary')
 @login_required
 def attendance_summary_report():
@@ -318,51 +376,229 @@ def attendance_summary_report():
     if current_user.role not in ['dean', 'vice_dean', 'teacher']:
         return jsonify({'success': False, 'error': 'Дастрасӣ рад карда шуд'}), 403
     
-    group_id = request.args.get('group_id')
+    # Як ё якчанд гуруҳ: ?group_id=1&group_id=2 ё ?group_ids=1,2,3
+    group_ids = request.args.getlist('group_id', type=int)
+    group_ids += [int(g) for g in request.args.get('group_ids', '').split(',') if g.strip().isdigit()]
+    course = request.args.get('course', type=int)
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     
-    if not all([group_id, start_date, end_date]):
+    if not all([start_date, end_date]):
+        return jsonify({'success': False, 'error': 'Маълумоти ноқис'}), 400
+    
+    # Ҳисоботи тамоми факултет танҳо барои декан ва замдекан
+    if not group_ids and not course and current_user.role not in ['dean', 'vice_dean']:
         return jsonify({'success': False, 'error': 'Маълумоти ноқис'}), 400
     
     try:
         start = datetime.strptime(start_date, '%Y-%m-%d').date()
         end = datetime.strptime(end_date, '%Y-%m-%d').date()
         
-        students = Student.query.filter_by(group_id=group_id, status='active').all()
+        # ?async=1: кори фонӣ; натиҷа аз /api/jobs/<id>/result
+        if _async_requested(request.args.get('async')):
+            return _job_accepted(*enqueue('attendance_summary', {
+                'group_ids': sorted(set(group_ids)),
+                'course': course,
+                'start_date': start.isoformat(),
+                'end_date': end.isoformat()
+            }, current_user))
         
-        report_data = []
-        for student in students:
-            total_classes = Attendance.query.filter(
-                Attendance.student_id == student.id,
-                Attendance.date.between(start, end)
-            ).count()
-            
-            present_classes = Attendance.query.filter(
-                Attendance.student_id == student.id,
-                Attendance.date.between(start, end),
-                Attendance.status == 'present'
-            ).count()
-            
-            attendance_rate = (present_classes / total_classes * 100) if total_classes > 0 else 0
-            
-            report_data.append({
-                'student_id': student.student_id,
-                'full_name': student.user.full_name,
-                'total_classes': total_classes,
-                'present_classes': present_classes,
-                'absent_classes': total_classes - present_classes,
-                'attendance_rate': round(attendance_rate, 2)
-            })
+        report_data, groups, etag, hit = cached_attendance_summary(
+            start, end, group_ids=group_ids, course_number=course, user=current_user
+        )
         
-        return jsonify({
+        return mark_response(jsonify({
             'success': True,
             'data': report_data,
+            'groups': groups,
             'period': {
                 'start_date': start_date,
                 'end_date': end_date
             }
+        }), hit, etag)
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@api.route('/reports/transcripts/generate', methods=['POST'])
+@login_required
+def generate_transcripts():
+    """Тайёр ва нигоҳ доштани транскриптҳо барои гуруҳ, курс ё рӯйхати донишҷӯён"""
+    if current_user.role not in ['dean', 'vice_dean']:
+        return jsonify({'success': False, 'error': 'Дастрасӣ рад карда шуд'}), 403
+    
+    data = request.get_json() or {}
+    group_id = data.get('group_id')
+    course = data.get('course')
+    student_ids = data.get('student_ids')
+    
+    if not group_id and not course and not student_ids:
+        return jsonify({'success': False, 'error': 'Маълумоти ноқис'}), 400
+    
+    try:
+        # "async": true - кори фонӣ (курси пурра дар дархост ҷой намегирад)
+        if _async_requested(data.get('async')):
+            return _job_accepted(*enqueue('transcripts', {
+                'group_id': group_id,
+                'course': course,
+                'student_ids': sorted(set(student_ids)) if student_ids else None
+            }, current_user))
+        
+        students = load_students(student_ids=student_ids, group_id=group_id, course_number=course)
+        # Рақамҳо пеш аз commit-и кэш (commit объектҳоро кӯҳна мекунад)
+        codes = [(student.id, student.student_id) for student in students]
+        reports, hit = cached_transcripts(students, current_user)
+        
+        return mark_response(jsonify({
+            'success': True,
+            'message': f'{len(reports)} транскрипт тайёр карда шуд',
+            'data': [{
+                'id': student_id,
+                'student_id': code,
+                'total_credits': reports[student_id].data['total_credits'],
+                'total_gpa': reports[student_id].data['total_gpa']
+            } for student_id, code in codes]
+        }), hit)
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@api.route('/reports/transcripts/print')
+@login_required
+def print_transcripts():
+    """Ҳамаи транскриптҳои гуруҳ, курс ё рӯйхат дар як ҳуҷҷати чопӣ (HTML, ҷараёнӣ)
+
+    ?async=1 - файл дар кори фонӣ; ?async=1&format=pdf - PDF (PRINT_PDF_COMMAND).
+    """
+    if current_user.role not in ['dean', 'vice_dean']:
+        return jsonify({'success': False, 'error': 'Дастрасӣ рад карда шуд'}), 403
+    
+    group_id = request.args.get('group_id', type=int)
+    course = request.args.get('course', type=int)
+    student_ids = [int(s) for s in request.args.get('student_ids', '').split(',') if s.strip().isdigit()]
+    output_format = request.args.get('format', 'html')
+    
+    if not group_id and not course and not student_ids:
+        return jsonify({'success': False, 'error': 'Маълумоти ноқис'}), 400
+    if output_format not in ('html', 'pdf'):
+        return jsonify({'success': False, 'error': 'Шакли ҳуҷҷат нодуруст аст'}), 400
+    
+    if _async_requested(request.args.get('async')):
+        if output_format == 'pdf' and not current_app.config['PRINT_PDF_COMMAND']:
+            return jsonify({'success': False, 'error': 'Табдил ба PDF танзим нашудааст'}), 400
+        return _job_accepted(*enqueue('transcripts_print', {
+            'group_id': group_id,
+            'course': course,
+            'student_ids': sorted(set(student_ids)) or None,
+            'format': output_format
+        }, current_user))
+    
+    if output_format == 'pdf':
+        return jsonify({'success': False, 'error': 'PDF танҳо бо async=1'}), 400
+    
+    ids = print_student_ids(group_id, course, student_ids or None)
+    title = print_title(group_id, course)
+    response = Response(stream_with_context(render_transcripts(ids, title, user=current_user)),
+                        mimetype='text/html')
+    # Саҳифаҳо ҳангоми тайёр шудан фиристода мешаванд (бе буфери nginx)
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@api.route('/reports/transcripts/<int:student_id>')
+@login_required
+def stored_transcript(student_id):
+    """Транскрипти нигоҳдошташуда (дар сурати набудан - тайёр карда мешавад)"""
+    student = Student.query.get_or_404(student_id)
+    
+    # Текшириши дастрасӣ
+    if current_user.role == 'student':
+        if current_user.id != student.user_id:
+            return jsonify({'success': False, 'error': 'Дастрасӣ рад карда шуд'}), 403
+    elif current_user.role == 'parent':
+        if student.parent_id != current_user.id:
+            return jsonify({'success': False, 'error': 'Дастрасӣ рад карда шуд'}), 403
+    elif current_user.role not in ['dean', 'vice_dean', 'teacher']:
+        return jsonify({'success': False, 'error': 'Дастрасӣ рад карда шуд'}), 403
+    
+    try:
+        reports, hit = cached_transcripts([student], current_user)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    report = reports[student.id]
+    return mark_response(jsonify({
+        'success': True,
+        'data': report.data,
+        'generated_at': report.generated_at.isoformat()
+    }), hit, report.content_hash)
+
+@api.route('/reports/ranking')
+@login_required
+def cohort_ranking():
+    """Рейтинги донишҷӯён дар гуруҳ ё курс аз рӯи GPA"""
+    if current_user.role not in ['dean', 'vice_dean']:
+        return jsonify({'success': False, 'error': 'Дастрасӣ рад карда шуд'}), 403
+    
+    group_id = request.args.get('group_id', type=int)
+    course = request.args.get('course', type=int)
+    
+    if not group_id and not course:
+        return jsonify({'success': False, 'error': 'Маълумоти ноқис'}), 400
+    
+    try:
+        students = load_students(group_id=group_id, course_number=course)
+        ranking = rank_cohort(students)
+        
+        return jsonify({
+            'success': True,
+            'data': ranking,
+            'count': len(ranking)
         })
         
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def _async_requested(value):
+    return str(value or '').lower() in ('1', 'true', 'yes')
+
+def _job_accepted(job, created):
+    """202 бо рақами кор; дархостҳои якхела як корро мегиранд"""
+    response = jsonify({'success': True, 'created': created, **job_status(job),
+                        'status_url': f'/api/jobs/{job.id}', 'result_url': f'/api/jobs/{job.id}/result'})
+    response.status_code = 202
+    response.headers['Location'] = f'/api/jobs/{job.id}'
+    return response
+
+@api.route('/jobs/<int:job_id>')
+@login_required
+def job_progress(job_id):
+    """Ҳолат ва пешрафти кори фонӣ"""
+    job = Job.query.get_or_404(job_id)
+    if not can_view(job, current_user):
+        return jsonify({'success': False, 'error': 'Дастрасӣ рад карда шуд'}), 403
+    
+    return jsonify({'success': True, **job_status(job)})
+
+@api.route('/jobs/<int:job_id>/result')
+@login_required
+def job_result(job_id):
+    """Натиҷаи кори анҷомёфта ҳамчун файли JSON"""
+    job = Job.query.get_or_404(job_id)
+    if not can_view(job, current_user):
+        return jsonify({'success': False, 'error': 'Дастрасӣ рад карда шуд'}), 403
+    
+    if job.status != 'done':
+        return jsonify({'success': False, 'error': 'Натиҷа ҳанӯз тайёр нест', **job_status(job)}), 409
+    
+    if 'file' in job.result:
+        if not os.path.exists(job.result['file']):
+            return jsonify({'success': False, 'error': 'Файли натиҷа нест'}), 410
+        return send_file(job.result['file'], mimetype=job.result['mimetype'],
+                         as_attachment=True, download_name=job.result['filename'])
+    
+    response = jsonify({'success': True, **job.result})
+    response.headers['Content-Disposition'] = f'attachment; filename={job.job_type}-{job.id}.json'
+    return response
@@ -3,16 +3,47 @@ from flask_login import LoginManager, login_user, logout_user, login_required, c
 from werkzeug.security import generate_password_hash
 from datetime import datetime, timedelta
 import json
+import click
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 
 from config import Config
-from database.models import db, User, Student, Teacher, Group, Subject, Course, Attendance, Grade, BehaviorRecord, Report
+from database.models import db, User, Student, Group, Subject, Course, Attendance, BehaviorRecord, Report
+from database.loading import load_profile
+from database.partitions import ensure_attendance_partitions, detach_attendance_partitions, partition_existing_table
+from database.pool import engine_options, pool_status
+from services.attendance import upsert_attendance
+from services.jobs import expire_jobs, work
+from services.pagination import keyset_page, page_size, ranked_page
+from services.metrics import init_metrics
+from services.passwords import HashingBusy, hash_password, verify_password
+from services.report_cache import clear_reports, invalidate_attendance, invalidate_summaries
+from services.rollups import rebuild_rollups
+from services.principal import load_principal, current_principal, invalidate_principal
+from services.search import search_student_ids, load_ranked, rebuild_search_keys
+from services.stats import invalidate_statistics
+from services.student_import import import_students
+from services.transcripts import build_transcripts
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
     
     # Иницилизатсияи маълумоти
     db.init_app(app)
+    with app.app_context():
+        init_metrics(app, db.engine)
+        # Partition-ҳои моҳонаи attendance пешакӣ (танҳо PostgreSQL)
+        if db.engine.dialect.name == 'postgresql':
+            try:
+                ensure_attendance_partitions()
+            except SQLAlchemyError as e:
+                app.logger.warning('Partition-ҳои attendance сохта нашуданд: %s', e)
+    
+    # JSON API
+    from api.all import api
+    app.register_blueprint(api)
     
     # Танзимоти Login Manager
     login_manager = LoginManager()
@@ -22,7 +53,20 @@ def create_app():
     
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        # Корбар ва доираи дастрасӣ аз кэши principal (бе дархост дар ҳар саҳифа)
+        return load_principal(int(user_id))
+    
+    @app.route('/health')
+    def health():
+        """Ҳолати барнома ва pool-и пайвастҳо (барои мониторинг)"""
+        status = 'ok'
+        try:
+            db.session.execute(text('SELECT 1'))
+        except Exception:
+            status = 'database_unreachable'
+        finally:
+            db.session.rollback()
+        return jsonify({'status': status, 'pool': pool_status(db.engine)}), 200 if status == 'ok' else 503
     
     # Роутҳои асосӣ
     @app.route('/')
@@ -39,7 +83,16 @@ def create_app():
             
             user = User.query.filter_by(email=email, is_active=True).first()
             
-            if user and user.check_password(password):
+            try:
+                valid = user is not None and verify_password(user, password)
+            except HashingBusy:
+                flash('Сервер банд аст. Лутфан пас аз чанд сония аз нав кӯшиш кунед.', 'error')
+                return render_template('login.html'), 503, {'Retry-After': '1'}
+            
+            if valid:
+                # Hash-и нав (агар усули hash иваз шуда бошад); principal аз нав сохта мешавад
+                db.session.commit()
+                invalidate_principal(user.id)
                 login_user(user)
                 flash(f'Хуш омадед, {user.full_name}!', 'success')
                 return redirect(url_for('dashboard'))
@@ -51,6 +104,7 @@ def create_app():
     @app.route('/logout')
     @login_required
     def logout():
+        invalidate_principal(current_user.id)
         logout_user()
         flash('Шумо аз система баромадед.', 'info')
         return redirect(url_for('login'))
@@ -84,22 +138,38 @@ def create_app():
         group_id = request.args.get('group_id', '')
         course = request.args.get('course', '')
         
-        query = Student.query.join(User).join(Group)
-        
-        if search:
-            query = query.filter(
-                (User.first_name.contains(search)) |
-                (User.last_name.contains(search)) |
-                (Student.student_id.contains(search))
-            )
+        query = Student.query.join(Student.user).join(Group).options(*load_profile('student_card_joined'))
+        groups_query = db.session.query(Group.id)
         
         if group_id:
             query = query.filter(Student.group_id == group_id)
+            groups_query = groups_query.filter(Group.id == group_id)
         
         if course:
             query = query.filter(Group.course_number == course)
+            groups_query = groups_query.filter(Group.course_number == course)
+        
+        try:
+            limit = page_size(request.args.get('limit'))
+        except ValueError as e:
+            flash(str(e), 'error')
+            return redirect(url_for('students_list'))
         
-        students = query.all()
+        try:
+            if search:
+                # Саҳифаҳо аз рӯйхати рақамҳо бо тартиби аҳамият
+                scope = {row.id for row in groups_query} if group_id or course else None
+                ids, next_cursor = ranked_page(
+                    lambda count: search_student_ids(search, group_ids=scope, limit=count),
+                    request.args.get('cursor'), limit
+                )
+                students = load_ranked(query, ids)
+            else:
+                # Саҳифаҳои keyset аз рӯи Student.id
+                students, next_cursor = keyset_page(query, Student.id, request.args.get('cursor'), limit)
+        except ValueError:
+            flash('Курсори нодуруст', 'error')
+            return redirect(url_for('students_list'))
         groups = Group.query.filter_by(is_active=True).all()
         
         return render_template('students/list.html', 
@@ -107,7 +177,8 @@ def create_app():
                              groups=groups,
                              search=search,
                              selected_group=group_id,
-                             selected_course=course)
+                             selected_course=course,
+                             next_cursor=next_cursor)
     
     @app.route('/students/add', methods=['GET', 'POST'])
     @login_required
@@ -127,7 +198,13 @@ def create_app():
                 phone=request.form.get('phone'),
                 address=request.form.get('address')
             )
-            user.set_password(request.form['password'])
+            try:
+                hash_password(user, request.form['password'])
+            except HashingBusy:
+                # Навбати hash пур аст - мисли вуруд 503, на 500
+                flash('Сервер банд аст. Лутфан пас аз чанд сония аз нав кӯшиш кунед.', 'error')
+                groups = Group.query.filter_by(is_active=True).all()
+                return render_template('students/add.html', groups=groups), 503, {'Retry-After': '1'}
             
             # Сохтани профили донишҷӯ
             student = Student(
@@ -142,7 +219,10 @@ def create_app():
             try:
                 db.session.add(user)
                 db.session.add(student)
+                invalidate_summaries([student.group_id])
                 db.session.commit()
+                invalidate_statistics('students')
+                invalidate_principal(user.id)
                 flash(f'Донишҷӯи {user.full_name} бомуваффақият илова карда шуд', 'success')
                 return redirect(url_for('students_list'))
             except Exception as e:
@@ -160,25 +240,23 @@ def create_app():
             flash('Дастрасӣ рад карда шуд', 'error')
             return redirect(url_for('dashboard'))
         
-        courses = Course.query.filter_by(is_active=True)
+        courses = Course.query.options(*load_profile('course_list')).filter_by(is_active=True)
         
-        if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-            if teacher:
-                courses = courses.filter_by(teacher_id=teacher.id)
+        principal = current_principal()
+        if principal.role == 'teacher' and principal.teacher_id:
+            courses = courses.filter_by(teacher_id=principal.teacher_id)
         
         courses = courses.all()
         return render_template('attendance/list.html', courses=courses)
     
-    @app.route('/attendance/course/')
+    @app.route('/attendance/course/<int:course_id>')
     @login_required
     def course_attendance(course_id):
         course = Course.query.get_or_404(course_id)
         
         # Текшириши дастрасӣ
         if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-            if not teacher or course.teacher_id != teacher.id:
+            if not current_principal().teaches(course):
                 flash('Дастрасӣ рад карда шуд', 'error')
                 return redirect(url_for('attendance_list'))
         elif current_user.role not in ['dean', 'vice_dean']:
@@ -186,7 +264,8 @@ def create_app():
             return redirect(url_for('dashboard'))
         
         # Гирифтани донишҷӯёни гуруҳ
-        students = Student.query.filter_by(group_id=course.group_id, status='active').all()
+        students = Student.query.options(*load_profile('roster')) \
+            .filter_by(group_id=course.group_id, status='active').all()
         
         # Гирифтани таърихи имрӯз
         today = datetime.now().date()
@@ -212,8 +291,7 @@ def create_app():
         
         # Текшириши дастрасӣ
         if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-            if not teacher or course.teacher_id != teacher.id:
+            if not current_principal().teaches(course):
                 flash('Дастрасӣ рад карда шуд', 'error')
                 return redirect(url_for('attendance_list'))
         elif current_user.role not in ['dean', 'vice_dean']:
@@ -222,38 +300,19 @@ def create_app():
         
         students = Student.query.filter_by(group_id=course.group_id, status='active').all()
         
-        for student in students:
-            status = request.form.get(f'status_{student.id}', 'absent')
-            activity = request.form.get(f'activity_{student.id}')
-            comments = request.form.get(f'comments_{student.id}', '')
-            
-            # Ёфтан ё сохтани сабти ҳузур
-            attendance = Attendance.query.filter_by(
-                course_id=course_id,
-                student_id=student.id,
-                date=date
-            ).first()
-            
-            if not attendance:
-                attendance = Attendance(
-                    course_id=course_id,
-                    student_id=student.id,
-                    date=date,
-                    created_by=current_user.id
-                )
-            
-            # Текшириши имкони таҳрир
-            if not attendance.can_edit(current_user):
-                continue
-            
-            attendance.status = status
-            attendance.activity_score = float(activity) if activity else None
-            attendance.comments = comments
-            
-            db.session.add(attendance)
+        rows = [{
+            'student_id': student.id,
+            'status': request.form.get(f'status_{student.id}', 'absent'),
+            'activity_score': request.form.get(f'activity_{student.id}'),
+            'comments': request.form.get(f'comments_{student.id}', '')
+        } for student in students]
         
         try:
+            # Сабти якбора; равзанаи таҳрир дар SQL санҷида мешавад
+            result = upsert_attendance(course_id, date, rows, current_user)
+            invalidate_attendance(course, date, result['saved'])
             db.session.commit()
+            invalidate_statistics('attendance')
             flash('Ҳузур бомуваффақият сабт карда шуд', 'success')
         except Exception as e:
             db.session.rollback()
@@ -271,7 +330,7 @@ def create_app():
         
         return render_template('reports/list.html')
     
-    @app.route('/reports/transcript/')
+    @app.route('/reports/transcript/<int:student_id>')
     @login_required
     def student_transcript(student_id):
         student = Student.query.get_or_404(student_id)
@@ -288,108 +347,28 @@ def create_app():
             flash('Дастрасӣ рад карда шуд', 'error')
             return redirect(url_for('dashboard'))
         
-        # Ҷамъовариии маълумоти транскрипт
-        courses = Course.query.filter_by(group_id=student.group_id, is_active=True).all()
-        
-        transcript_data = {
-            'student': student,
-            'courses': [],
-            'total_credits': 0,
-            'total_gpa': 0
-        }
-        
-        total_points = 0
-        total_credits = 0
-        
-        for course in courses:
-            # Ҳузур
-            attendance_count = Attendance.query.filter_by(
-                course_id=course.id,
-                student_id=student.id,
-                status='present'
-            ).count()
-            
-            total_attendance = Attendance.query.filter_by(
-                course_id=course.id,
-                student_id=student.id
-            ).count()
-            
-            attendance_percentage = (attendance_count / total_attendance * 100) if total_attendance > 0 else 0
-            
-            # Баҳоҳо
-            grades = Grade.query.filter_by(
-                course_id=course.id,
-                student_id=student.id
-            ).all()
-            
-            course_grades = {}
-            for grade in grades:
-                course_grades[grade.grade_type] = grade.score
-            
-            # Ҳисоби баҳои умумӣ
-            final_grade = calculate_final_grade(attendance_percentage, course_grades)
-            
-            transcript_data['courses'].append({
-                'course': course,
-                'attendance_percentage': attendance_percentage,
-                'grades': course_grades,
-                'final_grade': final_grade
-            })
-            
-            if final_grade and course.subject.credits:
-                total_points += final_grade * course.subject.credits
-                total_credits += course.subject.credits
-        
-        transcript_data['total_credits'] = total_credits
-        transcript_data['total_gpa'] = (total_points / total_credits) if total_credits > 0 else 0
+        # Ҷамъовариии маълумоти транскрипт (шумораи собити дархостҳо)
+        transcript_data = build_transcripts([student])[student.id]
         
         return render_template('reports/transcript.html', data=transcript_data)
     
-    def calculate_final_grade(attendance_percentage, grades):
-        """Ҳисоби баҳои ниҳоӣ аз рӯи коэффициентҳо"""
-        config = current_app.config['GRADE_SYSTEM']
-        
-        total = 0
-        
-        # Ҳузур (30%)
-        attendance_grade = min(attendance_percentage / 100 * 100, 100)
-        total += attendance_grade * config['attendance_weight']
-        
-        # Фаъолият (20%) - аз рӯи миёнаи балҳои фаъолият
-        if 'activity' in grades:
-            total += grades['activity'] * config['activity_weight']
-        
-        # Рейтинги миёна (25%)
-        if 'midterm_1' in grades and 'midterm_2' in grades:
-            midterm_avg = (grades['midterm_1'] + grades['midterm_2']) / 2
-            total += midterm_avg * config['midterm_weight']
-        
-        # Имтиҳони ниҳоӣ (25%)
-        if 'final' in grades:
-            total += grades['final'] * config['final_weight']
-        
-        return total
-    
     # API endpoints
     @app.route('/api/search_students')
     @login_required
     def api_search_students():
         query = request.args.get('q', '')
-        group_id = request.args.get('group_id')
+        group_id = request.args.get('group_id', type=int)
         
-        students_query = Student.query.join(User)
-        
-        if query:
-            students_query = students_query.filter(
-                (User.first_name.contains(query)) |
-                (User.last_name.contains(query)) |
-                (Student.student_id.contains(query))
-            )
+        students_query = Student.query.options(*load_profile('student_card'))
         
         if group_id:
             students_query = students_query.filter(Student.group_id == group_id)
         
-        students = students_query.limit(20).all()
+        if query:
+            scope = {group_id} if group_id else None
+            students = load_ranked(students_query, search_student_ids(query, group_ids=scope, limit=20))
+        else:
+            students = students_query.limit(20).all()
         
         result = []
         for student in students:
@@ -402,6 +381,61 @@ def create_app():
         
         return jsonify(result)
     
+    # Фармонҳои CLI
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        """Пур кардани students.search_key барои сабтҳои мавҷуда"""
+        print(f'{rebuild_search_keys()} донишҷӯ навсозӣ шуд')
+    
+    @app.cli.command('import-students')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--dry-run', is_flag=True, help='Танҳо санҷиш, бе навиштан ба пойгоҳ')
+    def import_students_command(path, dry_run):
+        """Воридоти донишҷӯён аз файли CSV/XLSX"""
+        with open(path, 'rb') as stream:
+            report = import_students(stream, path, dry_run=dry_run)
+        for error in report['errors']:
+            print(f"Сатри {error['row']}: {'; '.join(error['errors'])}")
+        print(f"Ҳамагӣ: {report['total']}, дуруст: {report['valid']}, ворид шуд: {report['imported']}")
+    
+    @app.cli.command('attendance-partitions')
+    @click.option('--ahead', type=int, help='Чанд моҳ пешакӣ (пешфарз - ATTENDANCE_PARTITIONS_AHEAD)')
+    @click.option('--detach-before', type=click.DateTime(formats=['%Y-%m-%d']),
+                  help='Partition-ҳои моҳҳои пеш аз ин санаро ҷудо кардан')
+    @click.option('--convert', is_flag=True, help='Ҷадвали оддии attendance-ро ба тақсимшуда табдил додан')
+    def attendance_partitions_command(ahead, detach_before, convert):
+        """Сохтани partition-ҳои attendance пешакӣ (барои cron) ва ҷудо кардани кӯҳнаҳо"""
+        if convert:
+            if partition_existing_table(ahead or app.config['ATTENDANCE_PARTITIONS_AHEAD']):
+                print('attendance ба ҷадвали тақсимшуда табдил дода шуд')
+        for name in ensure_attendance_partitions(ahead):
+            print(f'Сохта шуд: {name}')
+        if detach_before:
+            for name in detach_attendance_partitions(detach_before.date()):
+                print(f'Ҷудо шуд: {name}')
+    
+    @app.cli.command('attendance-rollups')
+    def attendance_rollups_command():
+        """Аз нав сохтани attendance_daily ва attendance_monthly аз тамоми attendance"""
+        daily, monthly = rebuild_rollups(db.session)
+        clear_reports()
+        db.session.commit()
+        invalidate_statistics('attendance')
+        print(f'Рӯзона: {daily}, моҳона: {monthly}')
+    
+    @app.cli.command('jobs-worker')
+    @click.option('--once', is_flag=True, help='Корҳои навбатро иҷро карда баромадан')
+    @click.option('--poll', type=float, help='Фосилаи санҷиши навбат (пешфарз - JOBS_POLL_INTERVAL)')
+    def jobs_worker_command(once, poll):
+        """Worker-и корҳои фонӣ (ҳисоботҳои калон); якчанд процесс метавонанд бошанд"""
+        print(f'Иҷро шуд: {work(once=once, poll_interval=poll)}')
+    
+    @app.cli.command('jobs-expire')
+    def jobs_expire_command():
+        """Нест кардани корҳои анҷомёфтаи кӯҳна (JOBS_RESULT_TTL) ва файлҳои натиҷаашон"""
+        jobs, files = expire_jobs()
+        print(f'{jobs} кор ва {files} файл нест карда шуд')
+    
     return app
 
 if __name__ == '__main__':
@@ -0,0 +1,301 @@
+"""Бенчмаркҳои endpoint-ҳои app.py (api/all.py)
+
+    python -m pytest benchmarks/app_suite
+"""
+import csv
+import gzip
+import io
+import zipfile
+from itertools import product
+from xml.etree import ElementTree
+
+import numpy as np
+import pytest
+
+from services import grading
+from services.exports import ATTENDANCE_COLUMNS
+from services.jobs import work
+from services.printing import print_student_ids
+from services.transcripts import build_transcripts, load_students
+
+
+@pytest.mark.parametrize('query', ['раҳимов', 'зарина ҳак', 'S0001'], ids=['surname', 'two-words', 'code'])
+def test_search_students_dean(benchmark, dean_client, query):
+    response = benchmark(dean_client.get, '/api/students/search', query_string={'q': query})
+    assert response.status_code == 200
+
+
+def test_search_students_teacher(benchmark, teacher_client):
+    response = benchmark(teacher_client.get, '/api/students/search', query_string={'q': 'раҳимов'})
+    assert response.status_code == 200
+
+
+def test_search_students_page(benchmark, dean_client):
+    response = benchmark(dean_client.get, '/api/students/search', query_string={'limit': 100})
+    assert response.json['count'] == 100
+
+
+def test_bulk_save_attendance(benchmark, app, teacher_client, faculty):
+    from database.models import Student
+
+    with app.app_context():
+        students = [s.id for s in Student.query.filter_by(group_id=faculty['group_id'])]
+    payload = {
+        'course_id': faculty['course_id'],
+        'date': faculty['course_dates'][-1].isoformat(),
+        'attendance': [{'student_id': sid, 'status': 'present'} for sid in students],
+    }
+    response = benchmark(teacher_client.post, '/api/attendance/bulk_save', json=payload)
+    assert response.json['saved_count'] == len(students)
+
+
+def test_bulk_save_grades(benchmark, app, teacher_client, faculty):
+    from database.models import Student
+
+    with app.app_context():
+        students = [s.id for s in Student.query.filter_by(group_id=faculty['group_id'])]
+    payload = {
+        'course_id': faculty['course_id'],
+        'grade_type': 'midterm_2',
+        'grades': [{'student_id': sid, 'score': 60 + sid % 40} for sid in students],
+    }
+    response = benchmark(teacher_client.post, '/api/grades/bulk_save', json=payload)
+    assert response.json['saved_count'] + response.json['rejected_count'] == len(students)
+
+
+def _csv_rows(data):
+    return list(csv.reader(io.StringIO(data.decode('utf-8-sig'))))
+
+
+def _xlsx_rows(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+    ns = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+    return [[(cell.findtext(f'{ns}is/{ns}t') or cell.findtext(f'{ns}v') or '') for cell in row]
+            for row in sheet.iter(f'{ns}row')]
+
+
+def _attendance_count(app, **criteria):
+    from database.models import db, Attendance, Course
+
+    with app.app_context():
+        return db.session.query(Attendance).join(Course, Course.id == Attendance.course_id) \
+            .filter_by(**criteria).count()
+
+
+@pytest.fixture(scope='module')
+def formula_comment(app, faculty):
+    """Шарҳи ҳузур, ки Excel ҳамчун формула мехонд"""
+    from database.models import db, Attendance
+
+    with app.app_context():
+        record = Attendance.query.filter_by(course_id=faculty['course_id']).order_by(Attendance.id).first()
+        record.comments = '=cmd'
+        db.session.commit()
+    return "'=cmd"
+
+
+def test_export_attendance_group(benchmark, app, dean_client, faculty, formula_comment):
+    def export():
+        response = dean_client.get('/api/exports/attendance', query_string={'group_id': faculty['group_id']})
+        return response.status_code, response.data
+
+    status, data = benchmark(export)
+    assert status == 200
+    rows = _csv_rows(data)
+    assert tuple(rows[0]) == ATTENDANCE_COLUMNS
+    assert len(rows) - 1 == _attendance_count(app, group_id=faculty['group_id'])
+    assert formula_comment in [row[-1] for row in rows] and '=cmd' not in [row[-1] for row in rows]
+
+
+def test_export_attendance_group_gzip(benchmark, dean_client, faculty, formula_comment):
+    query = {'group_id': faculty['group_id']}
+
+    def export():
+        return dean_client.get('/api/exports/attendance', query_string=query, headers={'Accept-Encoding': 'gzip'})
+
+    response = benchmark(export)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    plain = dean_client.get('/api/exports/attendance', query_string=query).data
+    assert gzip.decompress(response.data) == plain
+
+
+def test_export_attendance_group_xlsx(benchmark, app, dean_client, faculty, formula_comment):
+    def export():
+        return dean_client.get('/api/exports/attendance', query_string={'group_id': faculty['group_id'], 'format': 'xlsx'})
+
+    response = benchmark(export)
+    rows = _xlsx_rows(response.data)
+    assert tuple(rows[0]) == ATTENDANCE_COLUMNS
+    assert len(rows) - 1 == _attendance_count(app, group_id=faculty['group_id'])
+    assert formula_comment in [row[-1] for row in rows]
+
+
+def test_export_attendance_teacher(benchmark, app, teacher_client, faculty):
+    # Муаллим бе филтр танҳо дарсҳои худро мегирад
+    from database.models import Teacher, User
+
+    response = benchmark(teacher_client.get, '/api/exports/attendance')
+    with app.app_context():
+        teacher_id = Teacher.query.join(User).filter(User.email == faculty['teacher_email']).one().id
+    assert len(_csv_rows(response.data)) - 1 == _attendance_count(app, teacher_id=teacher_id)
+
+    assert teacher_client.get('/api/exports/attendance', query_string={'start_date': '2026-13-01'}).status_code == 400
+
+
+def test_dashboard_statistics_dean(benchmark, dean_client):
+    response = benchmark(dean_client.get, '/api/statistics/dashboard')
+    assert response.status_code == 200
+
+
+def test_dashboard_statistics_teacher(benchmark, teacher_client):
+    response = benchmark(teacher_client.get, '/api/statistics/dashboard')
+    assert response.status_code == 200
+
+
+def test_attendance_summary_faculty(benchmark, dean_client, faculty, clear_reports):
+    dates = faculty['course_dates']
+    query = {'start_date': dates[0].isoformat(), 'end_date': dates[-1].isoformat()}
+    response = benchmark.pedantic(dean_client.get, args=('/api/reports/attendance_summary',),
+                                  kwargs={'query_string': query}, setup=clear_reports, rounds=10)
+    assert len(response.json['data']) == faculty['students']
+    assert response.headers['X-Report-Cache'] == 'miss'
+
+
+def test_attendance_summary_faculty_cached(benchmark, dean_client, faculty):
+    dates = faculty['course_dates']
+    query = {'start_date': dates[0].isoformat(), 'end_date': dates[-1].isoformat()}
+    dean_client.get('/api/reports/attendance_summary', query_string=query)
+    response = benchmark(dean_client.get, '/api/reports/attendance_summary', query_string=query)
+    assert len(response.json['data']) == faculty['students']
+    assert response.headers['X-Report-Cache'] == 'hit'
+
+
+def test_attendance_summary_group(benchmark, teacher_client, faculty, clear_reports):
+    dates = faculty['course_dates']
+    query = {'group_id': faculty['group_id'], 'start_date': dates[0].isoformat(), 'end_date': dates[-1].isoformat()}
+    response = benchmark.pedantic(teacher_client.get, args=('/api/reports/attendance_summary',),
+                                  kwargs={'query_string': query}, setup=clear_reports, rounds=20)
+    assert response.status_code == 200
+
+
+def test_stored_transcript_cached(benchmark, dean_client, faculty):
+    url = f"/api/reports/transcripts/{faculty['student_id']}"
+    dean_client.get(url)
+    response = benchmark(dean_client.get, url)
+    assert response.headers['X-Report-Cache'] == 'hit'
+
+
+def test_student_transcript(benchmark, app, faculty):
+    # Маълумоти саҳифаи /reports/transcript/<id>; шаблони HTML чен карда намешавад
+    def transcript():
+        with app.app_context():
+            return build_transcripts(load_students(student_ids=[faculty['student_id']]))
+
+    result = benchmark(transcript)
+    assert result[faculty['student_id']]['courses']
+
+
+def _pages(html):
+    return html.count('<section class="transcript">')
+
+
+@pytest.fixture(scope='module')
+def course_students(app):
+    with app.app_context():
+        count = len(print_student_ids(course_number=1))
+    assert count
+    return count
+
+
+def test_print_transcripts_course(benchmark, dean_client, course_students):
+    # Ҳуҷҷати чопии курси 1 бе pool (камтар аз PRINT_PARALLEL_MIN донишҷӯ)
+    def print_course():
+        return dean_client.get('/api/reports/transcripts/print', query_string={'course': 1}).get_data(as_text=True)
+
+    html = benchmark(print_course)
+    assert _pages(html) == course_students
+
+
+def test_print_transcripts_course_pool(benchmark, app, dean_client, course_students, monkeypatch):
+    # Ҳамон ҳуҷҷат дар ProcessPool-и умумӣ (2 процесс)
+    monkeypatch.setitem(app.config, 'PRINT_PROCESSES', 2)
+    monkeypatch.setitem(app.config, 'PRINT_PARALLEL_MIN', 1)
+
+    def print_course():
+        return dean_client.get('/api/reports/transcripts/print', query_string={'course': 1}).get_data(as_text=True)
+
+    html = benchmark(print_course)
+    assert _pages(html) == course_students
+
+
+def test_print_transcripts_job(benchmark, app, dean_client, course_students):
+    # ?async=1: кори transcripts_print дар worker ва файли натиҷа
+    def print_job():
+        response = dean_client.get('/api/reports/transcripts/print', query_string={'course': 1, 'async': 1})
+        assert response.status_code == 202
+        with app.app_context():
+            work(once=True, worker='bench')
+        return dean_client.get(response.json['result_url'])
+
+    response = benchmark.pedantic(print_job, rounds=3)
+    assert response.status_code == 200
+    assert _pages(response.get_data(as_text=True)) == course_students
+
+
+def _scalar_ranking(transcripts):
+    """Ҷой, GPA ва кредитҳо аз build_transcripts (calculate_final_grade-и скалярӣ)"""
+    gpa = {student_id: t['total_gpa'] for student_id, t in transcripts.items()}
+    return {
+        student_id: (1 + sum(other > value for other in gpa.values()), round(value, 2),
+                     transcripts[student_id]['total_credits'])
+        for student_id, value in gpa.items()
+    }
+
+
+def test_cohort_ranking_course(benchmark, app, dean_client):
+    response = benchmark(dean_client.get, '/api/reports/ranking', query_string={'course': 1})
+    ranking = {row['id']: (row['rank'], row['total_gpa'], row['total_credits']) for row in response.json['data']}
+
+    with app.app_context():
+        expected = _scalar_ranking(build_transcripts(load_students(course_number=1)))
+    assert ranking == expected
+    assert [row['rank'] for row in response.json['data']] == sorted(r[0] for r in expected.values())
+
+
+def test_final_grades_vectorized(benchmark, app):
+    # Ҳамаи ҳолатҳои баҳои мавҷуд/набуда × ҳузур: айнан мисли calculate_final_grade
+    config = app.config['GRADE_SYSTEM']
+    scores = {'activity': 77.5, 'midterm_1': 64.0, 'midterm_2': 91.25, 'final': 58.0}
+    rows = [
+        (attendance, {name: score for (name, score), present in zip(scores.items(), mask) if present})
+        for attendance in (0, 12.5, 66.66666666666667, 100, 105) for mask in product((True, False), repeat=4)
+    ] * 500
+    columns = [np.array([grades.get(name, np.nan) for _, grades in rows]) for name in scores]
+    attendance = np.array([row[0] for row in rows], dtype=float)
+
+    final = benchmark(grading.final_grades, attendance, *columns, config)
+    assert final.tolist() == [grading.calculate_final_grade(a, grades, config) for a, grades in rows]
+
+
+def test_credit_weighted_gpa_ties(benchmark):
+    # Донишҷӯёни 0 ва 2 баҳоҳои якхела доранд (ҷойи якхела); дарси бе кредит ва бе баҳо ба ҳисоб намеравад
+    courses = [
+        [(81.0, 3), (64.5, 4), (0.0, 5)],
+        [(90.0, 3), (70.0, 0)],
+        [(81.0, 3), (64.5, 4)],
+        [],
+        [(0.0, 4)],
+    ]
+    index = np.array([i for i, items in enumerate(courses) for _ in items], dtype=np.intp)
+    final = np.array([grade for items in courses for grade, _ in items])
+    credits = np.array([credit for items in courses for _, credit in items], dtype=np.int64)
+    gpa, total_credits = benchmark(grading.credit_weighted_gpa, index, final, credits, len(courses))
+
+    expected = []
+    for items in courses:
+        counted = [(grade, credit) for grade, credit in items if grade and credit]
+        total = sum(credit for _, credit in counted)
+        expected.append((sum(grade * credit for grade, credit in counted) / total if total else 0, total))
+    assert list(zip(gpa.tolist(), total_credits.tolist())) == expected
+    assert grading.competition_rank(gpa).tolist() == [2, 1, 2, 4, 4]
@@ -0,0 +1,71 @@
+"""Барномаи app.py бо маълумоти факултет барои бенчмаркҳо
+
+Пойгоҳ - BENCH_DATABASE_URL (ҷадвалҳо аз нав сохта мешаванд) ё SQLite-и
+муваққатӣ. Кэши статистика хомӯш аст, то худи дархостҳо чен карда шаванд.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from benchmarks.faculty import APP_MIGRATIONS, bench_database_url, load_app, reset_schema, shape_from_env  # noqa: E402
+from benchmarks.plans import analyze  # noqa: E402
+
+os.environ['DATABASE_URL'] = bench_database_url('app_bench')
+os.environ['STATS_CACHE_TTL'] = '0'
+# Файлҳои корҳои чоп берун аз дарахти лоиҳа
+os.environ['PRINT_OUTPUT_DIR'] = tempfile.mkdtemp(prefix='print_bench_')
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import create_app
+    from database.models import db
+
+    app = create_app()
+    with app.app_context():
+        reset_schema(db, APP_MIGRATIONS)
+        app.config['FACULTY'] = load_app(db, shape_from_env())
+        analyze(db.engine)
+        db.session.remove()
+    return app
+
+
+@pytest.fixture(scope='session')
+def faculty(app):
+    return app.config['FACULTY']
+
+
+def _login(app, email, password):
+    client = app.test_client()
+    response = client.post('/login', data={'email': email, 'password': password})
+    assert response.status_code == 302, response.status_code
+    return client
+
+
+@pytest.fixture(scope='session')
+def dean_client(app, faculty):
+    return _login(app, faculty['dean_email'], faculty['password'])
+
+
+@pytest.fixture(scope='session')
+def teacher_client(app, faculty):
+    return _login(app, faculty['teacher_email'], faculty['password'])
+
+
+@pytest.fixture
+def clear_reports(app):
+    """Кэши ҳисоботҳо холӣ (пеш аз ҳар давр): ҳисоби худи ҳисобот чен ва санҷида мешавад"""
+    from database.models import db
+    from services.report_cache import clear_reports
+
+    def clear():
+        with app.app_context():
+            clear_reports()
+            db.session.commit()
+
+    return clear
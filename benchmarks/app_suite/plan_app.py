@@ -0,0 +1,95 @@
+"""Нақшаи дархостҳои асосии app.py: ҷадвалҳои калон танҳо бо индекс
+
+    python -m pytest benchmarks/app_suite -k plan
+
+Ҳисоботи ҳузури тамоми факултет (attendance_summary бе гуруҳ) ҳамаи
+attendance_monthly-и давраро мехонад ва дар ин рӯйхат нест.
+"""
+import pytest
+
+from benchmarks.plans import assert_index_scans
+
+
+@pytest.fixture(scope='module')
+def engine(app):
+    from database.models import db
+
+    with app.app_context():
+        return db.engine
+
+
+def test_plan_search_students_teacher(teacher_client, engine):
+    with assert_index_scans(engine):
+        response = teacher_client.get('/api/students/search', query_string={'q': 'раҳимов'})
+    assert response.status_code == 200
+
+
+def test_plan_dashboard_teacher(teacher_client, engine):
+    with assert_index_scans(engine):
+        response = teacher_client.get('/api/statistics/dashboard')
+    assert response.status_code == 200
+
+
+def test_plan_dashboard_dean(dean_client, engine):
+    with assert_index_scans(engine):
+        response = dean_client.get('/api/statistics/dashboard')
+    assert response.status_code == 200
+
+
+def test_plan_dashboard_student(app, faculty, engine):
+    from database.models import db, Student
+    from services.stats import student_statistics
+
+    with app.app_context():
+        user = db.session.get(Student, faculty['student_id']).user
+        with assert_index_scans(engine):
+            stats = student_statistics(user)
+    assert 'my_attendance_rate' in stats
+
+
+def test_plan_attendance_summary_group(teacher_client, faculty, engine, clear_reports):
+    # Бе тоза кардан ҷавоб аз кэш аст ва дархостҳои ҳузур EXPLAIN намешаванд
+    clear_reports()
+    dates = faculty['course_dates']
+    query = {'group_id': faculty['group_id'], 'start_date': dates[0].isoformat(), 'end_date': dates[-1].isoformat()}
+    with assert_index_scans(engine):
+        response = teacher_client.get('/api/reports/attendance_summary', query_string=query)
+    assert response.headers['X-Report-Cache'] == 'miss'
+
+
+def test_plan_course_attendance_day(app, faculty, engine):
+    # Сабтҳои рӯзи дарс дар саҳифаи /attendance/course/<id>
+    from database.models import Attendance
+
+    with app.app_context(), assert_index_scans(engine):
+        records = Attendance.query.filter_by(course_id=faculty['course_id'], date=faculty['course_dates'][-1]).all()
+    assert records
+
+
+def test_plan_save_grade(teacher_client, faculty, engine):
+    payload = {'course_id': faculty['course_id'], 'student_id': faculty['student_id'],
+               'grade_type': 'midterm_1', 'score': 80}
+    with assert_index_scans(engine):
+        response = teacher_client.post('/api/grades/save', json=payload)
+    assert response.json['success']
+
+
+def test_plan_student_transcript(app, faculty, engine):
+    from services.transcripts import build_transcripts, load_students
+
+    with app.app_context(), assert_index_scans(engine):
+        result = build_transcripts(load_students(student_ids=[faculty['student_id']]))
+    assert result[faculty['student_id']]['courses']
+
+
+def test_plan_stored_transcript(dean_client, faculty, engine, clear_reports):
+    clear_reports()
+    with assert_index_scans(engine):
+        response = dean_client.get(f"/api/reports/transcripts/{faculty['student_id']}")
+    assert response.headers['X-Report-Cache'] == 'miss'
+
+
+def test_plan_group_ranking(dean_client, faculty, engine):
+    with assert_index_scans(engine):
+        response = dean_client.get('/api/reports/ranking', query_string={'group_id': faculty['group_id']})
+    assert response.json['count'] > 0
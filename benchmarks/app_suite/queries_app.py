@@ -0,0 +1,106 @@
+"""Ҳадди дархостҳои SQL барои endpoint-ҳои асосӣ (database.loading)
+
+Шумораи дархостҳо набояд аз андозаи маълумот вобаста бошад: N+1-и нав
+(муносибати бе профили боркунӣ) дар ин ҷо хато медиҳад, на танҳо дар вақт.
+Инчунин: навиштани ҳузур ва баҳо кэши ҳисоботҳои вобастаро нест мекунад.
+
+    python -m pytest benchmarks/app_suite -k queries
+"""
+import pytest
+
+from database.loading import assert_max_queries
+from services.transcripts import build_transcripts, load_students, transcript_to_json
+
+
+@pytest.fixture(scope='module')
+def engine(app):
+    from database.models import db
+
+    with app.app_context():
+        return db.engine
+
+
+def _roster_payload(app, faculty, kind, status='late'):
+    from database.models import Student
+
+    with app.app_context():
+        students = [s.id for s in Student.query.filter_by(group_id=faculty['group_id'])]
+    if kind == 'attendance':
+        return {
+            'course_id': faculty['course_id'],
+            'date': faculty['course_dates'][-1].isoformat(),
+            'attendance': [{'student_id': sid, 'status': status} for sid in students],
+        }
+    return {
+        'course_id': faculty['course_id'],
+        'grade_type': 'final',
+        'grades': [{'student_id': sid, 'score': 50 + sid % 50} for sid in students],
+    }
+
+
+@pytest.mark.parametrize('role, path, query, limit', [
+    ('dean', '/api/students/search', {'q': 'раҳимов'}, 3),
+    ('teacher', '/api/students/search', {'q': 'раҳимов'}, 5),
+    ('dean', '/api/students/search', {'limit': 100}, 2),
+    ('dean', '/api/search_students', {'q': 'раҳимов'}, 3),
+], ids=['search-dean', 'search-teacher', 'search-page', 'search-legacy'])
+def test_search_queries(engine, dean_client, teacher_client, role, path, query, limit):
+    client = dean_client if role == 'dean' else teacher_client
+    with assert_max_queries(limit, engine):
+        response = client.get(path, query_string=query)
+    assert response.status_code == 200
+
+
+def test_transcript_queries(engine, dean_client, faculty, clear_reports):
+    clear_reports()
+    with assert_max_queries(10, engine):
+        response = dean_client.get(f"/api/reports/transcripts/{faculty['student_id']}")
+    assert response.headers['X-Report-Cache'] == 'miss'
+
+
+def test_group_transcripts_queries(engine, app, faculty):
+    # Маълумоти /reports/transcript/<id> ва чоп барои тамоми гуруҳ (бо ному фанҳо)
+    with app.app_context(), assert_max_queries(4, engine):
+        result = [transcript_to_json(t) for t in build_transcripts(load_students(group_id=faculty['group_id'])).values()]
+    assert result
+
+
+@pytest.mark.parametrize('kind, limit', [('attendance', 14), ('grades', 8)])
+def test_roster_save_queries(engine, app, teacher_client, faculty, kind, limit):
+    payload = _roster_payload(app, faculty, kind)
+    with assert_max_queries(limit, engine):
+        response = teacher_client.post(f'/api/{kind}/bulk_save', json=payload)
+    assert response.status_code == 200
+
+
+def test_attendance_write_invalidates_summary(app, teacher_client, faculty):
+    dates = faculty['course_dates']
+    query = {'group_id': faculty['group_id'], 'start_date': dates[0].isoformat(), 'end_date': dates[-1].isoformat()}
+    teacher_client.get('/api/reports/attendance_summary', query_string=query)
+    assert teacher_client.get('/api/reports/attendance_summary', query_string=query).headers['X-Report-Cache'] == 'hit'
+
+    excused = {}
+    for status in ('excused', 'present'):
+        response = teacher_client.post('/api/attendance/bulk_save', json=_roster_payload(app, faculty, 'attendance', status))
+        assert response.status_code == 200
+        response = teacher_client.get('/api/reports/attendance_summary', query_string=query)
+        assert response.headers['X-Report-Cache'] == 'miss'
+        excused[status] = sum(row['excused_classes'] for row in response.json['data'])
+    assert excused['excused'] > excused['present']
+
+
+def test_grade_write_invalidates_transcript(dean_client, teacher_client, faculty):
+    url = f"/api/reports/transcripts/{faculty['student_id']}"
+    dean_client.get(url)
+    assert dean_client.get(url).headers['X-Report-Cache'] == 'hit'
+
+    for score in (71, 93):
+        response = teacher_client.post('/api/grades/save', json={
+            'course_id': faculty['course_id'], 'student_id': faculty['student_id'],
+            'grade_type': 'midterm_1', 'score': score
+        })
+        assert response.json['success']
+        response = dean_client.get(url)
+        assert response.headers['X-Report-Cache'] == 'miss'
+        course = next(c for c in response.json['data']['courses'] if c['course_id'] == faculty['course_id'])
+        assert course['grades']['midterm_1'] == score
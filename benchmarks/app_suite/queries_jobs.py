@@ -0,0 +1,138 @@
+"""Навбати корҳои фонӣ (services/jobs.py): рафтори навбат, на вақт
+
+Дархостҳои якхела як кор, гирифтани корҳо як-як, баргардонидани корҳои
+worker-и қатъшуда, дастрасӣ ва натиҷа (409 то анҷом).
+
+    python -m pytest benchmarks/app_suite -k jobs
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.jobs import claim, enqueue, run_job, work
+
+
+@pytest.fixture
+def empty_queue(app):
+    """Навбат пеш ва пас аз санҷиш холӣ (корҳои боқимонда иҷро мешаванд)"""
+    with app.app_context():
+        work(once=True, worker='drain')
+    yield
+    with app.app_context():
+        work(once=True, worker='drain')
+
+
+def _summary_query(faculty, days=0):
+    dates = faculty['course_dates']
+    return {'group_id': faculty['group_id'], 'start_date': dates[0].isoformat(),
+            'end_date': (dates[-1] - timedelta(days=days)).isoformat(), 'async': 1}
+
+
+def _job(app, job_id):
+    from database.models import db, Job
+
+    with app.app_context():
+        job = db.session.get(Job, job_id)
+        return job.status, job.worker, job.attempts, job.error
+
+
+def _stale(app, job_id):
+    from database.models import db, Job
+
+    with app.app_context():
+        db.session.get(Job, job_id).heartbeat_at = datetime.utcnow() - timedelta(days=1)
+        db.session.commit()
+
+
+def test_identical_requests_share_job(app, teacher_client, faculty, empty_queue):
+    query = _summary_query(faculty)
+    first = teacher_client.get('/api/reports/attendance_summary', query_string=query)
+    second = teacher_client.get('/api/reports/attendance_summary', query_string=query)
+    assert first.status_code == second.status_code == 202
+    assert first.json['created'] is True and second.json['created'] is False
+    assert first.json['job_id'] == second.json['job_id']
+
+    # То анҷом - 409 бо ҳолати кор
+    result_url = first.json['result_url']
+    pending = teacher_client.get(result_url)
+    assert pending.status_code == 409 and pending.json['status'] == 'queued'
+
+    with app.app_context():
+        assert work(once=True, worker='w1') == 1
+    status = teacher_client.get(first.json['status_url'])
+    assert status.json['status'] == 'done' and status.json['progress'] == status.json['total']
+
+    result = teacher_client.get(result_url)
+    assert result.status_code == 200
+    assert result.headers['Content-Disposition'].startswith('attachment')
+    assert {row['group_id'] for row in result.json['data']} == {faculty['group_id']}
+
+    # Кори анҷомёфта дигар фаъол нест: дархости нав кори нав месозад
+    third = teacher_client.get('/api/reports/attendance_summary', query_string=query)
+    assert third.json['created'] is True and third.json['job_id'] != first.json['job_id']
+
+
+def test_claim_takes_one_job_at_a_time(app, faculty, empty_queue):
+    with app.app_context():
+        job_ids = [enqueue('attendance_summary', {
+            'group_ids': [faculty['group_id']], 'course': None,
+            'start_date': faculty['course_dates'][0].isoformat(),
+            'end_date': faculty['course_dates'][-days].isoformat()
+        })[0].id for days in (2, 3)]
+        claimed = [claim('w1'), claim('w2'), claim('w3')]
+    assert claimed == job_ids + [None]
+    assert [_job(app, job_id)[:3] for job_id in job_ids] == [('running', 'w1', 1), ('running', 'w2', 1)]
+
+    with app.app_context():
+        assert run_job(job_ids[0], 'w1') and run_job(job_ids[1], 'w2')
+    assert [_job(app, job_id)[0] for job_id in job_ids] == ['done', 'done']
+
+
+def test_stale_job_requeued_then_failed(app, faculty, empty_queue, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOBS_MAX_ATTEMPTS', 2)
+    with app.app_context():
+        job, _ = enqueue('attendance_summary', {
+            'group_ids': [faculty['group_id']], 'course': None,
+            'start_date': faculty['course_dates'][0].isoformat(),
+            'end_date': faculty['course_dates'][-4].isoformat()
+        })
+        job_id = job.id
+        assert claim('w1') == job_id
+
+    # w1 heartbeat надорад: кор ба навбат бармегардад ва w2 онро мегирад
+    _stale(app, job_id)
+    with app.app_context():
+        assert claim('w2') == job_id
+    assert _job(app, job_id)[:3] == ('running', 'w2', 2)
+
+    # Навсозии w1-и "қатъшуда" дигар ба кор таъсир намекунад
+    with app.app_context():
+        run_job(job_id, 'w1')
+    assert _job(app, job_id)[:2] == ('running', 'w2')
+
+    # Пас аз JOBS_MAX_ATTEMPTS - 'failed'
+    _stale(app, job_id)
+    with app.app_context():
+        assert claim('w3') is None
+    status, _, attempts, error = _job(app, job_id)
+    assert (status, attempts) == ('failed', 2) and error
+
+
+def test_job_visibility(app, dean_client, teacher_client, faculty, empty_queue):
+    dates = faculty['course_dates']
+    faculty_wide = dean_client.get('/api/reports/attendance_summary', query_string={
+        'start_date': dates[0].isoformat(), 'end_date': dates[-5].isoformat(), 'async': 1
+    })
+    assert faculty_wide.status_code == 202
+    # Хулосаи тамоми факултет танҳо барои декан ва замдекан
+    assert teacher_client.get(faculty_wide.json['status_url']).status_code == 403
+    assert teacher_client.get(faculty_wide.json['result_url']).status_code == 403
+    assert dean_client.get(faculty_wide.json['status_url']).status_code == 200
+
+    transcripts = dean_client.post('/api/reports/transcripts/generate',
+                                   json={'group_id': faculty['group_id'], 'async': True})
+    assert transcripts.status_code == 202
+    assert teacher_client.get(transcripts.json['status_url']).status_code == 403
+
+    group = teacher_client.get('/api/reports/attendance_summary', query_string=_summary_query(faculty, days=5))
+    assert teacher_client.get(group.json['status_url']).status_code == 200
@@ -0,0 +1,188 @@
+"""Бенчмарки education_crm: Flask (sync) ва ASGI (async) дар зери сарбории ҳамзамон
+
+    python -m benchmarks.crm_async --concurrency 50 200 1000 --requests 2000
+
+Ҳар ду варианти API дар процессҳои алоҳида оғоз мешаванд: sync - сервери
+threaded-и werkzeug бо create_app(), async - uvicorn бо create_asgi_app().
+Мизоҷи asyncio ҳамзамон `--concurrency` пайваст мекушояд ва навбат ба навбат
+/api/visibility/counts ва /api/students?limit=50-ро бо токени муаллим
+мехонад. Пойгоҳ аз DATABASE_URL (барои натиҷаи воқеӣ - PostgreSQL) ё
+SQLite-и муваққатӣ. Натиҷа: requests/sec, p50/p99 ва шумораи хатоҳо.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CRM = os.path.join(ROOT, 'education_crm')
+PATHS = ['/api/visibility/counts', '/api/students?limit=50']
+
+
+def _crm_imports():
+    os.chdir(CRM)
+    sys.path.insert(0, CRM)
+
+
+def seed(students_count, courses_count=40, groups_count=44):
+    """Донишҷӯён, дарсҳо ва қайдҳо; токени муаллимро бармегардонад"""
+    _crm_imports()
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from database import db
+    from database.models import User, Group, Course, Student, Enrollment
+    from api.handlers import identity_for, refresh_teacher_scope
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        teacher = db.session.execute(db.select(User).filter_by(email='bench-teacher@university.tj')).scalar()
+        if teacher is None:
+            rng = random.Random(42)
+            teacher = User(email='bench-teacher@university.tj', role='teacher', full_name='Bench Teacher',
+                           password_hash='-')
+            db.session.add(teacher)
+            db.session.flush()
+            db.session.execute(Group.__table__.insert(), [
+                {'id': i + 1, 'name': f'B-{i}', 'course_year': i % 4 + 1} for i in range(groups_count)
+            ])
+            db.session.execute(Course.__table__.insert(), [
+                {'id': i + 1, 'code': f'BC{i}', 'title': f'Course {i}', 'total_hours': 60,
+                 'teacher_id': teacher.id if i < 4 else None}
+                for i in range(courses_count)
+            ])
+            base = teacher.id
+            db.session.execute(User.__table__.insert(), [
+                {'id': base + i + 1, 'email': f'bench-s{i}@university.tj', 'password_hash': '-',
+                 'role': 'student', 'full_name': f'Student {i}'}
+                for i in range(students_count)
+            ])
+            db.session.execute(Student.__table__.insert(), [
+                {'id': i + 1, 'user_id': base + i + 1, 'group_id': i % groups_count + 1,
+                 'student_uid': f'B{i:06d}'}
+                for i in range(students_count)
+            ])
+            db.session.execute(Enrollment.__table__.insert(), [
+                {'student_id': i + 1, 'course_id': rng.randrange(courses_count) + 1, 'year': 2025, 'semester': 1}
+                for i in range(students_count) for _ in range(3)
+            ])
+            # Enrollment-ҳо бе handlers навишта шуданд - доираи муаллим аз нав
+            refresh_teacher_scope(db.session)
+            db.session.commit()
+        token = create_access_token(identity=identity_for(teacher))
+        # Бе доира муқоиса рӯйхати холиро чен мекард
+        listing = app.test_client().get('/api/students?limit=1', headers={'Authorization': f'Bearer {token}'})
+        assert listing.status_code == 200 and listing.json['items'], 'рӯйхати донишҷӯёни муаллим холӣ аст'
+        return token
+
+
+def serve(mode, port):
+    _crm_imports()
+    if mode == 'sync':
+        import logging
+        from werkzeug.serving import make_server
+        from app import create_app
+
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        make_server('127.0.0.1', port, create_app(), threaded=True).serve_forever()
+    else:
+        import uvicorn
+        from asgi import create_asgi_app
+
+        uvicorn.run(create_asgi_app(), host='127.0.0.1', port=port, log_level='warning',
+                    backlog=4096, limit_concurrency=None)
+
+
+async def _request(port, path, token):
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write((f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nAuthorization: Bearer {token}\r\n'
+                      f'Connection: close\r\n\r\n').encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1]), (time.perf_counter() - started) * 1000
+    finally:
+        writer.close()
+
+
+async def load(port, token, concurrency, total):
+    timings = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def client():
+        nonlocal errors
+        for i in counter:
+            try:
+                status, elapsed = await _request(port, PATHS[i % len(PATHS)], token)
+            except OSError:
+                errors += 1
+                continue
+            if status == 200:
+                timings.append(elapsed)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return timings, errors, time.perf_counter() - started
+
+
+def _wait_ready(port, token, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            status, _ = asyncio.run(_request(port, PATHS[0], token))
+            if status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f'Сервер дар порти {port} оғоз нашуд')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[50, 200, 1000])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--port', type=int, default=8790)
+    parser.add_argument('--serve', choices=['sync', 'async'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if not os.environ.get('DATABASE_URL'):
+        path = os.path.join(tempfile.mkdtemp(), 'crm_async_bench.sqlite')
+        os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+
+    if args.serve:
+        return serve(args.serve, args.port)
+
+    token = seed(args.students)
+    print(f'{"mode":<7}{"conc":>6}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}{"errors":>8}')
+    for offset, mode in enumerate(('sync', 'async')):
+        port = args.port + offset
+        server = subprocess.Popen([sys.executable, '-m', 'benchmarks.crm_async', '--serve', mode,
+                                   '--port', str(port)], cwd=ROOT, env=os.environ)
+        try:
+            _wait_ready(port, token)
+            for concurrency in args.concurrency:
+                timings, errors, wall = asyncio.run(load(port, token, concurrency, args.requests))
+                timings.sort()
+                p50 = statistics.median(timings) if timings else 0
+                p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))] if timings else 0
+                print(f'{mode:<7}{concurrency:>6}{len(timings) / wall:>10.1f}{p50:>10.1f}{p99:>10.1f}{errors:>8}')
+        finally:
+            server.terminate()
+            server.wait()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Бенчмаркҳои education_crm/api/all.py
+
+    python -m pytest benchmarks/crm_suite
+"""
+import pytest
+
+STUDENT_EMAIL = 'S000000@bench.tj'
+
+
+@pytest.mark.parametrize('role', ['dean', 'teacher'])
+def test_list_students(benchmark, client, auth, faculty, role):
+    headers = auth(faculty[f'{role}_email'])
+    response = benchmark(client.get, '/api/students', query_string={'limit': 50}, headers=headers)
+    assert response.status_code == 200
+    assert response.json['items']
+
+
+def test_list_students_ndjson(benchmark, client, auth, faculty):
+    headers = auth(faculty['dean_email'])
+    response = benchmark(client.get, '/api/students', query_string={'format': 'ndjson'}, headers=headers)
+    assert response.get_data().count(b'\n') == faculty['students']
+
+
+@pytest.mark.parametrize('role', ['dean', 'teacher', 'student'])
+def test_visibility_counts(benchmark, client, auth, faculty, role):
+    headers = auth(STUDENT_EMAIL if role == 'student' else faculty[f'{role}_email'])
+    response = benchmark(client.get, '/api/visibility/counts', headers=headers)
+    assert response.status_code == 200
+
+
+def test_upsert_exams(benchmark, app, client, auth, faculty):
+    from sqlalchemy import select
+    from api.handlers import find_user
+    from database import db
+    from database.models import Course, Enrollment
+
+    with app.app_context():
+        teacher = find_user(db.session, faculty['teacher_email'])
+        course_id = db.session.execute(select(Course.id).filter_by(teacher_id=teacher.id).order_by(Course.id)).scalar()
+        enrollments = db.session.execute(select(Enrollment.id).filter_by(course_id=course_id)).scalars().all()
+    payload = {
+        'exam_type': 'midterm_2',
+        'date': '2026-10-01',
+        'scores': [{'enrollment_id': eid, 'score': 60 + eid % 40} for eid in enrollments],
+    }
+    headers = auth(faculty['teacher_email'])
+    response = benchmark(client.post, '/api/exams/batch', json=payload, headers=headers)
+    assert len(response.json['saved']) + len(response.json['rejected']) == len(enrollments)
+
+
+def test_roster_attendance(benchmark, app, client, auth, faculty):
+    from sqlalchemy import select
+    from api.handlers import find_user
+    from database import db
+    from database.models import Course, Enrollment
+
+    with app.app_context():
+        teacher = find_user(db.session, faculty['teacher_email'])
+        course_id = db.session.execute(select(Course.id).filter_by(teacher_id=teacher.id).order_by(Course.id)).scalar()
+        students = db.session.execute(
+            select(Enrollment.student_id).filter_by(course_id=course_id).distinct()
+        ).scalars().all()
+    payload = {'course_id': course_id, 'date': '2027-01-15', 'marks': [[sid, sid % 5 != 0, 5] for sid in students]}
+    headers = auth(faculty['teacher_email'])
+    # Аввалин дархост менависад, такрорҳо (retry) бояд арзон бошанд
+    response = benchmark(client.post, '/api/attendance/roster', json=payload, headers=headers)
+    assert len(response.json['saved']) + len(response.json['unchanged']) == len(students)
@@ -0,0 +1,58 @@
+"""education_crm бо маълумоти факултет барои бенчмаркҳо
+
+Модулҳои education_crm (app, config, database) бо номҳои app.py якхелаанд,
+бинобар ин ин пакет дар процесси алоҳидаи pytest иҷро мешавад.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CRM = os.path.join(ROOT, 'education_crm')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, CRM)
+
+from benchmarks.faculty import CRM_MIGRATIONS, bench_database_url, load_crm, reset_schema, shape_from_env  # noqa: E402
+from benchmarks.plans import analyze  # noqa: E402
+
+os.environ['DATABASE_URL'] = bench_database_url('crm_bench')
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import create_app
+    from database import db
+
+    app = create_app()
+    with app.app_context():
+        reset_schema(db, CRM_MIGRATIONS)
+        app.config['FACULTY'] = load_crm(db, shape_from_env())
+        analyze(db.engine)
+        db.session.remove()
+    return app
+
+
+@pytest.fixture(scope='session')
+def faculty(app):
+    return app.config['FACULTY']
+
+
+@pytest.fixture(scope='session')
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(scope='session')
+def auth(app):
+    """Сарлавҳаи Authorization барои корбар аз рӯи email"""
+    from flask_jwt_extended import create_access_token
+    from api.handlers import find_user, identity_for
+    from database import db
+
+    def headers(email):
+        with app.app_context():
+            token = create_access_token(identity=identity_for(find_user(db.session, email)))
+        return {'Authorization': f'Bearer {token}'}
+
+    return headers
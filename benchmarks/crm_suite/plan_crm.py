@@ -0,0 +1,50 @@
+"""Нақшаи дархостҳои асосии education_crm: ҷадвалҳои калон танҳо бо индекс
+
+    python -m pytest benchmarks/crm_suite -k plan
+
+Рӯйхат ва шумораҳои декан ҳамаи сатрҳоро мехонанд ва дар ин рӯйхат нестанд.
+"""
+import pytest
+
+from benchmarks.plans import assert_index_scans
+
+STUDENT_EMAIL = 'S000000@bench.tj'
+
+
+@pytest.fixture(scope='module')
+def engine(app):
+    from database import db
+
+    with app.app_context():
+        return db.engine
+
+
+def test_plan_list_students_teacher(client, auth, faculty, engine):
+    headers = auth(faculty['teacher_email'])
+    with assert_index_scans(engine):
+        response = client.get('/api/students', query_string={'limit': 50}, headers=headers)
+    assert response.json['items']
+
+
+@pytest.mark.parametrize('role', ['teacher', 'student'])
+def test_plan_visibility_counts(client, auth, faculty, role, engine):
+    headers = auth(STUDENT_EMAIL if role == 'student' else faculty['teacher_email'])
+    with assert_index_scans(engine):
+        response = client.get('/api/visibility/counts', headers=headers)
+    assert response.status_code == 200
+
+
+def test_plan_enrollment_attendance(app, faculty, engine):
+    from sqlalchemy import select
+    from database import db
+    from database.models import Attendance, Enrollment
+
+    with app.app_context():
+        enrollment_id = db.session.execute(
+            select(Enrollment.id).filter_by(student_id=faculty['student_id']).limit(1)
+        ).scalar_one()
+        with assert_index_scans(engine):
+            rows = db.session.execute(
+                select(Attendance).filter_by(enrollment_id=enrollment_id).order_by(Attendance.date)
+            ).all()
+    assert rows
@@ -0,0 +1,89 @@
+"""Ҳадди дархостҳои SQL барои endpoint-ҳои асосии education_crm
+
+Ҳамтои benchmarks/app_suite/queries_app.py (database.loading-и app.py дар ин
+процесс ворид карда намешавад - номи пакети database якхела аст).
+
+    python -m pytest benchmarks/crm_suite -k queries
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, select
+
+STUDENT_EMAIL = 'S000000@bench.tj'
+
+
+@pytest.fixture(scope='module')
+def assert_max_queries(app):
+    from database import db
+
+    with app.app_context():
+        engine = db.engine
+
+    @contextmanager
+    def check(limit):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+        if len(statements) > limit:
+            listing = '\n'.join(f'  {i}. {sql}' for i, sql in enumerate(statements, 1))
+            raise AssertionError(f'{len(statements)} дархости SQL (ҳадди аксар {limit}):\n{listing}')
+
+    return check
+
+
+@pytest.fixture(scope='module')
+def teacher_course(app, faculty):
+    from api.handlers import find_user
+    from database import db
+    from database.models import Course, Enrollment
+
+    with app.app_context():
+        teacher = find_user(db.session, faculty['teacher_email'])
+        course_id = db.session.execute(select(Course.id).filter_by(teacher_id=teacher.id).order_by(Course.id)).scalar()
+        enrollments = db.session.execute(
+            select(Enrollment.id, Enrollment.student_id).filter_by(course_id=course_id)
+        ).all()
+    return course_id, enrollments
+
+
+@pytest.mark.parametrize('role, path, query, limit', [
+    ('dean', '/api/students', {'limit': 50}, 1),
+    ('teacher', '/api/students', {'limit': 50}, 1),
+    ('dean', '/api/visibility/counts', {}, 4),
+    ('teacher', '/api/visibility/counts', {}, 4),
+    ('student', '/api/visibility/counts', {}, 4),
+], ids=['students-dean', 'students-teacher', 'counts-dean', 'counts-teacher', 'counts-student'])
+def test_listing_queries(client, auth, faculty, assert_max_queries, role, path, query, limit):
+    headers = auth(STUDENT_EMAIL if role == 'student' else faculty[f'{role}_email'])
+    with assert_max_queries(limit):
+        response = client.get(path, query_string=query, headers=headers)
+    assert response.status_code == 200
+
+
+def test_roster_attendance_queries(client, auth, faculty, assert_max_queries, teacher_course):
+    course_id, enrollments = teacher_course
+    students = sorted({student_id for _, student_id in enrollments})
+    payload = {'course_id': course_id, 'date': '2027-02-01', 'marks': [[sid, 1, 4] for sid in students]}
+    with assert_max_queries(4):
+        response = client.post('/api/attendance/roster', json=payload, headers=auth(faculty['teacher_email']))
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('path, payload, limit', [
+    ('/api/exams/batch', lambda ids: {'exam_type': 'final', 'date': '2027-02-01',
+                                      'scores': [{'enrollment_id': eid, 'score': 70} for eid in ids]}, 3),
+    ('/api/ratings/batch', lambda ids: {'period': '4m', 'ratings': [{'enrollment_id': eid, 'value': 9} for eid in ids]}, 3),
+], ids=['exams', 'ratings'])
+def test_roster_scores_queries(client, auth, faculty, assert_max_queries, teacher_course, path, payload, limit):
+    _, enrollments = teacher_course
+    with assert_max_queries(limit):
+        response = client.post(path, json=payload([eid for eid, _ in enrollments]), headers=auth(faculty['teacher_email']))
+    assert response.status_code == 200
@@ -0,0 +1,424 @@
+"""Генератори детерминистии маълумоти факултет барои бенчмаркҳо
+
+    python -m benchmarks.faculty --database-url sqlite:////tmp/faculty.sqlite --semesters 2
+    python -m benchmarks.faculty --app crm --database-url postgresql://postgres@localhost/bench
+
+Шакл аз config.py гирифта мешавад: COURSES (4 курс), GROUPS_PER_COURSE
+гуруҳ дар ҳар курс ва SUBJECTS_COUNT фан. Фанҳо байни курсҳо ва ду нимсолаи
+ҳар сол тақсим мешаванд; ҳар гуруҳ фанҳои нимсолаҳои охирини худро
+(--semesters) мехонад, ҳар дарс ҳафтае як маротиба (--lessons) мегузарад ва
+барои ҳар донишҷӯ ҳузур ва баҳоҳо сохта мешаванд. Бо ҳамон --seed ва
+--end-date маълумот ҳамеша якхела аст.
+
+Як нақша барои ду схема: load_app() - ҷадвалҳои app.py, load_crm() -
+ҷадвалҳои education_crm (моделҳо дар дохили функсия ворид мешаванд, пас
+модул дар процесси ҳар ду барнома кор мекунад). Скрипт ҷадвалҳоро аз нав
+месозад, бинобар ин пойгоҳ танҳо бо --database-url (ё BENCH_DATABASE_URL)
+дода мешавад, на аз DATABASE_URL.
+"""
+import argparse
+import importlib.util
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CRM = os.path.join(ROOT, 'education_crm')
+APP_MIGRATIONS = os.path.join(ROOT, 'alembic.ini')
+CRM_MIGRATIONS = os.path.join(CRM, 'alembic.ini')
+PASSWORD = 'bench-password'
+DEAN_EMAIL = 'dean@bench.tj'
+TEACHER_EMAIL = 'teacher0@bench.tj'
+
+FIRST_NAMES = ['Ҳасан', 'Ҷамшед', 'Зарина', 'Нигина', 'Фарҳод', 'Қодир', 'Ғафур',
+               'Ӯлмас', 'Шаҳло', 'Манижа', 'Фирӯза', 'Рустам', 'Сӯҳроб', 'Дилшод']
+LAST_NAMES = ['Раҳимов', 'Ҷӯраев', 'Қодиров', 'Ҳакимова', 'Ғаниев', 'Назаров',
+              'Саидова', 'Шарипов', 'Мирзоева', 'Тошматов', 'Ҳусейнов', 'Каримова']
+SPECIALTIES = ['ИТ', 'ЭК', 'ҲУ', 'МТ']
+GROUP_LETTERS = 'АБВГДЕЖЗИКЛМНОП'
+GRADE_TYPES = ('activity', 'midterm_1', 'midterm_2', 'final')
+# Тақсимоти ҳолатҳои ҳузур (ҳиссаи ҷамъшуда)
+STATUS_WEIGHTS = (('present', 0.85), ('late', 0.90), ('absent', 0.97), ('excused', 1.0))
+SEMESTER_DAYS = 182
+BATCH = 5000
+
+
+def faculty_config():
+    """Config-и app.py (аз рӯи роҳ, то дар процесси education_crm низ кор кунад)"""
+    spec = importlib.util.spec_from_file_location('faculty_config', os.path.join(ROOT, 'config.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.Config
+
+
+class FacultyShape:
+    """Андозаи маълумот; пешфарзҳо - шакли факултет аз config.py"""
+
+    def __init__(self, students_per_group=25, semesters=2, lessons_per_semester=16,
+                 teachers=60, seed=42, end_date=None):
+        config = faculty_config()
+        self.courses = len(config.COURSES)
+        self.groups_per_course = config.GROUPS_PER_COURSE
+        self.subjects = config.SUBJECTS_COUNT
+        self.students_per_group = students_per_group
+        self.semesters = semesters
+        self.lessons_per_semester = lessons_per_semester
+        self.teachers = teachers
+        self.seed = seed
+        self.end_date = end_date or date.today()
+
+    @property
+    def groups(self):
+        return self.courses * self.groups_per_course
+
+    def as_dict(self):
+        return {
+            'courses': self.courses,
+            'groups_per_course': self.groups_per_course,
+            'subjects': self.subjects,
+            'students_per_group': self.students_per_group,
+            'semesters': self.semesters,
+            'lessons_per_semester': self.lessons_per_semester,
+            'teachers': self.teachers,
+            'seed': self.seed,
+        }
+
+
+class FacultyPlan:
+    """Нақшаи маълумот: гуруҳҳо, фанҳо, донишҷӯён ва дарсҳо бо id-ҳои собит"""
+
+    def __init__(self, shape):
+        self.shape = shape
+        rng = random.Random(shape.seed)
+
+        # Фан: (id, ном, рамз, кредит, курс, нимсола аз 1 то 2*курсҳо)
+        self.subjects = []
+        for i in range(shape.subjects):
+            course_number = i * shape.courses // shape.subjects + 1
+            semester = 2 * (course_number - 1) + i % 2 + 1
+            self.subjects.append((i + 1, f'Фанни {i + 1}', f'F{i + 1:03d}', rng.choice((2, 3, 4, 5)),
+                                  course_number, semester))
+
+        # Гуруҳ: (id, ном, курс)
+        self.groups = []
+        for g in range(shape.groups):
+            course_number = g // shape.groups_per_course + 1
+            index = g % shape.groups_per_course
+            name = f'{course_number}-{SPECIALTIES[index % len(SPECIALTIES)]}-{GROUP_LETTERS[index]}'
+            self.groups.append((g + 1, name, course_number))
+
+        # Донишҷӯ: (id, гуруҳ, насаб, ном, рамз)
+        self.students = []
+        for g in range(shape.groups):
+            for _ in range(shape.students_per_group):
+                i = len(self.students)
+                self.students.append((i + 1, g + 1, rng.choice(LAST_NAMES), rng.choice(FIRST_NAMES), f'S{i:06d}'))
+
+        # Дарс (фан × гуруҳ × нимсола): (id, фан, гуруҳ, муаллим, нимсола, санаи охир, ҷорӣ)
+        # Нимсолаи ҷории гуруҳи курси k - 2k-1; нимсолаҳои пештара ба ақиб
+        by_semester = {}
+        for subject in self.subjects:
+            by_semester.setdefault(subject[5], []).append(subject)
+        self.offerings = []
+        for group_id, _, course_number in self.groups:
+            current = 2 * course_number - 1
+            for semester in range(max(1, current - shape.semesters + 1), current + 1):
+                ends = shape.end_date - timedelta(days=(current - semester) * SEMESTER_DAYS)
+                for subject in by_semester.get(semester, []):
+                    teacher = (subject[0] - 1) % shape.teachers
+                    self.offerings.append((len(self.offerings) + 1, subject[0], group_id, teacher,
+                                           semester, ends, semester == current))
+
+        self.students_by_group = {}
+        for student in self.students:
+            self.students_by_group.setdefault(student[1], []).append(student)
+
+    def lesson_dates(self, offering):
+        """Санаҳои дарс: ҳафтае як маротиба то санаи охири нимсола"""
+        _, subject_id, _, _, _, ends, _ = offering
+        last = ends - timedelta(days=subject_id % 5)
+        count = self.shape.lessons_per_semester
+        return [last - timedelta(weeks=count - 1 - week) for week in range(count)]
+
+    def attendance(self):
+        """(дарс, донишҷӯ, сана, ҳолат, фаъолнокӣ) бо тартиби собит"""
+        rng = random.Random(self.shape.seed + 1)
+        for offering in self.offerings:
+            dates = self.lesson_dates(offering)
+            for student in self.students_by_group[offering[2]]:
+                for day in dates:
+                    roll = rng.random()
+                    status = next(name for name, limit in STATUS_WEIGHTS if roll < limit)
+                    activity = round(rng.uniform(3, 6.5), 1) if status in ('present', 'late') else None
+                    yield offering, student, day, status, activity
+
+    def grades(self):
+        """(дарс, донишҷӯ, навъ, хол, сана); дар нимсолаи ҷорӣ танҳо activity ва midterm_1"""
+        rng = random.Random(self.shape.seed + 2)
+        for offering in self.offerings:
+            types = GRADE_TYPES[:2] if offering[6] else GRADE_TYPES
+            taken = offering[5]
+            for student in self.students_by_group[offering[2]]:
+                for grade_type in types:
+                    yield offering, student, grade_type, round(rng.uniform(45, 100), 2), taken
+
+    def teacher_offerings(self, teacher):
+        return [o for o in self.offerings if o[3] == teacher]
+
+    def summary(self):
+        """Маълумот барои бенчмаркҳо: корбарон ва объектҳои намунавӣ"""
+        current = next(o for o in self.teacher_offerings(0) if o[6])
+        return {
+            'shape': self.shape.as_dict(),
+            'password': PASSWORD,
+            'dean_email': DEAN_EMAIL,
+            'teacher_email': TEACHER_EMAIL,
+            'course_id': current[0],
+            'course_dates': self.lesson_dates(current),
+            'group_id': current[2],
+            'student_id': self.students_by_group[current[2]][0][0],
+            'students': len(self.students),
+            'offerings': len(self.offerings),
+        }
+
+
+def shape_from_env():
+    """FacultyShape аз BENCH_STUDENTS_PER_GROUP ва BENCH_SEMESTERS (барои pytest)"""
+    return FacultyShape(students_per_group=int(os.environ.get('BENCH_STUDENTS_PER_GROUP', 25)),
+                        semesters=int(os.environ.get('BENCH_SEMESTERS', 2)))
+
+
+def bench_database_url(name):
+    """BENCH_DATABASE_URL ё файли SQLite-и муваққатӣ"""
+    url = os.environ.get('BENCH_DATABASE_URL')
+    if url:
+        return url
+    return 'sqlite:///' + os.path.join(tempfile.mkdtemp(), f'{name}.sqlite')
+
+
+def reset_schema(db, migrations=None):
+    """Ҳамаи ҷадвалҳои пойгоҳ (аз ҷумла ҷадвалҳои барномаи дигар) аз нав
+
+    Бо `migrations` (роҳи alembic.ini) схема бо alembic upgrade head сохта
+    мешавад, бе он - бо db.create_all().
+    """
+    from sqlalchemy import MetaData
+
+    existing = MetaData()
+    existing.reflect(db.engine)
+    if db.engine.dialect.name == 'postgresql':
+        # Partition-ҳо бо ҷадвали асосӣ нест мешаванд
+        with db.engine.connect() as conn:
+            partitions = set(conn.execute(db.text('SELECT relname FROM pg_class WHERE relispartition')).scalars())
+        for table in list(existing.tables.values()):
+            if table.name in partitions:
+                existing.remove(table)
+    existing.drop_all(db.engine)
+    if migrations is None:
+        db.create_all()
+        return
+
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(migrations)
+    with db.engine.begin() as conn:
+        config.attributes['connection'] = conn
+        command.upgrade(config, 'head')
+
+
+def _insert(db, table, rows):
+    """Сатрҳо бо қисмҳои BATCH (генераторҳо пурра ба хотира бор намешаванд)"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH:
+            db.session.execute(table.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(table.insert(), batch)
+
+
+def _reset_sequences(db, tables):
+    # id-ҳо дастӣ дода шуданд; дар PostgreSQL sequence-ҳо бояд пеш раванд
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for table in tables:
+        db.session.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+        ))
+
+
+def load_app(db, shape):
+    """Маълумот ба ҷадвалҳои app.py (ҷадвалҳо бояд холӣ бошанд)"""
+    from werkzeug.security import generate_password_hash
+    from database.models import User, Teacher, Group, Subject, Student, Course, Attendance, Grade
+    from database.partitions import ensure_partitions
+    from services.rollups import rebuild_rollups
+    from services.search import fold
+
+    plan = FacultyPlan(shape)
+    password_hash = generate_password_hash(PASSWORD, method='scrypt:1024:8:1')
+    staff = 2 + shape.teachers
+
+    users = [
+        {'id': 1, 'email': DEAN_EMAIL, 'first_name': 'Декан', 'last_name': 'Бенч', 'role': 'dean'},
+        {'id': 2, 'email': 'vice_dean@bench.tj', 'first_name': 'Замдекан', 'last_name': 'Бенч', 'role': 'vice_dean'},
+    ] + [
+        {'id': 3 + t, 'email': f'teacher{t}@bench.tj', 'first_name': FIRST_NAMES[t % len(FIRST_NAMES)],
+         'last_name': f'Муаллим{t}', 'role': 'teacher'}
+        for t in range(shape.teachers)
+    ]
+    for user in users:
+        user.update(password_hash=password_hash, is_active=True)
+    _insert(db, User.__table__, users + [
+        {'id': staff + sid, 'email': f'{code}@bench.tj', 'password_hash': '-', 'first_name': first,
+         'last_name': last, 'role': 'student', 'is_active': True}
+        for sid, _, last, first, code in plan.students
+    ])
+    _insert(db, Teacher.__table__, [
+        {'id': t + 1, 'user_id': 3 + t, 'employee_id': f'T{t:04d}', 'department': 'Бенч'}
+        for t in range(shape.teachers)
+    ])
+    _insert(db, Group.__table__, [
+        {'id': gid, 'name': name, 'course_number': course_number, 'is_active': True}
+        for gid, name, course_number in plan.groups
+    ])
+    _insert(db, Subject.__table__, [
+        {'id': sid, 'name': name, 'code': code, 'credits': credits, 'course_number': course_number,
+         'semester': semester, 'hours_total': 64, 'is_active': True}
+        for sid, name, code, credits, course_number, semester in plan.subjects
+    ])
+    _insert(db, Student.__table__, [
+        {'id': sid, 'user_id': staff + sid, 'student_id': code, 'group_id': gid, 'status': 'active',
+         'search_key': fold(f'{last} {first} {code}')}
+        for sid, gid, last, first, code in plan.students
+    ])
+    _insert(db, Course.__table__, [
+        {'id': oid, 'subject_id': subject_id, 'teacher_id': teacher + 1, 'group_id': gid, 'semester': semester,
+         'academic_year': f'{ends.year - 1}-{ends.year}', 'end_date': ends, 'is_active': current}
+        for oid, subject_id, gid, teacher, semester, ends, current in plan.offerings
+    ])
+    # Дар PostgreSQL: partition-ҳои моҳона барои тамоми давраи маълумот
+    first_lesson = min(plan.lesson_dates(offering)[0] for offering in plan.offerings)
+    ensure_partitions(db.session.connection(), first_lesson, shape.end_date)
+    _insert(db, Attendance.__table__, (
+        {'course_id': offering[0], 'student_id': student[0], 'date': day, 'status': status,
+         'activity_score': activity, 'created_by': 3 + offering[3]}
+        for offering, student, day, status, activity in plan.attendance()
+    ))
+    rebuild_rollups(db.session)
+    _insert(db, Grade.__table__, (
+        {'course_id': offering[0], 'student_id': student[0], 'grade_type': grade_type, 'score': score,
+         'date_taken': taken, 'created_by': 3 + offering[3]}
+        for offering, student, grade_type, score, taken in plan.grades()
+    ))
+    _reset_sequences(db, (User.__table__, Teacher.__table__, Group.__table__, Subject.__table__,
+                          Student.__table__, Course.__table__))
+    db.session.commit()
+    return plan.summary()
+
+
+def load_crm(db, shape):
+    """Маълумот ба ҷадвалҳои education_crm; дарс - фан (Course) ва Enrollment-ҳо"""
+    from api.handlers import refresh_teacher_scope
+    from database.models import User, Group, Course, Student, Enrollment, Attendance, Exam
+
+    plan = FacultyPlan(shape)
+    staff = 1 + shape.teachers
+
+    _insert(db, User.__table__, [
+        {'id': 1, 'email': DEAN_EMAIL, 'password_hash': '-', 'role': 'dean', 'full_name': 'Декан Бенч'},
+    ] + [
+        {'id': 2 + t, 'email': f'teacher{t}@bench.tj', 'password_hash': '-', 'role': 'teacher',
+         'full_name': f'Муаллим{t} {FIRST_NAMES[t % len(FIRST_NAMES)]}'}
+        for t in range(shape.teachers)
+    ] + [
+        {'id': staff + sid, 'email': f'{code}@bench.tj', 'password_hash': '-', 'role': 'student',
+         'full_name': f'{last} {first}'}
+        for sid, _, last, first, code in plan.students
+    ])
+    _insert(db, Group.__table__, [
+        {'id': gid, 'name': name, 'course_year': course_number} for gid, name, course_number in plan.groups
+    ])
+    _insert(db, Course.__table__, [
+        {'id': sid, 'code': code, 'title': name, 'total_hours': 64,
+         'teacher_id': 2 + (sid - 1) % shape.teachers}
+        for sid, name, code, _, _, _ in plan.subjects
+    ])
+    _insert(db, Student.__table__, [
+        {'id': sid, 'user_id': staff + sid, 'group_id': gid, 'student_uid': code}
+        for sid, gid, _, _, code in plan.students
+    ])
+
+    # Enrollment барои ҳар (донишҷӯ, дарс); id-ҳо пешакӣ ҳисоб мешаванд
+    enrollment_ids = {}
+    enrollments = []
+    for offering in plan.offerings:
+        _, subject_id, gid, _, semester, ends, _ = offering
+        for student in plan.students_by_group[gid]:
+            enrollment_ids[(offering[0], student[0])] = len(enrollments) + 1
+            enrollments.append({'id': len(enrollments) + 1, 'student_id': student[0], 'course_id': subject_id,
+                                'year': ends.year, 'semester': 2 - semester % 2})
+    _insert(db, Enrollment.__table__, enrollments)
+    _insert(db, Attendance.__table__, (
+        {'enrollment_id': enrollment_ids[(offering[0], student[0])], 'date': day,
+         'present': status in ('present', 'late'), 'activity_score': activity, 'created_by': 2 + offering[3]}
+        for offering, student, day, status, activity in plan.attendance()
+    ))
+    _insert(db, Exam.__table__, (
+        {'enrollment_id': enrollment_ids[(offering[0], student[0])], 'exam_type': grade_type, 'score': score,
+         'date': taken, 'created_by': 2 + offering[3]}
+        for offering, student, grade_type, score, taken in plan.grades() if grade_type != 'activity'
+    ))
+    _reset_sequences(db, (User.__table__, Group.__table__, Course.__table__, Student.__table__,
+                          Enrollment.__table__))
+    # Enrollment-ҳо бе handlers навишта шуданд - доираи муаллимон аз нав
+    refresh_teacher_scope(db.session)
+    db.session.commit()
+    return plan.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--app', choices=['root', 'crm'], default='root')
+    parser.add_argument('--students-per-group', type=int, default=25)
+    parser.add_argument('--semesters', type=int, default=2)
+    parser.add_argument('--lessons', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--end-date', type=date.fromisoformat)
+    parser.add_argument('--database-url', default=os.environ.get('BENCH_DATABASE_URL'))
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error('--database-url ё BENCH_DATABASE_URL лозим аст')
+    os.environ['DATABASE_URL'] = args.database_url
+
+    shape = FacultyShape(students_per_group=args.students_per_group, semesters=args.semesters,
+                         lessons_per_semester=args.lessons, seed=args.seed, end_date=args.end_date)
+    if args.app == 'crm':
+        os.chdir(CRM)
+        sys.path.insert(0, CRM)
+        from app import create_app
+        from database import db
+        load = load_crm
+        migrations = CRM_MIGRATIONS
+    else:
+        sys.path.insert(0, ROOT)
+        from app import create_app
+        from database.models import db
+        load = load_app
+        migrations = APP_MIGRATIONS
+
+    app = create_app()
+    with app.app_context():
+        reset_schema(db, migrations)
+        summary = load(db, shape)
+    print(f"{summary['students']} донишҷӯ, {summary['offerings']} дарс дар {app.config['SQLALCHEMY_DATABASE_URI']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
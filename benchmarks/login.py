@@ -0,0 +1,185 @@
+"""Бенчмарки ворид шудан ҳангоми сарбории ҳамзамон
+
+    python -m benchmarks.login --app root --concurrency 32 --logins 400
+    python -m benchmarks.login --app crm
+    python -m benchmarks.login --app both
+
+root - POST /login (app.py), crm - POST /api/auth/login (education_crm).
+Барнома дар сервери threaded-и werkzeug бо SQLite-и муваққатӣ (ё
+DATABASE_URL) оғоз мешавад. Ҳамзамон бо воридшавӣ як дархости сабук
+(--probe) фиристода мешавад, то дида шавад, ки дигар саҳифаҳо интизор
+намемонанд. Натиҷа: logins/sec, p50/p99 ва шумораи 503 (навбати пур).
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = 'bench-password'
+
+
+def _setup_root(users):
+    sys.path.insert(0, ROOT)
+    from app import create_app
+    from database.models import db, User
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if not User.query.filter(User.email.like('bench%')).first():
+            template = User(email='-', first_name='-', last_name='-', role='teacher')
+            template.set_password(PASSWORD, app.config['PASSWORD_HASH_METHOD'])
+            db.session.execute(User.__table__.insert(), [
+                {'email': f'bench{i}@university.tj', 'password_hash': template.password_hash,
+                 'first_name': 'Бенч', 'last_name': f'Корбар{i}', 'role': 'teacher', 'is_active': True}
+                for i in range(users)
+            ])
+            db.session.commit()
+
+    def login_request(i):
+        body = urlencode({'email': f'bench{i % users}@university.tj', 'password': PASSWORD})
+        return 'POST', '/login', body, {'Content-Type': 'application/x-www-form-urlencoded'}, (302,)
+
+    probe = ('GET', '/', None, {}, (302,))
+    return app, login_request, probe
+
+
+def _setup_crm(users):
+    crm = os.path.join(ROOT, 'education_crm')
+    os.chdir(crm)
+    sys.path.insert(0, crm)
+    from app import create_app
+    from database import db
+    from database.models import User
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if not db.session.execute(db.select(User).filter(User.email.like('bench%'))).first():
+            template = User(email='-', role='teacher', full_name='-')
+            template.set_password(PASSWORD, app.config['BCRYPT_ROUNDS'])
+            db.session.execute(User.__table__.insert(), [
+                {'email': f'bench{i}@university.tj', 'password_hash': template.password_hash,
+                 'role': 'teacher', 'full_name': f'Bench {i}'}
+                for i in range(users)
+            ])
+            db.session.commit()
+
+    def login_request(i):
+        body = json.dumps({'email': f'bench{i % users}@university.tj', 'password': PASSWORD})
+        return 'POST', '/api/auth/login', body, {'Content-Type': 'application/json'}, (200,)
+
+    probe = ('GET', '/api/hello', None, {}, (200,))
+    return app, login_request, probe
+
+
+def _percentile(timings, q):
+    if not timings:
+        return 0.0
+    return timings[min(len(timings) - 1, int(len(timings) * q))]
+
+
+def _send(port, method, path, body, headers):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    started = time.perf_counter()
+    try:
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        return response.status, (time.perf_counter() - started) * 1000
+    finally:
+        conn.close()
+
+
+def run(name, args):
+    from werkzeug.serving import make_server
+
+    setup = _setup_root if name == 'root' else _setup_crm
+    app, login_request, probe = setup(args.users)
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # Гарм кардан: пайвастҳо, кэшҳо ва thread-ҳои ҳисоби парол
+    for i in range(min(args.concurrency, args.logins)):
+        _send(port, *login_request(i)[:4])
+
+    login_times = []
+    statuses = {}
+    probe_times = []
+    done = threading.Event()
+
+    def probe_loop():
+        while not done.is_set():
+            status, elapsed = _send(port, *probe[:4])
+            if status in probe[4]:
+                probe_times.append(elapsed)
+            time.sleep(args.probe_interval)
+
+    def one_login(i):
+        method, path, body, headers, expected = login_request(i)
+        status, elapsed = _send(port, method, path, body, headers)
+        statuses[status] = statuses.get(status, 0) + 1
+        if status in expected:
+            login_times.append(elapsed)
+
+    prober = threading.Thread(target=probe_loop, daemon=True)
+    prober.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one_login, range(args.logins)))
+    wall = time.perf_counter() - started
+    done.set()
+    prober.join()
+    server.shutdown()
+
+    login_times.sort()
+    probe_times.sort()
+    print(f'[{name}] {args.logins} logins, concurrency {args.concurrency}, statuses {dict(sorted(statuses.items()))}')
+    print(f'[{name}] logins/sec {len(login_times) / wall:8.1f}   '
+          f'p50 {statistics.median(login_times) if login_times else 0:8.1f} ms   '
+          f'p99 {_percentile(login_times, 0.99):8.1f} ms')
+    print(f'[{name}] probe ({len(probe_times)} requests)   '
+          f'p50 {statistics.median(probe_times) if probe_times else 0:8.1f} ms   '
+          f'p99 {_percentile(probe_times, 0.99):8.1f} ms')
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--app', choices=['root', 'crm', 'both'], default='both')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--logins', type=int, default=400)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--probe-interval', type=float, default=0.01)
+    args = parser.parse_args()
+
+    if args.app == 'both':
+        # Ҳар барнома дар процесси алоҳида: config ва database номҳои якхела доранд
+        code = 0
+        for name in ('root', 'crm'):
+            argv = [sys.executable, '-m', 'benchmarks.login', '--app', name] + \
+                [a for a in sys.argv[1:] if not a.startswith('--app') and a not in ('root', 'crm', 'both')]
+            code |= subprocess.call(argv, cwd=ROOT)
+        return code
+
+    if not os.environ.get('DATABASE_URL'):
+        path = os.path.join(tempfile.mkdtemp(), f'login_bench_{args.app}.sqlite')
+        os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    return run(args.app, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Санҷиши нақшаи дархостҳо: Seq Scan дар ҷадвалҳои калон хато аст
+
+    with assert_index_scans(db.engine):
+        client.get('/api/students/search', query_string={'q': 'раҳимов'})
+
+Ҳамаи SELECT/UPDATE/DELETE-ҳое, ки дар дохили блок иҷро шуданд, бо ҳамон
+параметрҳо аз нав бо EXPLAIN (PostgreSQL) ё EXPLAIN QUERY PLAN (SQLite)
+санҷида мешаванд. Ҷадвал (ё partition) калон аст, агар аз `min_rows` зиёд
+сатр дошта бошад; пеш аз санҷиш analyze() омори планнерро нав мекунад.
+"""
+import json
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import event, inspect, text
+
+LARGE_TABLE_ROWS = 10000
+EXPLAINED = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+# SQLite: "SCAN attendance" ё "SCAN a" (бо ном ё alias); "SEARCH ..." - бо индекс
+_SQLITE_SCAN = re.compile(r'^SCAN (\w+)(?! USING (?:COVERING )?INDEX)')
+
+
+def analyze(engine):
+    with engine.begin() as conn:
+        conn.execute(text('ANALYZE'))
+
+
+def large_tables(conn, min_rows=LARGE_TABLE_ROWS):
+    if conn.dialect.name == 'postgresql':
+        return set(conn.execute(text(
+            "SELECT relname FROM pg_class WHERE relkind = 'r' AND reltuples > :rows "
+            "AND relnamespace = 'public'::regnamespace"
+        ), {'rows': min_rows}).scalars())
+    return {
+        table for table in inspect(conn).get_table_names()
+        if conn.execute(text(f'SELECT COUNT(*) FROM "{table}"')).scalar() > min_rows
+    }
+
+
+def seq_scans(conn, statement, parameters):
+    """Ҷадвалҳое, ки нақшаи дархост пурра мехонад"""
+    if conn.dialect.name == 'postgresql':
+        plan = conn.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + statement, parameters).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return sorted(_pg_seq_scans(plan[0]['Plan']))
+
+    scans = []
+    aliases = _sqlite_aliases(statement)
+    for row in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters):
+        match = _SQLITE_SCAN.match(row[-1])
+        if match:
+            scans.append(aliases.get(match.group(1), match.group(1)))
+    return sorted(scans)
+
+
+def _pg_seq_scans(node):
+    if node['Node Type'] == 'Seq Scan':
+        yield node['Relation Name']
+    for child in node.get('Plans', ()):
+        yield from _pg_seq_scans(child)
+
+
+def _sqlite_aliases(statement):
+    return {alias: table for table, alias in re.findall(r'\b(?:FROM|JOIN)\s+"?(\w+)"?\s+AS\s+"?(\w+)', statement)}
+
+
+@contextmanager
+def assert_index_scans(engine, min_rows=LARGE_TABLE_ROWS):
+    """Хато, агар ягон дархости блок ҷадвали калонро бе индекс хонад"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(EXPLAINED):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    problems = []
+    with engine.connect() as conn:
+        large = large_tables(conn, min_rows)
+        for statement, parameters in statements:
+            scanned = [table for table in seq_scans(conn, statement, parameters) if table in large]
+            if scanned:
+                problems.append(f"  {', '.join(scanned)}: {' '.join(statement.split())[:400]}")
+    if problems:
+        raise AssertionError(f'Seq Scan дар ҷадвалҳои калон (> {min_rows} сатр):\n' + '\n'.join(problems))
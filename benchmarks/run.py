@@ -0,0 +1,136 @@
+"""Иҷрои бенчмаркҳои pytest дар SQLite ва PostgreSQL ва муқоиса бо baseline
+
+    python -m benchmarks.run                                   # SQLite, муқоиса
+    python -m benchmarks.run --db sqlite postgres --postgres-url postgresql://postgres@localhost/bench
+    python -m benchmarks.run --db sqlite postgres --save       # навсозии baseline
+
+Ҳар пакет (app_suite - app.py, crm_suite - education_crm) дар процесси
+алоҳидаи pytest бо маълумоти benchmarks.faculty иҷро мешавад. Натиҷа ба
+benchmarks/baselines/<пакет>-<пойгоҳ>.json навишта мешавад (--save) ё бо он
+муқоиса мешавад: агар медианаи ягон бенчмарк аз baseline беш аз
+--tolerance (ҳисса) зиёд бошад, скрипт бо рамзи 1 анҷом меёбад.
+Пойгоҳи PostgreSQL пурра аз нав сохта мешавад - танҳо пойгоҳи алоҳида диҳед.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS = os.path.join(ROOT, 'benchmarks')
+BASELINES = os.path.join(BENCHMARKS, 'baselines')
+SUITES = ('app_suite', 'crm_suite')
+
+
+def run_suite(suite, database_url, env):
+    """pytest-и як пакет; натиҷаи кӯтоҳшуда ё None ҳангоми хато"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'result.json')
+        command = [sys.executable, '-m', 'pytest', os.path.join(BENCHMARKS, suite), '-q',
+                   f'--benchmark-json={output}']
+        env = dict(env)
+        if database_url:
+            env['BENCH_DATABASE_URL'] = database_url
+        else:
+            env.pop('BENCH_DATABASE_URL', None)
+        if subprocess.run(command, cwd=ROOT, env=env).returncode != 0:
+            return None
+        with open(output, encoding='utf-8') as f:
+            return summarize(json.load(f), env)
+
+
+def summarize(report, env):
+    """Танҳо омори лозимӣ аз JSON-и pytest-benchmark (барои diff-и хоно)"""
+    return {
+        'shape': {
+            'students_per_group': int(env.get('BENCH_STUDENTS_PER_GROUP', 25)),
+            'semesters': int(env.get('BENCH_SEMESTERS', 2)),
+        },
+        'machine': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'benchmarks': {
+            bench['name']: {key: round(bench['stats'][key], 6) for key in ('min', 'median', 'mean', 'stddev')}
+            | {'rounds': bench['stats']['rounds']}
+            for bench in report['benchmarks']
+        },
+    }
+
+
+def compare(name, result, baseline, tolerance):
+    """Ҷадвали муқоиса; рӯйхати бенчмаркҳои сусттаршуда"""
+    regressions = []
+    print(f'\n{name}')
+    print(f'{"benchmark":<44}{"base ms":>10}{"now ms":>10}{"ratio":>8}')
+    for bench, stats in sorted(result['benchmarks'].items()):
+        base = baseline['benchmarks'].get(bench)
+        now = stats['median'] * 1000
+        if base is None:
+            print(f'{bench:<44}{"-":>10}{now:>10.2f}{"new":>8}')
+            continue
+        ratio = stats['median'] / base['median']
+        flag = ' !' if ratio > 1 + tolerance else ''
+        print(f'{bench:<44}{base["median"] * 1000:>10.2f}{now:>10.2f}{ratio:>8.2f}{flag}')
+        if flag:
+            regressions.append(f'{name}: {bench} ({ratio:.2f}x)')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', nargs='+', choices=['sqlite', 'postgres'], default=['sqlite'])
+    parser.add_argument('--postgres-url', default=os.environ.get('BENCH_POSTGRES_URL'))
+    parser.add_argument('--suite', nargs='+', choices=SUITES, default=list(SUITES))
+    parser.add_argument('--students-per-group', type=int, default=25)
+    parser.add_argument('--semesters', type=int, default=2)
+    parser.add_argument('--save', action='store_true', help='baseline-ро бо натиҷаи нав иваз кардан')
+    parser.add_argument('--tolerance', type=float, default=0.5)
+    args = parser.parse_args()
+
+    if 'postgres' in args.db and not args.postgres_url:
+        parser.error('барои --db postgres --postgres-url ё BENCH_POSTGRES_URL лозим аст')
+
+    env = dict(os.environ, BENCH_STUDENTS_PER_GROUP=str(args.students_per_group),
+               BENCH_SEMESTERS=str(args.semesters))
+    failed = []
+    regressions = []
+    for db_name in args.db:
+        database_url = args.postgres_url if db_name == 'postgres' else None
+        for suite in args.suite:
+            name = f'{suite}-{db_name}'
+            result = run_suite(suite, database_url, env)
+            if result is None:
+                failed.append(name)
+                continue
+
+            path = os.path.join(BASELINES, f'{name}.json')
+            if args.save:
+                os.makedirs(BASELINES, exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(result, f, indent=2, sort_keys=True)
+                    f.write('\n')
+                print(f'Baseline навишта шуд: {os.path.relpath(path, ROOT)}')
+            elif os.path.exists(path):
+                with open(path, encoding='utf-8') as f:
+                    baseline = json.load(f)
+                if baseline['shape'] != result['shape']:
+                    print(f'{name}: андозаи маълумот аз baseline фарқ дорад, муқоиса нашуд')
+                    continue
+                regressions += compare(name, result, baseline, args.tolerance)
+            else:
+                print(f'{name}: baseline нест (--save)')
+
+    for name in failed:
+        print(f'Хато: {name}')
+    for line in regressions:
+        print(f'Сусттар шуд: {line}')
+    return 1 if failed or regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
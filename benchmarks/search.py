@@ -0,0 +1,99 @@
+"""Бенчмарки ҷустуҷӯи донишҷӯён
+
+    python -m benchmarks.search --students 50000
+
+Пойгоҳи маълумот аз DATABASE_URL гирифта мешавад (пешфарз - SQLite-и
+муваққатӣ). Вақти ҳар дархост ҷустуҷӯ дар индекс ва гирифтани сатрҳо аз
+пойгоҳро дар бар мегирад. Агар p95 аз --budget-ms зиёд бошад, скрипт бо
+рамзи 1 анҷом меёбад.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+FIRST_NAMES = ['Ҳасан', 'Ҷамшед', 'Зарина', 'Нигина', 'Фарҳод', 'Қодир', 'Ғафур',
+               'Ӯлмас', 'Шаҳло', 'Манижа', 'Фирӯза', 'Рустам', 'Сӯҳроб', 'Дилшод']
+LAST_NAMES = ['Раҳимов', 'Ҷӯраев', 'Қодиров', 'Ҳакимова', 'Ғаниев', 'Назаров',
+              'Саидова', 'Шарипов', 'Мирзоева', 'Тошматов', 'Ҳусейнов', 'Каримова']
+QUERIES = ['хасан', 'Ҳасан', 'чурае', 'ҷӯраев', 'кодиров', 'S0012', 'мирзо', 'ш', 'рустам назар']
+
+
+def seed(db, students_count, groups_count=44):
+    from database.models import User, Student, Group
+    from services.search import fold
+
+    rng = random.Random(42)
+    db.session.execute(Group.__table__.insert(), [
+        {'name': f'Г-{i}', 'course_number': i % 4 + 1, 'is_active': True}
+        for i in range(groups_count)
+    ])
+
+    batch = 5000
+    for start in range(0, students_count, batch):
+        users = []
+        students = []
+        for i in range(start, min(start + batch, students_count)):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            student_id = f'S{i:06d}'
+            users.append({'id': i + 1, 'email': f'{student_id}@university.tj', 'password_hash': '-',
+                          'first_name': first, 'last_name': last, 'role': 'student', 'is_active': True})
+            students.append({'id': i + 1, 'user_id': i + 1, 'student_id': student_id,
+                             'group_id': i % groups_count + 1, 'status': 'active',
+                             'search_key': fold(f'{last} {first} {student_id}')})
+        db.session.execute(User.__table__.insert(), users)
+        db.session.execute(Student.__table__.insert(), students)
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--budget-ms', type=float, default=20.0)
+    args = parser.parse_args()
+
+    if not os.environ.get('DATABASE_URL'):
+        path = os.path.join(tempfile.mkdtemp(), 'search_bench.sqlite')
+        os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+
+    from app import create_app
+    from database.models import db, Student, Group
+    from services.search import ensure_index, search_student_ids, load_ranked
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if not Student.query.first():
+            print(f'Тайёр кардани {args.students} донишҷӯ...')
+            seed(db, args.students)
+
+        started = time.perf_counter()
+        ensure_index()
+        print(f'Индекс: {(time.perf_counter() - started) * 1000:.0f} ms')
+
+        over_budget = False
+        print(f'{"query":<16}{"rows":>6}{"p50 ms":>10}{"p95 ms":>10}')
+        for text in QUERIES:
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                ids = search_student_ids(text, limit=args.limit)
+                rows = load_ranked(Student.query.join(Student.user).join(Group), ids)
+                timings.append((time.perf_counter() - started) * 1000)
+                db.session.expunge_all()
+            timings.sort()
+            p50 = statistics.median(timings)
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            over_budget = over_budget or p95 > args.budget_ms
+            print(f'{text:<16}{len(rows):>6}{p50:>10.2f}{p95:>10.2f}')
+
+    return 1 if over_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
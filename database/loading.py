@@ -0,0 +1,87 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
+
+from database.models import db, Student, Teacher, Course
+
+# Профилҳои боркунӣ: ҳар профил муносибатҳоеро, ки саҳифа/endpoint мехонад,
+# пешакӣ бор мекунад. Many-to-one - joinedload (ҳамон дархост),
+# one-to-many - selectinload (як дархости иловагӣ барои ҳамаи сатрҳо).
+LOAD_PROFILES = {
+    # Корти донишҷӯ: ном ва гуруҳ (ҷустуҷӯ, рӯйхатҳо)
+    'student_card': lambda: [
+        joinedload(Student.user),
+        joinedload(Student.group),
+    ],
+    # Ҳамон корт барои дархостҳое, ки users ва groups-ро худ join мекунанд:
+    # сутунҳо аз ҳамон join гирифта мешаванд, join-и дуюм сохта намешавад
+    'student_card_joined': lambda: [
+        contains_eager(Student.user),
+        contains_eager(Student.group),
+    ],
+    # Рӯйхати гуруҳ барои ҳузур ва ҳисоботҳо
+    'roster': lambda: [
+        joinedload(Student.user),
+    ],
+    # Дарсҳои транскрипт: кредитҳои фан
+    'transcript': lambda: [
+        joinedload(Course.subject),
+    ],
+    # Рӯйхати дарсҳо: фан, гуруҳ ва муаллим
+    'course_list': lambda: [
+        joinedload(Course.subject),
+        joinedload(Course.group),
+        joinedload(Course.teacher).joinedload(Teacher.user),
+    ],
+    # Муаллим бо дарсҳояш
+    'teacher_courses': lambda: [
+        joinedload(Teacher.user),
+        selectinload(Teacher.courses),
+    ],
+}
+
+
+def load_profile(name):
+    """Options-и профили номдор барои query.options(*load_profile(...))"""
+    try:
+        return LOAD_PROFILES[name]()
+    except KeyError:
+        raise ValueError(f'Профили боркунии номаълум: {name}')
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+
+    def __len__(self):
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine=None):
+    """Ҳисоби дархостҳои SQL дар дохили блок"""
+    engine = engine or db.engine
+    counter = QueryCounter()
+    event.listen(engine, 'before_cursor_execute', counter._record)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', counter._record)
+
+
+@contextmanager
+def assert_max_queries(limit, engine=None):
+    """Барои тестҳо: хато, агар endpoint аз `limit` зиёд дархост иҷро кунад
+
+        with assert_max_queries(4):
+            client.get('/api/students/search?q=хасан')
+    """
+    with count_queries(engine) as counter:
+        yield counter
+    if len(counter) > limit:
+        statements = '\n'.join(f'  {i}. {sql}' for i, sql in enumerate(counter.statements, 1))
+        raise AssertionError(f'{len(counter)} дархости SQL (ҳадди аксар {limit}):\n{statements}')
@@ -22,15 +22,23 @@ class User(UserMixin, db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+    def set_password(self, password, method='scrypt:32768:8:1'):
+        self.password_hash = generate_password_hash(password, method=method)
     
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
     
+    def password_needs_rehash(self, method):
+        """Hash бо усул ё параметрҳои дигар сохта шудааст (масалан 'scrypt:16384:8:1')"""
+        return self.password_hash.split('$', 1)[0] != method
+    
     @property
     def full_name(self):
-        return f"{self.last_name} {self.first_name} {self.middle_name or ''}".strip()
+        return User.format_full_name(self.last_name, self.first_name, self.middle_name)
+    
+    @staticmethod
+    def format_full_name(last_name, first_name, middle_name=None):
+        return f"{last_name} {first_name} {middle_name or ''}".strip()
     
     def has_role(self, role):
         return self.role == role
@@ -83,6 +91,7 @@ class Student(db.Model):
     passport_number = db.Column(db.String(20))
     parent_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     status = db.Column(db.String(20), default='active')
+    search_key = db.Column(db.String(300))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     user = db.relationship('User', foreign_keys=[user_id], backref='student_profile')
@@ -90,6 +99,11 @@ class Student(db.Model):
     attendance_records = db.relationship('Attendance', backref='student', lazy=True)
     grades = db.relationship('Grade', backref='student', lazy=True)
     behavior_records = db.relationship('BehaviorRecord', backref='student', lazy=True)
+    
+    __table_args__ = (
+        db.Index('idx_students_group_status', 'group_id', 'status'),
+        db.Index('idx_students_user_id', 'user_id'),
+    )
 
 class Teacher(db.Model):
     __tablename__ = 'teachers'
@@ -105,6 +119,10 @@ class Teacher(db.Model):
     
     user = db.relationship('User', backref='teacher_profile')
     courses = db.relationship('Course', backref='teacher', lazy=True)
+    
+    __table_args__ = (
+        db.Index('idx_teachers_user_id', 'user_id'),
+    )
 
 class Course(db.Model):
     __tablename__ = 'courses'
@@ -122,6 +140,11 @@ class Course(db.Model):
     
     attendance_records = db.relationship('Attendance', backref='course', lazy=True)
     grades = db.relationship('Grade', backref='course', lazy=True)
+    
+    __table_args__ = (
+        db.Index('idx_courses_teacher_id', 'teacher_id'),
+        db.Index('idx_courses_group_active', 'group_id', 'is_active'),
+    )
 
 class Attendance(db.Model):
     __tablename__ = 'attendance'
@@ -139,23 +162,67 @@ class Attendance(db.Model):
     
     creator = db.relationship('User', backref='created_attendance')
     
+    # Дар PostgreSQL ҷадвал аз рӯи моҳ тақсим мешавад (database/partitions.py)
+    __table_args__ = (
+        db.UniqueConstraint('course_id', 'student_id', 'date'),
+        db.Index('idx_attendance_student_date', 'student_id', 'date', postgresql_include=['status']),
+        {'postgresql_partition_by': 'RANGE (date)', 'info': {'partition_column': 'date'}},
+    )
+    
+    @staticmethod
+    def edit_cutoff(user):
+        """Санаи аз ҳама кӯҳнае, ки корбар ҳанӯз метавонад таҳрир кунад"""
+        today = datetime.utcnow().date()
+        if user.role == 'teacher':
+            return today - timedelta(days=1)
+        elif user.role in ['vice_dean', 'dean']:
+            return today - timedelta(days=30)
+        return None
+    
     def can_edit(self, user):
-        days_passed = (datetime.utcnow().date() - self.date).days
-        if user.role == 'teacher' and days_passed <= 1:
-            return True
-        elif user.role in ['vice_dean', 'dean'] and days_passed <= 30:
-            return True
-        return False
+        cutoff = Attendance.edit_cutoff(user)
+        return cutoff is not None and self.date >= cutoff
+
+class AttendanceDaily(db.Model):
+    """Ҷамъбасти ҳузури дарс дар як рӯз (services/rollups.py)"""
+    __tablename__ = 'attendance_daily'
+    
+    course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    present = db.Column(db.Integer, nullable=False, default=0)
+    late = db.Column(db.Integer, nullable=False, default=0)
+    absent = db.Column(db.Integer, nullable=False, default=0)
+    excused = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        db.Index('idx_attendance_daily_date', 'date'),
+    )
+
+class AttendanceMonthly(db.Model):
+    """Ҷамъбасти ҳузури донишҷӯ дар дарс барои як моҳ (month - рӯзи 1-уми моҳ)"""
+    __tablename__ = 'attendance_monthly'
+    
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), primary_key=True)
+    course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    present = db.Column(db.Integer, nullable=False, default=0)
+    late = db.Column(db.Integer, nullable=False, default=0)
+    absent = db.Column(db.Integer, nullable=False, default=0)
+    excused = db.Column(db.Integer, nullable=False, default=0)
 
 class Grade(db.Model):
     __tablename__ = 'grades'
     
+    GRADE_TYPES = ('activity', 'midterm_1', 'midterm_2', 'final')
+    
     id = db.Column(db.Integer, primary_key=True)
     course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), nullable=False)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
     grade_type = db.Column(db.String(20), nullable=False)
-    score = db.Column(db.Numeric(4, 2))
-    max_score = db.Column(db.Numeric(4, 2), default=100)
+    score = db.Column(db.Numeric(5, 2))
+    max_score = db.Column(db.Numeric(5, 2), default=100)
     date_taken = db.Column(db.Date)
     comments = db.Column(db.Text)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
@@ -164,13 +231,28 @@ class Grade(db.Model):
     
     creator = db.relationship('User', backref='created_grades')
     
+    # Калиди баҳо: як навъи баҳо барои донишҷӯ дар дарс
+    __table_args__ = (
+        db.Index('uq_grades_course_student_type', 'course_id', 'student_id', 'grade_type', unique=True),
+        db.Index('idx_grades_student_course', 'student_id', 'course_id',
+                 postgresql_include=['grade_type', 'score']),
+    )
+    
+    @staticmethod
+    def edit_cutoff(user):
+        """Санаи аз ҳама кӯҳнаи сохтани баҳо, ки корбар ҳанӯз метавонад таҳрир кунад"""
+        today = datetime.utcnow().date()
+        if user.role == 'teacher':
+            return today - timedelta(days=7)
+        elif user.role in ['vice_dean', 'dean']:
+            return today - timedelta(days=30)
+        return None
+    
     def can_edit(self, user):
-        days_passed = (datetime.utcnow().date() - self.created_at.date()).days
-        if user.role == 'teacher' and days_passed <= 7:
-            return True
-        elif user.role in ['vice_dean', 'dean'] and days_passed <= 30:
-            return True
-        return False
+        cutoff = Grade.edit_cutoff(user)
+        # Баҳои нав (ҳанӯз сабтнашуда) ҳамеша таҳрир мешавад
+        created = self.created_at.date() if self.created_at else datetime.utcnow().date()
+        return cutoff is not None and created >= cutoff
 
 class BehaviorRecord(db.Model):
     __tablename__ = 'behavior_records'
@@ -185,6 +267,10 @@ class BehaviorRecord(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     creator = db.relationship('User', backref='created_behavior_records')
+    
+    __table_args__ = (
+        db.Index('idx_behavior_student_date', 'student_id', 'date'),
+    )
 
 class Report(db.Model):
     __tablename__ = 'reports'
@@ -193,12 +279,57 @@ class Report(db.Model):
     report_type = db.Column(db.String(50))
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'))
     course_id = db.Column(db.Integer, db.ForeignKey('courses.id'))
+    group_id = db.Column(db.Integer, db.ForeignKey('groups.id'))
     semester = db.Column(db.Integer)
     academic_year = db.Column(db.String(9))
+    period_start = db.Column(db.Date)
+    period_end = db.Column(db.Date)
+    # Кэши ҳисобот (services/report_cache.py): hash-и параметрҳо ва hash-и data
+    cache_key = db.Column(db.String(64))
+    content_hash = db.Column(db.String(64))
     data = db.Column(db.JSON)
     generated_by = db.Column(db.Integer, db.ForeignKey('users.id'))
     generated_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     student = db.relationship('Student', backref='reports')
     course = db.relationship('Course', backref='reports')
-    generator = db.relationship('User', backref='generated_reports')
\ No newline at end of file
+    generator = db.relationship('User', backref='generated_reports')
+    
+    __table_args__ = (
+        db.Index('idx_reports_type_student', 'report_type', 'student_id', 'generated_at'),
+        db.Index('idx_reports_type_group', 'report_type', 'group_id', 'period_start'),
+        db.Index('uq_reports_cache_key', 'cache_key', unique=True),
+    )
+
+class Job(db.Model):
+    """Кори фонӣ дар навбат (services/jobs.py)"""
+    __tablename__ = 'jobs'
+    
+    ACTIVE = ('queued', 'running')
+    
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(50), nullable=False)
+    params = db.Column(db.JSON, nullable=False)
+    # hash-и навъ ва параметрҳо: як кори фаъол барои параметрҳои якхела
+    params_key = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer)
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    worker = db.Column(db.String(100))
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    creator = db.relationship('User', backref='jobs')
+    
+    __table_args__ = (
+        db.Index('idx_jobs_status_id', 'status', 'id'),
+        db.Index('uq_jobs_active_params', 'params_key', unique=True,
+                 postgresql_where=db.text("status IN ('queued', 'running')"),
+                 sqlite_where=db.text("status IN ('queued', 'running')")),
+    )
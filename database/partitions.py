@@ -0,0 +1,203 @@
+"""Ҷадвали attendance, ки дар PostgreSQL аз рӯи моҳ тақсим (partition) шудааст
+
+Ҷадвали асосӣ PARTITION BY RANGE (date) аст: ҳар моҳ - ҷадвали алоҳида
+(attendance_y2025m09) ва attendance_default барои санаҳое, ки ҳанӯз
+partition надоранд. Дархостҳое, ки date-ро филтр мекунанд, танҳо
+partition-ҳои лозимиро мехонанд (partition pruning). Модели Attendance ва
+дархостҳо тағйир намеёбанд; дар SQLite ҷадвал оддӣ мемонад.
+
+Partition-ҳо пешакӣ сохта мешаванд (ensure_attendance_partitions: ҳангоми
+create_app ва `flask attendance-partitions`), partition-ҳои кӯҳна бо
+detach_attendance_partitions аз ҷадвал ҷудо мешаванд ва ҳамчун ҷадвалҳои
+мустақил (архив) мемонанд.
+"""
+import logging
+import re
+from datetime import date
+
+from sqlalchemy import PrimaryKeyConstraint, event, inspect, text
+from sqlalchemy.ext.compiler import compiles
+
+from database.models import db, Attendance
+
+log = logging.getLogger(__name__)
+
+TABLE = Attendance.__tablename__
+DEFAULT_PARTITION = f'{TABLE}_default'
+PARTITION_NAME = re.compile(rf'^{TABLE}_y(\d{{4}})m(\d{{2}})$')
+# Қулфи умумӣ: якчанд процесс ҳамзамон partition намесозанд
+LOCK_ID = 0x61747464
+
+
+@compiles(PrimaryKeyConstraint, 'postgresql')
+def _partitioned_primary_key(constraint, compiler, **kw):
+    """PRIMARY KEY-и ҷадвали тақсимшуда бояд сутуни тақсимро дар бар гирад
+
+    Барои ORM калиди асосӣ id мемонад; дар PostgreSQL (id, date) сохта мешавад.
+    """
+    sql = compiler.visit_primary_key_constraint(constraint, **kw)
+    column = constraint.table.info.get('partition_column')
+    if not column or column in constraint.columns.keys():
+        return sql
+    return sql[:sql.rindex(')')] + f', {compiler.preparer.quote(column)})'
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(day, months):
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def partition_name(start):
+    return f'{TABLE}_y{start.year}m{start.month:02d}'
+
+
+def is_partitioned(conn):
+    if conn.dialect.name != 'postgresql':
+        return False
+    return conn.execute(text(
+        'SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:name)'
+    ), {'name': TABLE}).first() is not None
+
+
+def attendance_partitions(conn):
+    """Partition-ҳои моҳона: [(ном, санаи аввал)] бо тартиби сана"""
+    rows = conn.execute(text(
+        'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+        'WHERE i.inhparent = to_regclass(:name)'
+    ), {'name': TABLE}).scalars()
+    partitions = []
+    for name in rows:
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+def _archived(conn, start):
+    return conn.execute(text('SELECT to_regclass(:name)'), {'name': partition_name(start)}).scalar() is not None
+
+
+def _create_partition(conn, start):
+    end = add_months(start, 1)
+    name = partition_name(start)
+    bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    stranded = conn.execute(text(
+        f'SELECT 1 FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end LIMIT 1'
+    ), {'start': start, 'end': end}).first()
+    if stranded is None:
+        conn.execute(text(f'CREATE TABLE {name} PARTITION OF {TABLE} FOR VALUES {bounds}'))
+        return name
+
+    # Сатрҳои ин моҳ аллакай дар default ҳастанд: ҷадвал алоҳида сохта,
+    # сатрҳо кӯчонида ва баъд пайваст мешавад
+    conn.execute(text(f'CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+    conn.execute(text(
+        f'WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end RETURNING *) '
+        f'INSERT INTO {name} SELECT * FROM moved'
+    ), {'start': start, 'end': end})
+    conn.execute(text(f'ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES {bounds}'))
+    return name
+
+
+def ensure_partitions(conn, first, last):
+    """Partition-ҳои моҳона аз моҳи `first` то моҳи `last` (дохил)"""
+    if not is_partitioned(conn):
+        return []
+    conn.execute(text('SELECT pg_advisory_xact_lock(:id)'), {'id': LOCK_ID})
+    # CREATE ... PARTITION OF ҷадвали асосиро қулф мекунад: дар паси транзаксияи
+    # дароз интизор намемонем, то дархостҳои дигарро бозор надорем
+    conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+    conn.execute(text(f'CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT'))
+
+    existing = {start for _, start in attendance_partitions(conn)}
+    created = []
+    start = month_start(first)
+    while start <= last:
+        if start in existing:
+            pass
+        elif _archived(conn, start):
+            # Моҳи ҷудошуда (архив): сатрҳои нав дар default мемонанд
+            log.warning('Ҷадвали %s аллакай ҳаст ва partition нест', partition_name(start))
+        else:
+            created.append(_create_partition(conn, start))
+        start = add_months(start, 1)
+    return created
+
+
+def ensure_attendance_partitions(ahead=None, first=None, last=None):
+    """Partition-ҳо аз моҳи ҷорӣ (ё `first`) то `ahead` моҳ пеш; commit мекунад"""
+    from flask import current_app
+
+    if ahead is None:
+        ahead = current_app.config['ATTENDANCE_PARTITIONS_AHEAD']
+    today = date.today()
+    first = first or today
+    last = last or add_months(month_start(today), ahead)
+    with db.engine.begin() as conn:
+        created = ensure_partitions(conn, first, last)
+    if created:
+        log.info('Partition-ҳои attendance сохта шуданд: %s', ', '.join(created))
+    return created
+
+
+def detach_attendance_partitions(before):
+    """Partition-ҳои моҳҳои пеш аз `before` аз attendance ҷудо мешаванд
+
+    Ҷадвалҳои ҷудошуда боқӣ мемонанд (барои pg_dump/архив ё DROP TABLE).
+    """
+    detached = []
+    with db.engine.begin() as conn:
+        if not is_partitioned(conn):
+            return detached
+        conn.execute(text('SELECT pg_advisory_xact_lock(:id)'), {'id': LOCK_ID})
+        for name, start in attendance_partitions(conn):
+            if add_months(start, 1) <= before:
+                conn.execute(text(f'ALTER TABLE {TABLE} DETACH PARTITION {name}'))
+                detached.append(name)
+    return detached
+
+
+def partition_existing_table(ahead=3):
+    """Ҷадвали оддии attendance ба ҷадвали тақсимшуда (як транзаксия)
+
+    Ҷадвали кӯҳна ба attendance_heap иваз мешавад, ҷадвали нав аз модел
+    сохта мешавад, partition-ҳо барои тамоми давраи маълумот ва сатрҳо
+    кӯчонида мешаванд. Дар охир attendance_heap нест карда мешавад.
+    """
+    table = Attendance.__table__
+    columns = ', '.join(column.name for column in table.columns)
+    with db.engine.begin() as conn:
+        if conn.dialect.name != 'postgresql' or is_partitioned(conn):
+            return False
+        conn.execute(text(f'LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE'))
+
+        # Номҳои индексҳо ва sequence бо ҷадвали нав бархӯрд накунанд
+        for index in inspect(conn).get_indexes(TABLE) + [inspect(conn).get_pk_constraint(TABLE)]:
+            if index.get('name'):
+                conn.execute(text(f'ALTER INDEX {index["name"]} RENAME TO {index["name"]}_heap'))
+        conn.execute(text(f'ALTER TABLE {TABLE} RENAME TO {TABLE}_heap'))
+        conn.execute(text(f'ALTER SEQUENCE IF EXISTS {TABLE}_id_seq RENAME TO {TABLE}_heap_id_seq'))
+
+        table.create(conn)
+        bounds = conn.execute(text(f'SELECT MIN(date), MAX(date) FROM {TABLE}_heap')).one()
+        today = date.today()
+        ensure_partitions(conn, bounds[0] or today, add_months(month_start(max(bounds[1] or today, today)), ahead))
+
+        conn.execute(text(f'INSERT INTO {TABLE} ({columns}) SELECT {columns} FROM {TABLE}_heap'))
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {TABLE}), 0) + 1, false)"
+        ))
+        conn.execute(text(f'DROP TABLE {TABLE}_heap'))
+    return True
+
+
+@event.listens_for(Attendance.__table__, 'after_create')
+def _create_initial_partitions(target, conn, **kw):
+    # db.create_all(): partition-и default ва моҳи ҷорӣ то 3 моҳ пеш
+    if conn.dialect.name == 'postgresql':
+        ensure_partitions(conn, date.today(), add_months(month_start(date.today()), 3))
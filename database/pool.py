@@ -0,0 +1,108 @@
+"""Танзими pool-и пайвастҳо аз муҳит (DB_POOL_*) ва омори интизорӣ барои /health
+
+Дар education_crm/database/pool.py ҳамин PoolStats ва engine_options бо
+иловаи pool-и async (барои asgi.py) ҳаст. Он нусха қасдан алоҳида аст -
+ду барнома пакетҳои ҳамноми database доранд; тағйири ҳисоби интизорӣ ё
+калидҳои pool_status-ро дар ҳарду кунед.
+"""
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+
+class PoolStats:
+    """Вақти интизории гирифтани пайваст аз pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_avg_ms': round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 3),
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool, ки вақти интизории ҳар checkout-ро қайд мекунад"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # pool_pre_ping/invalidate pool-и навро месозад; омор нигоҳ дошта мешавад
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS аз танзимоти DB_POOL_* (барои SQLite - пешфарз)"""
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite':
+        return {}
+
+    options = {
+        'poolclass': TimedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+    if config['DB_PGBOUNCER'] and url.get_driver_name() == 'psycopg':
+        # Дар transaction mode-и PgBouncer prepared statement-ҳо байни
+        # пайвастҳои сервер гум мешаванд; psycopg2 онҳоро истифода намебарад
+        options['connect_args'] = {'prepare_threshold': None}
+    return options
+
+
+def pool_status(engine):
+    """Ҳолати pool барои /health"""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {'class': type(pool).__name__}
+
+    status = {
+        'class': type(pool).__name__,
+        'size': pool.size(),
+        'checked_out': pool.checkedout(),
+        'idle': pool.checkedin(),
+        'overflow': max(pool.overflow(), 0),
+        'max_overflow': pool._max_overflow,
+        'timeout': pool.timeout(),
+    }
+    stats = getattr(pool, 'stats', None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
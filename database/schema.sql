@@ -50,6 +50,7 @@ CREATE TABLE students (
     passport_number VARCHAR(20),
     parent_id INTEGER REFERENCES users(id),
     status VARCHAR(20) DEFAULT 'active' CHECK (status IN ('active', 'inactive', 'graduated', 'expelled')),
+    search_key VARCHAR(300),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -80,8 +81,10 @@ CREATE TABLE courses (
 );
 
 -- Ҷадвали ҳузур
+-- Аз рӯи моҳ тақсим шудааст (database/partitions.py); калиди асосӣ бояд
+-- сутуни тақсим (date)-ро дар бар гирад
 CREATE TABLE attendance (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     course_id INTEGER REFERENCES courses(id),
     student_id INTEGER REFERENCES students(id),
     date DATE NOT NULL,
@@ -91,7 +94,37 @@ CREATE TABLE attendance (
     created_by INTEGER REFERENCES users(id),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, date),
     UNIQUE(course_id, student_id, date)
+) PARTITION BY RANGE (date);
+
+-- Сатрҳое, ки partition-и моҳашон ҳанӯз нест; моҳҳо бо
+-- `flask attendance-partitions` пешакӣ сохта мешаванд
+CREATE TABLE attendance_default PARTITION OF attendance DEFAULT;
+
+-- Ҷамъбастҳои ҳузур (services/rollups.py): ҳамроҳи attendance навсозӣ
+-- мешаванд, `flask attendance-rollups` аз нав месозад
+CREATE TABLE attendance_daily (
+    course_id INTEGER REFERENCES courses(id),
+    date DATE NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    present INTEGER NOT NULL DEFAULT 0,
+    late INTEGER NOT NULL DEFAULT 0,
+    absent INTEGER NOT NULL DEFAULT 0,
+    excused INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (course_id, date)
+);
+
+CREATE TABLE attendance_monthly (
+    student_id INTEGER REFERENCES students(id),
+    course_id INTEGER REFERENCES courses(id),
+    month DATE NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    present INTEGER NOT NULL DEFAULT 0,
+    late INTEGER NOT NULL DEFAULT 0,
+    absent INTEGER NOT NULL DEFAULT 0,
+    excused INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (student_id, course_id, month)
 );
 
 -- Ҷадвали баҳоҳо
@@ -100,8 +133,8 @@ CREATE TABLE grades (
     course_id INTEGER REFERENCES courses(id),
     student_id INTEGER REFERENCES students(id),
     grade_type VARCHAR(20) CHECK (grade_type IN ('midterm_1', 'midterm_2', 'final', 'resit')),
-    score DECIMAL(4,2),
-    max_score DECIMAL(4,2) DEFAULT 100,
+    score DECIMAL(5,2),
+    max_score DECIMAL(5,2) DEFAULT 100,
     date_taken DATE,
     comments TEXT,
     created_by INTEGER REFERENCES users(id),
@@ -127,19 +160,57 @@ CREATE TABLE reports (
     report_type VARCHAR(50),
     student_id INTEGER REFERENCES students(id),
     course_id INTEGER REFERENCES courses(id),
+    group_id INTEGER REFERENCES groups(id),
     semester INTEGER,
     academic_year VARCHAR(9),
+    period_start DATE,
+    period_end DATE,
+    -- Кэши ҳисобот (services/report_cache.py): hash-и параметрҳо ва hash-и data
+    cache_key VARCHAR(64),
+    content_hash VARCHAR(64),
     data JSONB,
     generated_by INTEGER REFERENCES users(id),
     generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Индексҳо барои беҳтар кардани кор
+-- Навбати корҳои фонӣ (services/jobs.py, `flask jobs-worker`)
+CREATE TABLE jobs (
+    id SERIAL PRIMARY KEY,
+    job_type VARCHAR(50) NOT NULL,
+    params JSONB NOT NULL,
+    params_key VARCHAR(64) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    progress INTEGER NOT NULL DEFAULT 0,
+    total INTEGER,
+    result JSONB,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker VARCHAR(100),
+    created_by INTEGER REFERENCES users(id),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    heartbeat_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+-- Индексҳо барои беҳтар кардани кор (ҳамон индексҳои migrations/versions/0002)
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_students_student_id ON students(student_id);
-CREATE INDEX idx_attendance_course_date ON attendance(course_id, date);
-CREATE INDEX idx_grades_course_student ON grades(course_id, student_id);
+CREATE INDEX idx_students_group_status ON students(group_id, status);
+CREATE INDEX idx_students_user_id ON students(user_id);
+CREATE INDEX idx_teachers_user_id ON teachers(user_id);
+CREATE INDEX idx_courses_teacher_id ON courses(teacher_id);
+CREATE INDEX idx_courses_group_active ON courses(group_id, is_active);
+CREATE INDEX idx_attendance_student_date ON attendance(student_id, date) INCLUDE (status);
+CREATE INDEX idx_attendance_daily_date ON attendance_daily(date);
+CREATE UNIQUE INDEX uq_grades_course_student_type ON grades(course_id, student_id, grade_type);
+CREATE INDEX idx_grades_student_course ON grades(student_id, course_id) INCLUDE (grade_type, score);
 CREATE INDEX idx_behavior_student_date ON behavior_records(student_id, date);
+CREATE INDEX idx_reports_type_student ON reports(report_type, student_id, generated_at);
+CREATE INDEX idx_reports_type_group ON reports(report_type, group_id, period_start);
+CREATE UNIQUE INDEX uq_reports_cache_key ON reports(cache_key);
+CREATE INDEX idx_jobs_status_id ON jobs(status, id);
+CREATE UNIQUE INDEX uq_jobs_active_params ON jobs(params_key) WHERE status IN ('queued', 'running');
 
 -- Маълумотҳои ибтидоӣ
 INSERT INTO users (email, password_hash, first_name, last_name, role) VALUES
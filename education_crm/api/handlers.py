@@ -0,0 +1,622 @@
+"""Route logic shared by the Flask blueprint and the ASGI app.
+
+Every handler takes a synchronous SQLAlchemy ``Session`` first, so the Flask
+routes call it with ``db.session`` and the ASGI routes run it on the async
+engine through ``AsyncSession.run_sync``. Handlers return what a Flask view
+would: a dict, or a ``(dict, status)`` tuple.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from database.models import (
+    User,
+    Role,
+    Student,
+    Group,
+    Course,
+    Enrollment,
+    Attendance,
+    Behavior,
+    Rating,
+    Exam,
+    TeacherStudent,
+    can_edit_within,
+)
+from api.pagination import encode_cursor
+
+Identity = Dict[str, Any]
+Payload = Dict[str, Any]
+
+# Edit windows in days after creation (update_attendance); the dean has none
+EDIT_WINDOW_DAYS = {Role.TEACHER: 1, Role.VICE_DEAN: 30}
+RATING_PERIODS = ("2m", "4m")
+# attendance.activity_score
+MAX_ACTIVITY = Decimal("6.5")
+# NUMERIC(5,2) of exams.score and ratings.value
+MAX_SCORE = Decimal("999.99")
+
+
+def _insert(session: Session, model):
+    """INSERT with ON CONFLICT support for the session's dialect."""
+    if session.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
+
+
+def find_user(session: Session, email: str) -> Optional[User]:
+    return session.execute(select(User).filter_by(email=email)).scalar_one_or_none()
+
+
+def identity_for(user: User) -> Identity:
+    return {"id": user.id, "email": user.email, "role": user.role, "name": user.full_name}
+
+
+def teacher_students(teacher_id: int):
+    """Ids of the students a teacher sees, read from the teacher_students scope."""
+    return select(TeacherStudent.student_id).filter(TeacherStudent.teacher_id == teacher_id)
+
+
+def add_teacher_scope(session: Session, course_id: int, student_id: int) -> None:
+    """Make a new enrollment visible to the course's teacher (same transaction)."""
+    taught = select(Course.teacher_id, literal(student_id)).filter(
+        Course.id == course_id, Course.teacher_id.isnot(None)
+    )
+    stmt = _insert(session, TeacherStudent).from_select(["teacher_id", "student_id"], taught)
+    session.execute(stmt.on_conflict_do_nothing(index_elements=["teacher_id", "student_id"]))
+
+
+def refresh_teacher_scope(session: Session, teacher_ids: Optional[List[int]] = None) -> int:
+    """Rebuild teacher_students from enrollments and courses (all teachers, or ``teacher_ids``).
+
+    For writes that bypass the handlers: bulk loads, enrollment deletes, a
+    course changing teachers. Does not commit; returns the number of pairs.
+    """
+    stale = delete(TeacherStudent)
+    pairs = (
+        select(Course.teacher_id, Enrollment.student_id)
+        .join(Enrollment, Enrollment.course_id == Course.id)
+        .filter(Course.teacher_id.isnot(None))
+        .distinct()
+    )
+    if teacher_ids is not None:
+        stale = stale.filter(TeacherStudent.teacher_id.in_(teacher_ids))
+        pairs = pairs.filter(Course.teacher_id.in_(teacher_ids))
+    session.execute(stale)
+    return session.execute(
+        insert(TeacherStudent).from_select(["teacher_id", "student_id"], pairs)
+    ).rowcount
+
+
+def visible_students(ident: Identity):
+    """Student ids visible to the caller, as a filter clause (None = everyone)."""
+    role = ident.get("role")
+    if role == Role.TEACHER:
+        # Index-only semi-join on the teacher_students primary key
+        return Student.id.in_(teacher_students(ident.get("id")))
+    if role == Role.STUDENT:
+        return Student.user_id == ident.get("id")
+    # vice_dean and dean see all
+    return None
+
+
+def student_row(row) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "uid": row.student_uid,
+        "name": row.full_name,
+        "group": row.group_name,
+        "course_year": row.course_year,
+    }
+
+
+def students_query(ident: Identity, after: Optional[int]):
+    # Plain columns instead of entities: no per-row lazy loads of user/group
+    q = (
+        select(
+            Student.id,
+            Student.student_uid,
+            User.full_name,
+            Group.name.label("group_name"),
+            Group.course_year,
+        )
+        .outerjoin(User, User.id == Student.user_id)
+        .outerjoin(Group, Group.id == Student.group_id)
+        .order_by(Student.id)
+    )
+    visible = visible_students(ident)
+    if visible is not None:
+        q = q.filter(visible)
+    if after is not None:
+        q = q.filter(Student.id > after)
+    return q
+
+
+def students_page(session: Session, ident: Identity, after: Optional[int], limit: int) -> Dict[str, Any]:
+    rows = session.execute(students_query(ident, after).limit(limit + 1)).all()
+    next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    return {"items": [student_row(row) for row in rows[:limit]], "next_cursor": next_cursor}
+
+
+def create_group(session: Session, ident: Identity, payload: Payload):
+    g = Group(name=payload["name"], course_year=int(payload["course_year"]))
+    session.add(g)
+    session.commit()
+    return {"id": g.id, "name": g.name, "course_year": g.course_year}
+
+
+def create_course(session: Session, ident: Identity, payload: Payload):
+    c = Course(
+        code=payload["code"],
+        title=payload["title"],
+        total_hours=int(payload.get("total_hours", 0)),
+        teacher_id=payload.get("teacher_id"),
+    )
+    session.add(c)
+    session.commit()
+    return {"id": c.id, "code": c.code}
+
+
+def create_student(session: Session, ident: Identity, payload: Payload):
+    # assumes user already created by dean
+    user_id = payload["user_id"]
+    group_id = payload["group_id"]
+    student_uid = payload["student_uid"]
+    s = Student(user_id=user_id, group_id=group_id, student_uid=student_uid)
+    session.add(s)
+    session.commit()
+    return {"id": s.id}
+
+
+def create_enrollment(session: Session, ident: Identity, payload: Payload):
+    e = Enrollment(
+        student_id=payload["student_id"],
+        course_id=payload["course_id"],
+        year=int(payload["year"]),
+        semester=int(payload["semester"]),
+    )
+    session.add(e)
+    session.flush()
+    add_teacher_scope(session, e.course_id, e.student_id)
+    session.commit()
+    return {"id": e.id}
+
+
+def _upsert_one(session: Session, ident: Identity, model, key: str, values: Dict[str, Any]):
+    """Single-row INSERT ... ON CONFLICT (enrollment_id, key) for the one-off endpoints.
+
+    Same arbitration index and edit window as the roster batches, so a
+    retried POST rewrites its row instead of failing on the unique key. A
+    conflicting row outside the caller's window is left alone: an identical
+    retry still gets its id, a different value gets 403.
+    """
+    now = datetime.utcnow()
+    stmt = _insert(session, model).values(**values, created_by=ident.get("id"), created_at=now)
+    days = EDIT_WINDOW_DAYS.get(ident.get("role"))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["enrollment_id", key],
+        set_={name: stmt.excluded[name] for name in values if name not in ("enrollment_id", key)},
+        where=model.created_at >= now - timedelta(days=days) if days is not None else None,
+    ).returning(model.id)
+    row_id = session.execute(stmt).scalar()
+    if row_id is None:
+        existing = session.execute(
+            select(model).filter_by(enrollment_id=values["enrollment_id"], **{key: values[key]})
+        ).scalar_one()
+        if any(getattr(existing, name) != value for name, value in values.items()):
+            session.rollback()
+            return {"message": "Edit window closed"}, 403
+        row_id = existing.id
+    session.commit()
+    return {"id": row_id}
+
+
+# Attendance: one row per enrollment and day; a repeated POST updates it
+def add_attendance(session: Session, ident: Identity, payload: Payload):
+    try:
+        enrollment_id = int(payload["enrollment_id"])
+        day = date.fromisoformat(payload["date"])
+        activity_score = payload.get("activity_score")
+        if activity_score is not None:
+            activity_score = Decimal(str(activity_score))
+    except (KeyError, TypeError, ValueError, InvalidOperation):
+        return {"message": "enrollment_id and date (YYYY-MM-DD) are required"}, 400
+    if activity_score is not None and (not activity_score.is_finite() or not 0 <= activity_score <= MAX_ACTIVITY):
+        return {"message": f"activity_score must be between 0 and {MAX_ACTIVITY}"}, 400
+    return _upsert_one(session, ident, Attendance, "date", {
+        "enrollment_id": enrollment_id,
+        "date": day,
+        "present": bool(payload.get("present", False)),
+        "activity_score": activity_score,
+    })
+
+
+def _roster_marks(marks: Any) -> Tuple[Dict[int, Dict[str, Any]], List[Dict[str, Any]]]:
+    """Parse ``[[student_id, present, activity_score?], ...]``: ({student_id: values}, errors)."""
+    if not isinstance(marks, list) or not marks:
+        return {}, [{"index": None, "student_id": None, "error": "No rows"}]
+
+    errors: List[Dict[str, Any]] = []
+    by_student: Dict[int, Dict[str, Any]] = {}
+    for index, mark in enumerate(marks):
+        if not isinstance(mark, list) or len(mark) not in (2, 3):
+            errors.append({"index": index, "student_id": None, "error": "Expected [student_id, present, score]"})
+            continue
+        try:
+            student_id = int(mark[0])
+        except (TypeError, ValueError):
+            errors.append({"index": index, "student_id": mark[0], "error": "Invalid student_id"})
+            continue
+        if mark[1] not in (0, 1):  # also True/False
+            errors.append({"index": index, "student_id": student_id, "error": "present must be 0 or 1"})
+            continue
+        activity = mark[2] if len(mark) == 3 else None
+        if activity is not None:
+            try:
+                activity = Decimal(str(activity))
+            except InvalidOperation:
+                activity = Decimal("NaN")
+            if not activity.is_finite() or not 0 <= activity <= MAX_ACTIVITY:
+                errors.append({"index": index, "student_id": student_id,
+                               "error": f"activity_score must be between 0 and {MAX_ACTIVITY}"})
+                continue
+        # The last mark of a student wins
+        by_student[student_id] = {"index": index, "present": bool(mark[1]), "activity_score": activity}
+    return by_student, errors
+
+
+def submit_roster_attendance(session: Session, ident: Identity, payload: Payload):
+    """Attendance of a whole class: {"course_id", "date", "marks": [[student_id, present, activity_score?]]}.
+
+    Enrollments are resolved from (course_id, student_id) in one query; the
+    latest year/semester wins unless "year"/"semester" pin one. All rows go in
+    one INSERT ... ON CONFLICT (enrollment_id, date). A re-submission only
+    rewrites rows whose values changed and only inside the caller's edit
+    window, so a retried request is answered without writing anything.
+    """
+    try:
+        course_id = int(payload["course_id"])
+        day = date.fromisoformat(payload["date"])
+    except (KeyError, TypeError, ValueError):
+        return {"message": "course_id and date (YYYY-MM-DD) are required"}, 400
+    pinned = {}
+    for field in ("year", "semester"):
+        if payload.get(field) is not None:
+            try:
+                pinned[field] = int(payload[field])
+            except (TypeError, ValueError):
+                return {"message": f"{field} must be an integer"}, 400
+    course = session.get(Course, course_id)
+    if course is None:
+        return {"message": "Course not found"}, 404
+    if ident.get("role") == Role.TEACHER and course.teacher_id != ident.get("id"):
+        return {"message": "Forbidden"}, 403
+
+    by_student, errors = _roster_marks(payload.get("marks"))
+    q = (
+        select(Enrollment.student_id, Enrollment.id)
+        .filter(Enrollment.course_id == course_id, Enrollment.student_id.in_(list(by_student)))
+        .order_by(Enrollment.year, Enrollment.semester, Enrollment.id)
+    )
+    for field, value in pinned.items():
+        q = q.filter(getattr(Enrollment, field) == value)
+    enrollments = dict(session.execute(q).all()) if by_student else {}
+    for student_id, mark in by_student.items():
+        if student_id not in enrollments:
+            errors.append({"index": mark["index"], "student_id": student_id, "error": "Not enrolled in this course"})
+    if errors:
+        errors.sort(key=lambda error: error["index"] if error["index"] is not None else -1)
+        return {"message": "Invalid rows", "errors": errors}, 400
+
+    now = datetime.utcnow()
+    students = {enrollments[student_id]: student_id for student_id in by_student}
+    rows = [
+        {"enrollment_id": enrollment_id, "date": day, "present": by_student[student_id]["present"],
+         "activity_score": by_student[student_id]["activity_score"], "created_by": ident.get("id"), "created_at": now}
+        for enrollment_id, student_id in students.items()
+    ]
+    # Rows as parameters, not .values(rows): the statement is compiled once and
+    # cached, and insertmanyvalues still sends them as one multi-row INSERT. The
+    # table (not the ORM entity) keeps it out of the ORM bulk path, which splits
+    # rows by their NULL columns.
+    stmt = _insert(session, Attendance.__table__)
+    changed = (
+        Attendance.present.is_distinct_from(stmt.excluded.present)
+        | Attendance.activity_score.is_distinct_from(stmt.excluded.activity_score)
+    )
+    days = EDIT_WINDOW_DAYS.get(ident.get("role"))
+    if days is not None:
+        changed &= Attendance.created_at >= now - timedelta(days=days)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["enrollment_id", "date"],
+        set_={"present": stmt.excluded.present, "activity_score": stmt.excluded.activity_score},
+        where=changed,
+    ).returning(Attendance.enrollment_id)
+    written = set(session.execute(stmt, rows).scalars())
+
+    # Rows not written are either identical already or outside the edit window
+    unchanged: List[int] = []
+    rejected: List[int] = []
+    if len(written) < len(students):
+        existing = session.execute(
+            select(Attendance.enrollment_id, Attendance.present, Attendance.activity_score)
+            .filter(Attendance.enrollment_id.in_(set(students) - written), Attendance.date == day)
+        ).all()
+        for row in existing:
+            mark = by_student[students[row.enrollment_id]]
+            same = row.present == mark["present"] and row.activity_score == mark["activity_score"]
+            (unchanged if same else rejected).append(students[row.enrollment_id])
+    session.commit()
+    return {
+        "saved": sorted(students[enrollment_id] for enrollment_id in written),
+        "unchanged": sorted(unchanged),
+        "rejected": sorted(rejected),
+    }
+
+
+def update_attendance(session: Session, ident: Identity, payload: Payload, att_id: int):
+    role = ident.get("role")
+    att = session.get(Attendance, att_id)
+    if not att:
+        return {"message": "Not found"}, 404
+    # edit windows
+    if role == Role.TEACHER and not can_edit_within(att.created_at, 1):
+        return {"message": "Edit window closed"}, 403
+    if role == Role.VICE_DEAN and not can_edit_within(att.created_at, 30):
+        return {"message": "Edit window closed"}, 403
+    # dean allowed anytime
+    if "present" in payload:
+        att.present = bool(payload["present"])
+    if "activity_score" in payload:
+        att.activity_score = payload["activity_score"]
+    session.commit()
+    return {"ok": True}
+
+
+# Behavior notes: comment-like notes
+def add_behavior(session: Session, ident: Identity, payload: Payload):
+    b = Behavior(
+        student_id=payload["student_id"],
+        course_id=payload.get("course_id"),
+        date=payload.get("date"),
+        note=payload["note"],
+        created_by=ident.get("id"),
+    )
+    session.add(b)
+    session.commit()
+    return {"id": b.id}
+
+
+# Ratings derived or manual; one per enrollment and period
+def add_rating(session: Session, ident: Identity, payload: Payload):
+    try:
+        enrollment_id = int(payload["enrollment_id"])
+        value = _score(payload["value"])
+    except (KeyError, TypeError, ValueError):
+        return {"message": f"enrollment_id and value (0 to {MAX_SCORE}) are required"}, 400
+    if payload.get("period") not in RATING_PERIODS:
+        return {"message": "Invalid period"}, 400
+    return _upsert_one(session, ident, Rating, "period", {
+        "enrollment_id": enrollment_id,
+        "period": payload["period"],  # "2m" or "4m"
+        "value": value,
+    })
+
+
+def add_exam(session: Session, ident: Identity, payload: Payload):
+    try:
+        enrollment_id = int(payload["enrollment_id"])
+        score = _score(payload["score"])
+        exam_date = date.fromisoformat(payload["date"])
+    except (KeyError, TypeError, ValueError):
+        return {"message": f"enrollment_id, score (0 to {MAX_SCORE}) and date (YYYY-MM-DD) are required"}, 400
+    exam_type = payload.get("exam_type")
+    if not exam_type or len(exam_type) > 32:
+        return {"message": "Invalid exam_type"}, 400
+    return _upsert_one(session, ident, Exam, "exam_type", {
+        "enrollment_id": enrollment_id,
+        "exam_type": exam_type,
+        "score": score,
+        "date": exam_date,
+    })
+
+
+# Roster batches: one payload per exam/period, validated up front, one upsert
+def _score(value: Any) -> Decimal:
+    try:
+        score = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError("Score is not a number")
+    if not score.is_finite() or not 0 <= score <= MAX_SCORE:
+        raise ValueError(f"Score must be between 0 and {MAX_SCORE}")
+    return score
+
+
+def _roster(
+    session: Session, ident: Identity, rows: Any, parse: Callable[[Dict[str, Any]], Dict[str, Any]]
+) -> Tuple[Dict[int, Dict[str, Any]], List[Dict[str, Any]]]:
+    """Validate every row before writing: ({enrollment_id: values}, errors).
+
+    ``parse`` turns a row into column values or raises ValueError. The last row
+    of an enrollment wins. Teachers may only score enrollments of their courses.
+    """
+    if not isinstance(rows, list) or not rows:
+        return {}, [{"index": None, "enrollment_id": None, "error": "No rows"}]
+
+    errors: List[Dict[str, Any]] = []
+    by_enrollment: Dict[int, Dict[str, Any]] = {}
+    indexes: Dict[int, int] = {}
+    for index, item in enumerate(rows):
+        raw_id = item.get("enrollment_id") if isinstance(item, dict) else None
+        try:
+            enrollment_id = int(raw_id)
+        except (TypeError, ValueError):
+            errors.append({"index": index, "enrollment_id": raw_id, "error": "Invalid enrollment_id"})
+            continue
+        try:
+            by_enrollment[enrollment_id] = parse(item)
+            indexes[enrollment_id] = index
+        except ValueError as exc:
+            errors.append({"index": index, "enrollment_id": enrollment_id, "error": str(exc)})
+
+    teachers = dict(session.execute(
+        select(Enrollment.id, Course.teacher_id)
+        .join(Course, Course.id == Enrollment.course_id)
+        .filter(Enrollment.id.in_(list(by_enrollment)))
+    ).all()) if by_enrollment else {}
+    for enrollment_id, index in indexes.items():
+        if enrollment_id not in teachers:
+            errors.append({"index": index, "enrollment_id": enrollment_id, "error": "Enrollment not found"})
+        elif ident.get("role") == Role.TEACHER and teachers[enrollment_id] != ident.get("id"):
+            errors.append({"index": index, "enrollment_id": enrollment_id, "error": "Not your course"})
+
+    errors.sort(key=lambda error: error["index"])
+    return by_enrollment, errors
+
+
+def _upsert_roster(
+    session: Session, ident: Identity, model, key: str, by_enrollment: Dict[int, Dict[str, Any]]
+) -> Dict[str, List[int]]:
+    """INSERT ... ON CONFLICT (enrollment_id, key) DO UPDATE with the edit window in SQL.
+
+    Existing rows outside the caller's window are left alone and reported as
+    rejected; new rows are always inserted. Commits once.
+    """
+    now = datetime.utcnow()
+    values = [
+        {"enrollment_id": enrollment_id, **columns, "created_by": ident.get("id"), "created_at": now}
+        for enrollment_id, columns in by_enrollment.items()
+    ]
+    stmt = _insert(session, model).values(values)
+    days = EDIT_WINDOW_DAYS.get(ident.get("role"))
+    fixed = ("enrollment_id", key, "created_by", "created_at")
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["enrollment_id", key],
+        set_={name: stmt.excluded[name] for name in values[0] if name not in fixed},
+        where=model.created_at >= now - timedelta(days=days) if days is not None else None,
+    ).returning(model.enrollment_id)
+    saved = set(session.execute(stmt).scalars())
+    session.commit()
+    return {"saved": sorted(saved), "rejected": sorted(set(by_enrollment) - saved)}
+
+
+def upsert_exams(session: Session, ident: Identity, payload: Payload):
+    """Scores of one exam for a roster: {"exam_type", "date", "scores": [{"enrollment_id", "score"}]}.
+
+    A row may carry its own "date".
+    """
+    exam_type = payload.get("exam_type")
+    if not exam_type or len(exam_type) > 32:
+        return {"message": "Invalid exam_type"}, 400
+
+    def parse(item: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            exam_date = date.fromisoformat(item.get("date") or payload.get("date") or "")
+        except (TypeError, ValueError):
+            raise ValueError("Invalid date")
+        return {"exam_type": exam_type, "score": _score(item.get("score")), "date": exam_date}
+
+    by_enrollment, errors = _roster(session, ident, payload.get("scores"), parse)
+    if errors:
+        return {"message": "Invalid rows", "errors": errors}, 400
+    return _upsert_roster(session, ident, Exam, "exam_type", by_enrollment)
+
+
+def upsert_ratings(session: Session, ident: Identity, payload: Payload):
+    """Ratings of one period for a roster: {"period", "ratings": [{"enrollment_id", "value"}]}."""
+    period = payload.get("period")
+    if period not in RATING_PERIODS:
+        return {"message": "Invalid period"}, 400
+
+    def parse(item: Dict[str, Any]) -> Dict[str, Any]:
+        return {"period": period, "value": _score(item.get("value"))}
+
+    by_enrollment, errors = _roster(session, ident, payload.get("ratings"), parse)
+    if errors:
+        return {"message": "Invalid rows", "errors": errors}, 400
+    return _upsert_roster(session, ident, Rating, "period", by_enrollment)
+
+
+def counts_for_role(session: Session, identity: Identity):
+    role = identity.get("role")
+    user_id = identity.get("id")
+    # Base counts
+    students_q = select(func.count()).select_from(Student)
+    groups_q = select(func.count()).select_from(Group)
+    courses_q = select(func.count()).select_from(Course)
+    enroll_q = select(func.count()).select_from(Enrollment)
+
+    if role == Role.DEAN:
+        pass  # full
+    elif role == Role.VICE_DEAN:
+        pass  # similar to dean for counts; detailed endpoints will filter
+    elif role == Role.TEACHER:
+        # limit to courses where teacher_id=user_id
+        courses_q = select(func.count()).select_from(Course).filter_by(teacher_id=user_id)
+        enroll_q = (
+            select(func.count())
+            .select_from(Enrollment)
+            .join(Course, Course.id == Enrollment.course_id)
+            .filter(Course.teacher_id == user_id)
+        )
+        # students in those enrollments, each once
+        students_q = select(func.count()).select_from(TeacherStudent).filter_by(teacher_id=user_id)
+    elif role == Role.STUDENT:
+        # only self
+        students_q = (
+            select(func.count())
+            .select_from(Student)
+            .join(User, User.id == Student.user_id)
+            .filter(User.id == user_id)
+        )
+        # groups: their group only
+        groups_q = (
+            select(func.count())
+            .select_from(Group)
+            .join(Student, Student.group_id == Group.id)
+            .join(User, User.id == Student.user_id)
+            .filter(User.id == user_id)
+        )
+        # courses/enrollments they are enrolled in
+        enroll_q = select(func.count()).select_from(Enrollment).join(Student).join(User).filter(User.id == user_id)
+        courses_q = (
+            select(func.count())
+            .select_from(Course)
+            .join(Enrollment, Enrollment.course_id == Course.id)
+            .join(Student, Student.id == Enrollment.student_id)
+            .join(User, User.id == Student.user_id)
+            .filter(User.id == user_id)
+        )
+    else:
+        # parent: similar to student but filtered later by child mapping (not modeled yet)
+        pass
+
+    return {
+        "students": session.execute(students_q).scalar() or 0,
+        "groups": session.execute(groups_q).scalar() or 0,
+        "courses": session.execute(courses_q).scalar() or 0,
+        "enrollments": session.execute(enroll_q).scalar() or 0,
+    }
+
+
+def new_user(session: Session, payload: Payload) -> Tuple[Optional[User], Optional[Tuple[Dict[str, str], int]]]:
+    """Validate an account request; returns (unsaved user, None) or (None, error response)."""
+    email = payload["email"]
+    role = payload["role"]
+    if role not in {Role.STUDENT, Role.TEACHER, Role.VICE_DEAN, Role.DEAN, Role.PARENT}:
+        return None, ({"message": "Invalid role"}, 400)
+    if find_user(session, email):
+        return None, ({"message": "Email already exists"}, 409)
+    return User(email=email, role=role, full_name=payload.get("full_name", "")), None
+
+
+def save_user(session: Session, user: User):
+    session.add(user)
+    session.commit()
+    return {"id": user.id, "email": user.email, "role": user.role}
@@ -0,0 +1,245 @@
+"""Bulk student import from CSV/XLSX uploads for the CRM API.
+
+The file reader (iter_rows and the XLSX streaming) and the StudentImport
+pipeline mirror services/student_import.py of the root app; only the columns
+and the models differ. The copy is deliberate: both apps ship top-level
+``database``/``api`` packages and run from their own roots, so neither can
+import the other. A fix to the reader or the chunked writes belongs in both.
+"""
+from __future__ import annotations
+
+import codecs
+import csv
+import multiprocessing
+import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from api.passwords import hash_many
+from database import db
+from database.models import Group, Role, Student, User
+
+COLUMNS = ("email", "password", "full_name", "student_uid", "group")
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+Row = Tuple[int, Dict[str, str]]
+
+
+def iter_rows(stream: BinaryIO, filename: str) -> Iterator[Row]:
+    """Yield (line number, row) pairs from a CSV or XLSX upload without loading it whole."""
+    if filename.lower().endswith(".xlsx"):
+        yield from _iter_xlsx(stream)
+    else:
+        yield from _iter_csv(stream)
+
+
+def _iter_csv(stream: BinaryIO) -> Iterator[Row]:
+    reader = csv.DictReader(codecs.getreader("utf-8-sig")(stream))
+    for line_no, row in enumerate(reader, start=2):
+        yield line_no, {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+
+
+def _iter_xlsx(stream: BinaryIO) -> Iterator[Row]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:
+        raise ValueError("XLSX import requires the openpyxl package") from exc
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell or "").strip().lower() for cell in next(rows, ())]
+        for line_no, values in enumerate(rows, start=2):
+            if not any(values):
+                continue
+            yield line_no, {key: _cell(value) for key, value in zip(header, values) if key}
+    finally:
+        workbook.close()
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+class StudentImport:
+    """Bulk-create student accounts (users + students) from streamed rows.
+
+    Rows are validated as they are read and written in chunks of
+    IMPORT_CHUNK_SIZE: passwords are hashed in a process pool while the
+    previous chunk is inserted with one multi-row INSERT per table. With
+    ``dry_run`` every check runs but nothing is written.
+    """
+
+    def __init__(self, dry_run: bool = False, chunk_size: Optional[int] = None,
+                 processes: Optional[int] = None, rounds: Optional[int] = None) -> None:
+        config = current_app.config
+        self.dry_run = dry_run
+        self.chunk_size = chunk_size or config["IMPORT_CHUNK_SIZE"]
+        self.processes = processes or config["IMPORT_HASH_PROCESSES"]
+        self.rounds = rounds or config["IMPORT_BCRYPT_ROUNDS"]
+        self.total = 0
+        self.imported = 0
+        self.errors: List[Dict[str, Any]] = []
+        self._groups = self._load_groups()
+        self._emails: set = set()
+        self._uids: set = set()
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "dry_run": self.dry_run,
+            "total": self.total,
+            "imported": 0 if self.dry_run else self.imported,
+            "valid": self.total - len(self.errors),
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+        }
+
+    def run(self, rows: Iterator[Row]) -> Dict[str, Any]:
+        pool = None
+        if not self.dry_run:
+            pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"))
+        # Hash the next chunk while the previous one is being inserted
+        pending: deque = deque()
+        try:
+            chunk: List[Dict[str, Any]] = []
+            for line_no, row in rows:
+                self.total += 1
+                record = self._validate(line_no, row)
+                if record is None:
+                    continue
+                chunk.append(record)
+                if len(chunk) >= self.chunk_size:
+                    pending.append(self._prepare(chunk, pool))
+                    chunk = []
+                    if len(pending) > 1:
+                        self._write(*pending.popleft())
+            if chunk:
+                pending.append(self._prepare(chunk, pool))
+            while pending:
+                self._write(*pending.popleft())
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        return self.report()
+
+    def _load_groups(self) -> Dict[str, int]:
+        groups: Dict[str, int] = {}
+        for group_id, name in db.session.execute(db.select(Group.id, Group.name)):
+            groups[str(group_id)] = group_id
+            groups[name.strip().lower()] = group_id
+        return groups
+
+    def _error(self, line_no: int, messages: List[str]) -> None:
+        self.errors.append({"row": line_no, "errors": messages})
+
+    def _validate(self, line_no: int, row: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        record: Dict[str, Any] = {column: row.get(column, "") for column in COLUMNS}
+        if not record["group"] and row.get("group_id"):
+            record["group"] = row["group_id"]
+
+        messages = [f"Missing {column}" for column in COLUMNS if not record[column]]
+        email = record["email"].lower()
+        record["email"] = email
+        if email and not EMAIL_RE.match(email):
+            messages.append("Invalid email")
+        elif email in self._emails:
+            messages.append("Duplicate email in file")
+        if record["student_uid"] in self._uids:
+            messages.append("Duplicate student_uid in file")
+        if record["group"]:
+            record["group_id"] = self._groups.get(record["group"].lower())
+            if record["group_id"] is None:
+                messages.append(f"Unknown group {record['group']!r}")
+
+        if messages:
+            self._error(line_no, messages)
+            return None
+        self._emails.add(email)
+        self._uids.add(record["student_uid"])
+        record["line_no"] = line_no
+        return record
+
+    def _prepare(self, chunk: List[Dict[str, Any]], pool: Optional[ProcessPoolExecutor]):
+        chunk = self._exclude_existing(chunk)
+        if pool is None or not chunk:
+            return chunk, None
+        # One task per worker process rather than one per password
+        passwords = [record.pop("password") for record in chunk]
+        step = -(-len(passwords) // self.processes)
+        futures = [pool.submit(hash_many, passwords[i:i + step], self.rounds)
+                   for i in range(0, len(passwords), step)]
+        return chunk, futures
+
+    def _exclude_existing(self, chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        emails = set(db.session.execute(
+            db.select(User.email).where(User.email.in_([r["email"] for r in chunk]))
+        ).scalars())
+        uids = set(db.session.execute(
+            db.select(Student.student_uid).where(Student.student_uid.in_([r["student_uid"] for r in chunk]))
+        ).scalars())
+        fresh = []
+        for record in chunk:
+            messages = []
+            if record["email"] in emails:
+                messages.append("Email already exists")
+            if record["student_uid"] in uids:
+                messages.append("student_uid already exists")
+            if messages:
+                self._error(record["line_no"], messages)
+            else:
+                fresh.append(record)
+        return fresh
+
+    def _write(self, chunk: List[Dict[str, Any]], futures: Optional[List[Future]]) -> None:
+        if futures is None:
+            return
+        hashes = [password_hash for future in futures for password_hash in future.result()]
+        for record, password_hash in zip(chunk, hashes):
+            record["password_hash"] = password_hash
+        try:
+            self._insert(chunk)
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent writer won a race; retry row by row to pinpoint it
+            db.session.rollback()
+            for record in chunk:
+                try:
+                    self._insert([record])
+                    db.session.commit()
+                except IntegrityError as exc:
+                    db.session.rollback()
+                    self._error(record["line_no"], [f"Database error: {exc.orig}"])
+
+    def _insert(self, chunk: List[Dict[str, Any]]) -> None:
+        user_ids = dict(db.session.execute(
+            User.__table__.insert().returning(User.email, User.id),
+            [{
+                "email": r["email"],
+                "password_hash": r["password_hash"],
+                "role": Role.STUDENT,
+                "full_name": r["full_name"],
+            } for r in chunk],
+        ).all())
+        db.session.execute(
+            Student.__table__.insert(),
+            [{
+                "user_id": user_ids[r["email"]],
+                "group_id": r["group_id"],
+                "student_uid": r["student_uid"],
+            } for r in chunk],
+        )
+        self.imported += len(chunk)
+
+
+def import_students(stream: BinaryIO, filename: str, dry_run: bool = False, **options: Any) -> Dict[str, Any]:
+    return StudentImport(dry_run=dry_run, **options).run(iter_rows(stream, filename))
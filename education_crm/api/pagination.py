@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import base64
+import json
+from typing import Optional
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Return the last seen id encoded in an opaque cursor; ValueError if malformed."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["id"])
+    except (KeyError, TypeError, json.JSONDecodeError, UnicodeDecodeError, base64.binascii.Error) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def page_size(raw: Optional[str]) -> int:
+    if not raw:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(raw), MAX_PAGE_SIZE))
@@ -0,0 +1,91 @@
+"""Password hashing on a bounded worker pool (login, imports, account creation).
+
+PasswordPool and HashingBusy follow services/passwords.py of the root app,
+with passlib bcrypt instead of werkzeug's scrypt. There is no shared module
+because the apps' top-level packages collide; keep the queue and timeout
+behaviour of the two copies the same.
+"""
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from flask import current_app
+from passlib.hash import bcrypt
+
+from database.models import User
+
+
+class HashingBusy(Exception):
+    """Raised when the password hashing queue stays full for longer than the timeout."""
+
+
+class PasswordPool:
+    """Bounded thread pool for bcrypt hashing and verification.
+
+    bcrypt releases the GIL, so up to ``workers`` hashes run in parallel while
+    at most ``workers + queue_size`` requests wait for one. Anything beyond
+    that fails fast with HashingBusy instead of tying up every request worker
+    during a login spike.
+    """
+
+    def __init__(self, workers: int, queue_size: int, timeout: float) -> None:
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HashingBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+_pool: Optional[PasswordPool] = None
+_pool_lock = threading.Lock()
+
+
+def password_pool() -> PasswordPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = current_app.config
+                _pool = PasswordPool(
+                    config["PASSWORD_HASH_WORKERS"],
+                    config["PASSWORD_HASH_QUEUE"],
+                    config["PASSWORD_HASH_TIMEOUT"],
+                )
+    return _pool
+
+
+def hash_many(passwords: List[str], rounds: int) -> List[str]:
+    """Process-pool task: hash a batch of passwords in one round trip."""
+    hasher = bcrypt.using(rounds=rounds)
+    return [hasher.hash(password) for password in passwords]
+
+
+def hash_password(user: User, password: str) -> None:
+    password_pool().run(user.set_password, password, current_app.config["BCRYPT_ROUNDS"])
+
+
+def verify_password(user: User, password: str) -> bool:
+    """Check a password and rehash it in place when BCRYPT_ROUNDS has changed.
+
+    The caller is responsible for committing the updated hash.
+    """
+    if not password_pool().run(user.check_password, password):
+        return False
+    rounds = current_app.config["BCRYPT_ROUNDS"]
+    if user.password_needs_rehash(rounds):
+        password_pool().run(user.set_password, password, rounds)
+    return True
@@ -2,32 +2,50 @@ from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from config import Config
+from sqlalchemy import text
 from database import db
+from database.pool import engine_options, pool_status
+from api.metrics import init_metrics
 
 
 def create_app() -> Flask:
     app = Flask(__name__, static_folder="static", template_folder="templates")
     app.config.from_object(Config)
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config))
 
     CORS(app, resources={r"/*": {"origins": app.config.get("CORS_ORIGINS", "*")}})
     JWTManager(app)
 
-    # Init DB
+    # Init DB; connections are opened lazily on first use
     db.init_app(app)
     with app.app_context():
-        try:
-            db.engine.connect().close()
-        except Exception as exc:
-            app.logger.warning("Database not reachable: %s", exc)
+        init_metrics(app, db.engine)
 
     # Deferred imports to avoid circular deps
     from api.all import api_bp
 
     app.register_blueprint(api_bp, url_prefix="/api")
 
+    @app.cli.command("teacher-scope")
+    def teacher_scope():
+        """Rebuild the teacher_students visibility scope from enrollments."""
+        from api.handlers import refresh_teacher_scope
+
+        pairs = refresh_teacher_scope(db.session)
+        db.session.commit()
+        print(f"teacher_students: {pairs} rows")
+
     @app.get("/health")
     def health():
-        return {"status": "ok"}
+        status = "ok"
+        try:
+            db.session.execute(text("SELECT 1"))
+        except Exception as exc:
+            app.logger.warning("Database not reachable: %s", exc)
+            status = "database_unreachable"
+        finally:
+            db.session.rollback()
+        return {"status": status, "pool": pool_status(db.engine)}, 200 if status == "ok" else 503
 
     return app
 
@@ -0,0 +1,242 @@
+"""Async serving mode for the JSON API.
+
+    uvicorn asgi:create_asgi_app --factory --host 0.0.0.0 --port 8001
+
+Serves the same ``/api`` routes as the Flask blueprint, with the same JWT
+tokens and ``require_roles`` checks, on an async SQLAlchemy engine (asyncpg
+for PostgreSQL, aiosqlite for SQLite). The route logic is shared: each
+endpoint runs the matching ``api.handlers`` function through
+``AsyncSession.run_sync``, so database I/O waits on the event loop instead of
+holding a thread. Password hashing runs in worker threads bounded by
+PASSWORD_HASH_WORKERS. The CSV/XLSX import stays on the Flask app.
+"""
+from __future__ import annotations
+
+import json
+from contextlib import asynccontextmanager
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+import anyio
+from flask_jwt_extended import create_access_token, decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import ExpiredSignatureError, InvalidTokenError
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Mount, Route
+
+from app import create_app
+from api import handlers
+from api.pagination import decode_cursor, page_size
+from database.models import Role
+from database.pool import engine_options, pool_status
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+Endpoint = Callable[[Request], Awaitable[Response]]
+
+
+def async_database_url(url: str) -> str:
+    """Swap the sync driver for its async counterpart (psycopg2 -> asyncpg, pysqlite -> aiosqlite)."""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def create_asgi_app() -> Starlette:
+    # The Flask app supplies configuration, the JWT manager and the JSON encoder
+    flask_app = create_app()
+    config = flask_app.config
+
+    url = config.get("ASYNC_DATABASE_URL") or async_database_url(config["SQLALCHEMY_DATABASE_URI"])
+    engine = create_async_engine(url, **engine_options(config, url))
+    # expire_on_commit=False: handlers read ids back after committing
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    hash_limiter = anyio.CapacityLimiter(config["PASSWORD_HASH_WORKERS"])
+
+    def respond(result: Any) -> Response:
+        headers = None
+        status = 200
+        if isinstance(result, tuple):
+            body, status, *rest = result
+            headers = rest[0] if rest else None
+        else:
+            body = result
+        return Response(flask_app.json.dumps(body), status_code=status, headers=headers,
+                        media_type="application/json")
+
+    def authenticate(request: Request) -> Tuple[Optional[Dict[str, Any]], Optional[Response]]:
+        """Mirror of flask_jwt_extended's jwt_required() for header tokens."""
+        header = request.headers.get("Authorization")
+        if not header:
+            return None, respond(({"msg": "Missing Authorization Header"}, 401))
+        parts = header.split()
+        if len(parts) != 2 or parts[0] != "Bearer":
+            return None, respond(({"msg": "Bad Authorization header. Expected 'Authorization: Bearer <JWT>'"}, 422))
+        try:
+            with flask_app.app_context():
+                claims = decode_token(parts[1])
+        except ExpiredSignatureError:
+            return None, respond(({"msg": "Token has expired"}, 401))
+        except (InvalidTokenError, JWTExtendedException) as exc:
+            return None, respond(({"msg": str(exc)}, 422))
+        if claims.get("type") != "access":
+            return None, respond(({"msg": "Only non-refresh tokens are allowed"}, 422))
+        return claims[config["JWT_IDENTITY_CLAIM"]], None
+
+    async def json_body(request: Request) -> Tuple[Any, Optional[Response]]:
+        """request.json(), or a 400 for a malformed body like Flask's get_json(force=True)."""
+        try:
+            return await request.json(), None
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return None, respond(({"message": "Invalid JSON body"}, 400))
+
+    def jwt_required(*allowed_roles: str):
+        """jwt_required(), or require_roles(...) when roles are given."""
+        def decorator(fn):
+            @wraps(fn)
+            async def wrapper(request: Request) -> Response:
+                ident, error = authenticate(request)
+                if error is not None:
+                    return error
+                if allowed_roles and ident.get("role") not in allowed_roles:
+                    return respond(({"message": "Forbidden"}, 403))
+                return await fn(request, ident)
+
+            return wrapper
+
+        return decorator
+
+    def shared(handler: Callable[..., Any], *allowed_roles: str) -> Endpoint:
+        """Endpoint running a JSON-body handler from api.handlers on the async session."""
+        @jwt_required(*allowed_roles)
+        async def endpoint(request: Request, ident: Dict[str, Any]) -> Response:
+            payload, error = await json_body(request)
+            if error is not None:
+                return error
+            async with Session() as session:
+                return respond(await session.run_sync(handler, ident, payload, **request.path_params))
+
+        return endpoint
+
+    async def login(request: Request) -> Response:
+        data, error = await json_body(request)
+        if error is not None:
+            return error
+        email = data.get("email")
+        password = data.get("password")
+        if not email or not password:
+            return respond(({"message": "Invalid credentials"}, 401))
+
+        async with Session() as session:
+            user = await session.run_sync(handlers.find_user, email)
+            if user is not None and hash_limiter.statistics().tasks_waiting >= config["PASSWORD_HASH_QUEUE"]:
+                return respond(({"message": "Too many login attempts in progress, retry shortly"}, 503,
+                                {"Retry-After": "1"}))
+            valid = user is not None and await anyio.to_thread.run_sync(
+                user.check_password, password, limiter=hash_limiter)
+            if not valid:
+                return respond(({"message": "Invalid credentials"}, 401))
+            # Persist an upgraded hash if the cost parameters changed
+            rounds = config["BCRYPT_ROUNDS"]
+            if user.password_needs_rehash(rounds):
+                await anyio.to_thread.run_sync(user.set_password, password, rounds, limiter=hash_limiter)
+                await session.commit()
+            identity = handlers.identity_for(user)
+
+        with flask_app.app_context():
+            token = create_access_token(identity=identity)
+        return respond({"access_token": token, "user": identity})
+
+    @jwt_required()
+    async def me(request: Request, ident: Dict[str, Any]) -> Response:
+        return respond({"me": ident})
+
+    async def hello(request: Request) -> Response:
+        return respond({"message": "Education CRM API"})
+
+    async def health(request: Request) -> Response:
+        status = "ok"
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        except Exception:
+            status = "database_unreachable"
+        return respond(({"status": status, "pool": pool_status(engine)}, 200 if status == "ok" else 503))
+
+    @jwt_required()
+    async def list_students(request: Request, ident: Dict[str, Any]) -> Response:
+        try:
+            after = decode_cursor(request.query_params.get("cursor"))
+            limit = page_size(request.query_params.get("limit"))
+        except ValueError:
+            return respond(({"message": "Invalid pagination parameters"}, 400))
+
+        if request.query_params.get("format") == "ndjson":
+            q = handlers.students_query(ident, after)
+
+            async def generate() -> Iterable[str]:
+                async with Session() as session:
+                    result = await session.stream(q.execution_options(yield_per=1000))
+                    async for row in result:
+                        yield json.dumps(handlers.student_row(row), ensure_ascii=False) + "\n"
+
+            return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+        async with Session() as session:
+            return respond(await session.run_sync(handlers.students_page, ident, after, limit))
+
+    @jwt_required()
+    async def visibility_counts(request: Request, ident: Dict[str, Any]) -> Response:
+        async with Session() as session:
+            return respond(await session.run_sync(handlers.counts_for_role, ident))
+
+    @jwt_required(Role.DEAN)
+    async def admin_create_user(request: Request, ident: Dict[str, Any]) -> Response:
+        payload, error = await json_body(request)
+        if error is not None:
+            return error
+        async with Session() as session:
+            user, error = await session.run_sync(handlers.new_user, payload)
+            if error:
+                return respond(error)
+            await anyio.to_thread.run_sync(user.set_password, payload["password"], config["BCRYPT_ROUNDS"],
+                                           limiter=hash_limiter)
+            return respond(await session.run_sync(handlers.save_user, user))
+
+    api_routes = [
+        Route("/auth/login", login, methods=["POST"]),
+        Route("/me", me, methods=["GET"]),
+        Route("/hello", hello, methods=["GET"]),
+        Route("/students", list_students, methods=["GET"]),
+        Route("/groups", shared(handlers.create_group, Role.DEAN, Role.VICE_DEAN), methods=["POST"]),
+        Route("/courses", shared(handlers.create_course, Role.DEAN, Role.VICE_DEAN), methods=["POST"]),
+        Route("/students", shared(handlers.create_student, Role.DEAN, Role.VICE_DEAN), methods=["POST"]),
+        Route("/enrollments", shared(handlers.create_enrollment, Role.DEAN, Role.VICE_DEAN), methods=["POST"]),
+        Route("/attendance", shared(handlers.add_attendance), methods=["POST"]),
+        Route("/attendance/roster", shared(handlers.submit_roster_attendance, Role.TEACHER, Role.VICE_DEAN, Role.DEAN),
+              methods=["POST"]),
+        Route("/attendance/{att_id:int}", shared(handlers.update_attendance), methods=["PUT"]),
+        Route("/behavior", shared(handlers.add_behavior), methods=["POST"]),
+        Route("/ratings", shared(handlers.add_rating), methods=["POST"]),
+        Route("/exams", shared(handlers.add_exam), methods=["POST"]),
+        Route("/exams/batch", shared(handlers.upsert_exams, Role.TEACHER, Role.VICE_DEAN, Role.DEAN), methods=["POST"]),
+        Route("/ratings/batch", shared(handlers.upsert_ratings, Role.TEACHER, Role.VICE_DEAN, Role.DEAN),
+              methods=["POST"]),
+        Route("/visibility/counts", visibility_counts, methods=["GET"]),
+        Route("/admin/create_user", admin_create_user, methods=["POST"]),
+    ]
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        yield
+        await engine.dispose()
+
+    return Starlette(
+        routes=[Route("/health", health, methods=["GET"]), Mount("/api", routes=api_routes)],
+        lifespan=lifespan,
+    )
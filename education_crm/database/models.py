@@ -23,18 +23,24 @@ class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(255), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
-    role = db.Column(db.String(32), nullable=False, index=True)
+    role = db.Column(db.String(32), nullable=False)
     full_name = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
     student_profile = db.relationship("Student", uselist=False, back_populates="user")
 
-    def set_password(self, password: str) -> None:
-        self.password_hash = bcrypt.hash(password)
+    __table_args__ = (db.Index("idx_users_role", "role"),)
+
+    def set_password(self, password: str, rounds: Optional[int] = None) -> None:
+        hasher = bcrypt.using(rounds=rounds) if rounds else bcrypt
+        self.password_hash = hasher.hash(password)
 
     def check_password(self, password: str) -> bool:
         return bcrypt.verify(password, self.password_hash)
 
+    def password_needs_rehash(self, rounds: int) -> bool:
+        return bcrypt.using(rounds=rounds).needs_update(self.password_hash)
+
 
 class Group(db.Model):
     __tablename__ = "groups"
@@ -54,6 +60,8 @@ class Course(db.Model):
     teacher_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
     teacher = db.relationship("User", foreign_keys=[teacher_id])
 
+    __table_args__ = (db.Index("idx_courses_teacher_id", "teacher_id"),)
+
 
 class Student(db.Model):
     __tablename__ = "students"
@@ -66,6 +74,8 @@ class Student(db.Model):
     user = db.relationship("User", back_populates="student_profile")
     group = db.relationship("Group")
 
+    __table_args__ = (db.Index("idx_students_group_id", "group_id"),)
+
 
 class Enrollment(db.Model):
     __tablename__ = "enrollments"
@@ -79,13 +89,34 @@ class Enrollment(db.Model):
     student = db.relationship("Student")
     course = db.relationship("Course")
 
+    # Teacher visibility joins from courses, per-student counts from students
+    __table_args__ = (
+        db.Index("idx_enrollments_course_student", "course_id", "student_id"),
+        db.Index("idx_enrollments_student_course", "student_id", "course_id"),
+    )
+
+
+class TeacherStudent(db.Model):
+    """Teacher visibility scope: students enrolled in a course the teacher teaches.
+
+    Derived from enrollments and courses and kept up to date by api.handlers
+    (add_teacher_scope, refresh_teacher_scope); ``flask teacher-scope`` rebuilds it.
+    """
+    __tablename__ = "teacher_students"
+
+    teacher_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+
+    # The primary key serves the per-teacher semi-join; this one the student side
+    __table_args__ = (db.Index("idx_teacher_students_student", "student_id"),)
+
 
 class Attendance(db.Model):
     __tablename__ = "attendance"
 
     id = db.Column(db.Integer, primary_key=True)
     enrollment_id = db.Column(db.Integer, db.ForeignKey("enrollments.id"), nullable=False)
-    date = db.Column(db.Date, nullable=False, index=True)
+    date = db.Column(db.Date, nullable=False)
     present = db.Column(db.Boolean, default=False, nullable=False)
     activity_score = db.Column(db.Numeric(3, 1), nullable=True)  # up to 6.5
     created_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -93,6 +124,12 @@ class Attendance(db.Model):
 
     enrollment = db.relationship("Enrollment")
 
+    __table_args__ = (
+        db.Index("idx_attendance_date", "date"),
+        # One mark per enrollment and day; arbitration index of submit_roster_attendance
+        db.Index("uq_attendance_enrollment_date", "enrollment_id", "date", unique=True),
+    )
+
 
 class Behavior(db.Model):
     __tablename__ = "behavior"
@@ -100,11 +137,16 @@ class Behavior(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey("students.id"), nullable=False)
     course_id = db.Column(db.Integer, db.ForeignKey("courses.id"), nullable=True)
-    date = db.Column(db.Date, nullable=False, index=True)
+    date = db.Column(db.Date, nullable=False)
     note = db.Column(db.Text, nullable=False)
     created_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        db.Index("idx_behavior_date", "date"),
+        db.Index("idx_behavior_student_date", "student_id", "date"),
+    )
+
 
 class Rating(db.Model):
     __tablename__ = "ratings"
@@ -116,6 +158,9 @@ class Rating(db.Model):
     created_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
+    # Arbitration index of the roster upsert (handlers.upsert_ratings)
+    __table_args__ = (db.Index("uq_ratings_enrollment_period", "enrollment_id", "period", unique=True),)
+
 
 class Exam(db.Model):
     __tablename__ = "exams"
@@ -128,6 +173,12 @@ class Exam(db.Model):
     created_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        db.Index("idx_exams_enrollment_date", "enrollment_id", "date"),
+        # Arbitration index of the roster upsert (handlers.upsert_exams)
+        db.Index("uq_exams_enrollment_type", "enrollment_id", "exam_type", unique=True),
+    )
+
 
 def can_edit_within(created_at: datetime, days: int) -> bool:
     return datetime.utcnow() <= created_at + timedelta(days=days)
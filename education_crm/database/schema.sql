@@ -80,3 +80,24 @@ CREATE TABLE IF NOT EXISTS exams (
 CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
 CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance(date);
 CREATE INDEX IF NOT EXISTS idx_behavior_date ON behavior(date);
+
+-- Hot query indexes (migrations/versions/0002)
+CREATE INDEX IF NOT EXISTS idx_enrollments_course_student ON enrollments(course_id, student_id);
+CREATE INDEX IF NOT EXISTS idx_enrollments_student_course ON enrollments(student_id, course_id);
+CREATE INDEX IF NOT EXISTS idx_courses_teacher_id ON courses(teacher_id);
+CREATE INDEX IF NOT EXISTS idx_students_group_id ON students(group_id);
+CREATE INDEX IF NOT EXISTS idx_exams_enrollment_date ON exams(enrollment_id, date);
+CREATE INDEX IF NOT EXISTS idx_behavior_student_date ON behavior(student_id, date);
+
+-- Roster upsert keys (migrations/versions/0003, 0004)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_ratings_enrollment_period ON ratings(enrollment_id, period);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_exams_enrollment_type ON exams(enrollment_id, exam_type);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_attendance_enrollment_date ON attendance(enrollment_id, date);
+
+-- Teacher visibility scope (migrations/versions/0005); rebuilt with `flask teacher-scope`
+CREATE TABLE IF NOT EXISTS teacher_students (
+    teacher_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    student_id INTEGER NOT NULL REFERENCES students(id) ON DELETE CASCADE,
+    PRIMARY KEY (teacher_id, student_id)
+);
+CREATE INDEX IF NOT EXISTS idx_teacher_students_student ON teacher_students(student_id);
@@ -0,0 +1,45 @@
+"""Indexes for the hot queries of api/handlers.py.
+
+- enrollments (course_id, student_id) and (student_id, course_id): the teacher
+  visibility subquery and the per-role counts read enrollments from either side,
+  and both are index-only with the second column included
+- courses (teacher_id): courses taught by the caller
+- students (group_id): group rosters and counts
+- attendance (enrollment_id, date), ratings (enrollment_id, period),
+  exams (enrollment_id, date): per-enrollment lookups and the foreign key checks
+  when an enrollment is deleted
+- behavior (student_id, date): a student's notes, newest first
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision: str = "0002"
+down_revision: str | None = "0001"
+branch_labels: str | None = None
+depends_on: str | None = None
+
+INDEXES = (
+    ("idx_enrollments_course_student", "enrollments", ["course_id", "student_id"]),
+    ("idx_enrollments_student_course", "enrollments", ["student_id", "course_id"]),
+    ("idx_courses_teacher_id", "courses", ["teacher_id"]),
+    ("idx_students_group_id", "students", ["group_id"]),
+    ("idx_attendance_enrollment_date", "attendance", ["enrollment_id", "date"]),
+    ("idx_ratings_enrollment_period", "ratings", ["enrollment_id", "period"]),
+    ("idx_exams_enrollment_date", "exams", ["enrollment_id", "date"]),
+    ("idx_behavior_student_date", "behavior", ["student_id", "date"]),
+)
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,67 @@
+"""Unique keys for the roster upserts of api/handlers.py.
+
+- ratings (enrollment_id, period): one rating per period; replaces the plain
+  idx_ratings_enrollment_period, which served the same lookups
+- exams (enrollment_id, exam_type): one score per exam type
+
+``INSERT ... ON CONFLICT`` needs these as arbitration indexes. Duplicates left
+by the single-row endpoints are collapsed to the newest row first; the older
+rows are moved to ratings_duplicates / exams_duplicates (created only when
+there are any), not deleted. Review and drop those tables once checked;
+downgrade puts the rows back.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0003"
+down_revision: str | None = "0002"
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+def _archive_duplicates(table: str, key: str) -> None:
+    """Move all but the newest row of each (enrollment_id, key) to <table>_duplicates."""
+    bind = op.get_bind()
+    losers = f"id NOT IN (SELECT max(id) FROM {table} GROUP BY enrollment_id, {key})"
+    if bind.execute(sa.text(f"SELECT 1 FROM {table} WHERE {losers} LIMIT 1")).first() is None:
+        return
+    archive = f"{table}_duplicates"
+    if sa.inspect(bind).has_table(archive):
+        op.execute(f"INSERT INTO {archive} SELECT * FROM {table} WHERE {losers}")
+    else:
+        op.execute(f"CREATE TABLE {archive} AS SELECT * FROM {table} WHERE {losers}")
+    op.execute(f"DELETE FROM {table} WHERE {losers}")
+
+
+def _restore_duplicates(table: str) -> None:
+    """Put the archived rows back (the unique key must be gone) and drop the archive."""
+    archive = f"{table}_duplicates"
+    if sa.inspect(op.get_bind()).has_table(archive):
+        op.execute(f"INSERT INTO {table} SELECT * FROM {archive}")
+        op.drop_table(archive)
+
+
+def upgrade() -> None:
+    _archive_duplicates("ratings", "period")
+    _archive_duplicates("exams", "exam_type")
+    op.drop_index("idx_ratings_enrollment_period", table_name="ratings", if_exists=True)
+    # if_exists/if_not_exists: databases created from schema.sql already have the new keys
+    op.create_index("uq_ratings_enrollment_period", "ratings", ["enrollment_id", "period"],
+                    unique=True, if_not_exists=True)
+    op.create_index("uq_exams_enrollment_type", "exams", ["enrollment_id", "exam_type"],
+                    unique=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    # Restores the archived duplicates; rows the upsert overwrote since keep their new values
+    op.drop_index("uq_exams_enrollment_type", table_name="exams")
+    op.drop_index("uq_ratings_enrollment_period", table_name="ratings")
+    op.create_index("idx_ratings_enrollment_period", "ratings", ["enrollment_id", "period"])
+    _restore_duplicates("exams")
+    _restore_duplicates("ratings")
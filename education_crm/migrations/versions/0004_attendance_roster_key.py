@@ -0,0 +1,60 @@
+"""Unique (enrollment_id, date) for attendance.
+
+api.handlers.submit_roster_attendance upserts a class roster with
+``INSERT ... ON CONFLICT (enrollment_id, date)``, so a re-submitted roster
+updates the marks instead of duplicating them. The unique index replaces the
+plain idx_attendance_enrollment_date; duplicates are collapsed to the newest
+row first and the older rows are moved to attendance_duplicates (created only
+when there are any). Review and drop it once checked; downgrade puts the rows
+back.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0004"
+down_revision: str | None = "0003"
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+def _archive_duplicates(table: str, key: str) -> None:
+    """Move all but the newest row of each (enrollment_id, key) to <table>_duplicates."""
+    bind = op.get_bind()
+    losers = f"id NOT IN (SELECT max(id) FROM {table} GROUP BY enrollment_id, {key})"
+    if bind.execute(sa.text(f"SELECT 1 FROM {table} WHERE {losers} LIMIT 1")).first() is None:
+        return
+    archive = f"{table}_duplicates"
+    if sa.inspect(bind).has_table(archive):
+        op.execute(f"INSERT INTO {archive} SELECT * FROM {table} WHERE {losers}")
+    else:
+        op.execute(f"CREATE TABLE {archive} AS SELECT * FROM {table} WHERE {losers}")
+    op.execute(f"DELETE FROM {table} WHERE {losers}")
+
+
+def _restore_duplicates(table: str) -> None:
+    """Put the archived rows back (the unique key must be gone) and drop the archive."""
+    archive = f"{table}_duplicates"
+    if sa.inspect(op.get_bind()).has_table(archive):
+        op.execute(f"INSERT INTO {table} SELECT * FROM {archive}")
+        op.drop_table(archive)
+
+
+def upgrade() -> None:
+    _archive_duplicates("attendance", "date")
+    # if_exists/if_not_exists: databases created from schema.sql already have the new key
+    op.drop_index("idx_attendance_enrollment_date", table_name="attendance", if_exists=True)
+    op.create_index("uq_attendance_enrollment_date", "attendance", ["enrollment_id", "date"],
+                    unique=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("uq_attendance_enrollment_date", table_name="attendance")
+    op.create_index("idx_attendance_enrollment_date", "attendance", ["enrollment_id", "date"])
+    # Restores the archived duplicates; rows the upsert overwrote since keep their new values
+    _restore_duplicates("attendance")
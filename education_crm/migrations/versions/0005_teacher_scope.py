@@ -0,0 +1,45 @@
+"""teacher_students: precomputed teacher visibility scope.
+
+Teachers see the students enrolled in the courses they teach. The pairs were
+joined students -> enrollments -> courses on every request; now they are kept
+in teacher_students and role-filtered queries read its primary key. The table
+is filled here from the existing enrollments.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0005"
+down_revision: str | None = "0004"
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+def upgrade() -> None:
+    # Databases created from schema.sql already have the table
+    if not sa.inspect(op.get_bind()).has_table("teacher_students"):
+        op.create_table(
+            "teacher_students",
+            sa.Column("teacher_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("student_id", sa.Integer(), sa.ForeignKey("students.id", ondelete="CASCADE"),
+                      primary_key=True),
+        )
+    op.create_index("idx_teacher_students_student", "teacher_students", ["student_id"], if_not_exists=True)
+    op.execute(
+        "INSERT INTO teacher_students (teacher_id, student_id) "
+        "SELECT DISTINCT c.teacher_id, e.student_id FROM enrollments e "
+        "JOIN courses c ON c.id = e.course_id "
+        "WHERE c.teacher_id IS NOT NULL "
+        "AND NOT EXISTS (SELECT 1 FROM teacher_students t "
+        "WHERE t.teacher_id = c.teacher_id AND t.student_id = e.student_id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_teacher_students_student", table_name="teacher_students")
+    op.drop_table("teacher_students")
@@ -0,0 +1,50 @@
+"""Муҳити Alembic барои app.py
+
+Пайвастшавӣ аз create_app() (DATABASE_URL ва SQLALCHEMY_ENGINE_OPTIONS) ё
+пайвасти тайёр аз config.attributes['connection'] (бенчмаркҳо).
+"""
+from logging.config import fileConfig
+
+from alembic import context
+
+from database.models import db
+# Ворид кардан PRIMARY KEY (id, date)-и attendance-ро дар PostgreSQL низ фаъол мекунад
+from database.partitions import DEFAULT_PARTITION, PARTITION_NAME
+
+config = context.config
+target_metadata = db.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # Partition-ҳои attendance ва бойгонии такрорҳо (0002) дар моделҳо нестанд;
+    # autogenerate онҳоро нест накунад
+    if type_ == 'table' and reflected:
+        return not (name == DEFAULT_PARTITION or PARTITION_NAME.match(name) or name.endswith('_duplicates'))
+    return True
+
+
+def run_migrations(connection):
+    context.configure(connection=connection, target_metadata=target_metadata, compare_type=True,
+                      include_object=include_object)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connection = config.attributes.get('connection')
+    if connection is not None:
+        run_migrations(connection)
+        return
+
+    from app import create_app
+
+    if config.config_file_name is not None:
+        fileConfig(config.config_file_name, disable_existing_loggers=False)
+    app = create_app()
+    with app.app_context(), db.engine.connect() as connection:
+        run_migrations(connection)
+
+
+if context.is_offline_mode():
+    raise SystemExit('Миграцияҳо танҳо бо пайвасти пойгоҳ иҷро мешаванд (бе --sql)')
+run_migrations_online()
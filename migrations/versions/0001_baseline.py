@@ -0,0 +1,182 @@
+"""Нақшаи ибтидоӣ: ҷадвалҳои database/models.py то индексҳои 0002
+
+Пойгоҳе, ки пештар бо db.create_all() ё schema.sql сохта шудааст, бе иҷро
+қайд карда мешавад: alembic stamp 0001. Partition-ҳои attendance бо SQL-и
+ҳамин ревизия сохта мешаванд (на database.partitions).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def _create_partitions(first, count):
+    """attendance_default ва partition-ҳои `count` моҳ аз моҳи `first`"""
+    op.execute('CREATE TABLE attendance_default PARTITION OF attendance DEFAULT')
+    start = date(first.year, first.month, 1)
+    for _ in range(count):
+        end = _add_months(start, 1)
+        op.execute(
+            f'CREATE TABLE attendance_y{start.year}m{start.month:02d} PARTITION OF attendance '
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        start = end
+
+
+def upgrade():
+    partitioned = op.get_bind().dialect.name == 'postgresql'
+
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('email', sa.String(120), nullable=False, unique=True),
+        sa.Column('password_hash', sa.String(255), nullable=False),
+        sa.Column('first_name', sa.String(80), nullable=False),
+        sa.Column('last_name', sa.String(80), nullable=False),
+        sa.Column('middle_name', sa.String(80)),
+        sa.Column('role', sa.String(20), nullable=False),
+        sa.Column('phone', sa.String(20)),
+        sa.Column('address', sa.Text()),
+        sa.Column('is_active', sa.Boolean()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    op.create_table(
+        'groups',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(50), nullable=False),
+        sa.Column('course_number', sa.Integer(), nullable=False),
+        sa.Column('specialty', sa.String(100)),
+        sa.Column('year_started', sa.Integer()),
+        sa.Column('is_active', sa.Boolean()),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    op.create_table(
+        'subjects',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('code', sa.String(20), unique=True),
+        sa.Column('credits', sa.Integer()),
+        sa.Column('hours_total', sa.Integer()),
+        sa.Column('hours_lecture', sa.Integer()),
+        sa.Column('hours_practice', sa.Integer()),
+        sa.Column('course_number', sa.Integer()),
+        sa.Column('semester', sa.Integer()),
+        sa.Column('is_active', sa.Boolean()),
+    )
+    op.create_table(
+        'students',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('student_id', sa.String(20), nullable=False, unique=True),
+        sa.Column('group_id', sa.Integer(), sa.ForeignKey('groups.id')),
+        sa.Column('admission_year', sa.Integer()),
+        sa.Column('birth_date', sa.Date()),
+        sa.Column('passport_number', sa.String(20)),
+        sa.Column('parent_id', sa.Integer(), sa.ForeignKey('users.id')),
+        sa.Column('status', sa.String(20)),
+        sa.Column('search_key', sa.String(300)),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    op.create_table(
+        'teachers',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('employee_id', sa.String(20), unique=True),
+        sa.Column('position', sa.String(100)),
+        sa.Column('degree', sa.String(50)),
+        sa.Column('department', sa.String(100)),
+        sa.Column('hire_date', sa.Date()),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    op.create_table(
+        'courses',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('subject_id', sa.Integer(), sa.ForeignKey('subjects.id'), nullable=False),
+        sa.Column('teacher_id', sa.Integer(), sa.ForeignKey('teachers.id'), nullable=False),
+        sa.Column('group_id', sa.Integer(), sa.ForeignKey('groups.id'), nullable=False),
+        sa.Column('semester', sa.Integer()),
+        sa.Column('academic_year', sa.String(9)),
+        sa.Column('start_date', sa.Date()),
+        sa.Column('end_date', sa.Date()),
+        sa.Column('is_active', sa.Boolean()),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    # Дар PostgreSQL - ҷадвали тақсимшуда бо PRIMARY KEY (id, date), мисли модел
+    op.create_table(
+        'attendance',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('course_id', sa.Integer(), sa.ForeignKey('courses.id'), nullable=False),
+        sa.Column('student_id', sa.Integer(), sa.ForeignKey('students.id'), nullable=False),
+        sa.Column('date', sa.Date(), primary_key=partitioned, nullable=False),
+        sa.Column('status', sa.String(20)),
+        sa.Column('activity_score', sa.Numeric(3, 1)),
+        sa.Column('comments', sa.Text()),
+        sa.Column('created_by', sa.Integer(), sa.ForeignKey('users.id')),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.UniqueConstraint('course_id', 'student_id', 'date'),
+        postgresql_partition_by='RANGE (date)',
+        info={'partition_column': 'date'},
+    )
+    if partitioned:
+        # Моҳи ҷорӣ ва 3 моҳи пеш; баъдтар - `flask attendance-partitions`
+        _create_partitions(date.today(), 4)
+
+    op.create_table(
+        'grades',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('course_id', sa.Integer(), sa.ForeignKey('courses.id'), nullable=False),
+        sa.Column('student_id', sa.Integer(), sa.ForeignKey('students.id'), nullable=False),
+        sa.Column('grade_type', sa.String(20), nullable=False),
+        sa.Column('score', sa.Numeric(5, 2)),
+        sa.Column('max_score', sa.Numeric(5, 2)),
+        sa.Column('date_taken', sa.Date()),
+        sa.Column('comments', sa.Text()),
+        sa.Column('created_by', sa.Integer(), sa.ForeignKey('users.id')),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    op.create_table(
+        'behavior_records',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('student_id', sa.Integer(), sa.ForeignKey('students.id'), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('behavior_type', sa.String(30), nullable=False),
+        sa.Column('rating', sa.Integer(), nullable=False),
+        sa.Column('description', sa.Text()),
+        sa.Column('created_by', sa.Integer(), sa.ForeignKey('users.id')),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    op.create_table(
+        'reports',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('report_type', sa.String(50)),
+        sa.Column('student_id', sa.Integer(), sa.ForeignKey('students.id')),
+        sa.Column('course_id', sa.Integer(), sa.ForeignKey('courses.id')),
+        sa.Column('semester', sa.Integer()),
+        sa.Column('academic_year', sa.String(9)),
+        sa.Column('data', sa.JSON()),
+        sa.Column('generated_by', sa.Integer(), sa.ForeignKey('users.id')),
+        sa.Column('generated_at', sa.DateTime()),
+    )
+
+
+def downgrade():
+    for table in ('reports', 'behavior_records', 'grades', 'attendance', 'courses',
+                  'teachers', 'students', 'subjects', 'groups', 'users'):
+        op.drop_table(table)
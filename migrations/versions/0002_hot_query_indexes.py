@@ -0,0 +1,90 @@
+"""Индексҳо барои дархостҳои асосии api/all.py ва app.py
+
+- attendance (student_id, date): ҳисоботи ҳузур, транскрипт, dashboard-и донишҷӯ
+- grades (course_id, student_id, grade_type) UNIQUE: калиди save_grade
+- grades (student_id, course_id): баҳоҳои транскрипт ва рейтинг
+- students (group_id, status), students (user_id), teachers (user_id)
+- courses (teacher_id), courses (group_id, is_active)
+- reports (report_type, student_id, generated_at): транскрипти нигоҳдошташуда
+- behavior_records (student_id, date)
+
+Ҳузури ҳафтаи охир дар dashboard-и декан индекс намегирад: ҳафта қисми
+калони partition-и моҳ аст ва Seq Scan-и ҳамон partition арзонтар аст.
+
+Дар PostgreSQL сутунҳои status/grade_type/score ба индекс ҳамчун INCLUDE
+илова мешаванд (index-only scan). idx_attendance_course_date ва
+idx_grades_course_student аз schema.sql нест карда мешаванд: калидҳои
+UNIQUE бо ҳамон сутунҳои аввал онҳоро иваз мекунанд.
+
+Такрорҳои баҳо пеш аз калиди UNIQUE ба як сатр (охирин, мисли транскрипт)
+оварда мешаванд; сатрҳои кӯҳна нест намешаванд, балки ба grades_duplicates
+(танҳо агар бошанд) мегузаранд. Онҳоро санҷида ҷадвалро нест кунед;
+downgrade сатрҳоро бармегардонад.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('idx_attendance_student_date', 'attendance', ['student_id', 'date'], {'postgresql_include': ['status']}),
+    ('idx_grades_student_course', 'grades', ['student_id', 'course_id'],
+     {'postgresql_include': ['grade_type', 'score']}),
+    ('idx_students_group_status', 'students', ['group_id', 'status'], {}),
+    ('idx_students_user_id', 'students', ['user_id'], {}),
+    ('idx_teachers_user_id', 'teachers', ['user_id'], {}),
+    ('idx_courses_teacher_id', 'courses', ['teacher_id'], {}),
+    ('idx_courses_group_active', 'courses', ['group_id', 'is_active'], {}),
+    ('idx_reports_type_student', 'reports', ['report_type', 'student_id', 'generated_at'], {}),
+    ('idx_behavior_student_date', 'behavior_records', ['student_id', 'date'], {}),
+)
+
+
+def _archive_duplicates(table, key):
+    """Ҳамаи сатрҳои ҳар калид ба ҷуз охирин - ба <table>_duplicates"""
+    bind = op.get_bind()
+    losers = f'id NOT IN (SELECT MAX(id) FROM {table} GROUP BY {", ".join(key)})'
+    if bind.execute(sa.text(f'SELECT 1 FROM {table} WHERE {losers} LIMIT 1')).first() is None:
+        return
+    archive = f'{table}_duplicates'
+    if sa.inspect(bind).has_table(archive):
+        op.execute(f'INSERT INTO {archive} SELECT * FROM {table} WHERE {losers}')
+    else:
+        op.execute(f'CREATE TABLE {archive} AS SELECT * FROM {table} WHERE {losers}')
+    op.execute(f'DELETE FROM {table} WHERE {losers}')
+
+
+def _restore_duplicates(table):
+    """Сатрҳои бойгонӣ бармегарданд (калиди UNIQUE бояд набошад), бойгонӣ нест мешавад"""
+    archive = f'{table}_duplicates'
+    if sa.inspect(op.get_bind()).has_table(archive):
+        op.execute(f'INSERT INTO {table} SELECT * FROM {archive}')
+        op.drop_table(archive)
+
+
+def upgrade():
+    # Такрорҳои баҳо: мисли транскрипт (ORDER BY id) охиринаш мемонад
+    _archive_duplicates('grades', ['course_id', 'student_id', 'grade_type'])
+    op.create_index('uq_grades_course_student_type', 'grades', ['course_id', 'student_id', 'grade_type'],
+                    unique=True, if_not_exists=True)
+    op.drop_index('idx_grades_course_student', table_name='grades', if_exists=True)
+    op.drop_index('idx_attendance_course_date', table_name='attendance', if_exists=True)
+
+    for name, table, columns, options in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True, **options)
+
+
+def downgrade():
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    op.create_index('idx_attendance_course_date', 'attendance', ['course_id', 'date'])
+    op.create_index('idx_grades_course_student', 'grades', ['course_id', 'student_id'])
+    op.drop_index('uq_grades_course_student_type', table_name='grades')
+    _restore_duplicates('grades')
@@ -0,0 +1,70 @@
+"""Ҷамъбастҳои ҳузур: attendance_daily ва attendance_monthly
+
+Ҷадвалҳо аз attendance-и мавҷуда пур карда мешаванд (ҳамон ҳисоби
+`flask attendance-rollups`, бо SQL-и ҳамин ревизия - на моделҳои ҷорӣ);
+минбаъд services/rollups.py онҳоро ҳамроҳи ҳар навиштани ҳузур навсозӣ мекунад.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+STATUSES = ('present', 'late', 'absent', 'excused')
+COUNTS = ('total',) + STATUSES
+
+
+def _counts():
+    return [sa.Column(name, sa.Integer(), nullable=False) for name in COUNTS]
+
+
+def _backfill():
+    """Ҷамъбастҳо аз тамоми attendance (мисли services.rollups.rebuild_rollups)"""
+    if op.get_bind().dialect.name == 'sqlite':
+        month = "date(date, 'start of month')"
+    else:
+        month = "CAST(date_trunc('month', date) AS DATE)"
+    counts = ', '.join(['COUNT(*)'] + [
+        f"COALESCE(SUM(CASE WHEN status = '{name}' THEN 1 ELSE 0 END), 0)" for name in STATUSES
+    ])
+    columns = ', '.join(COUNTS)
+    op.execute(
+        f'INSERT INTO attendance_daily (course_id, date, {columns}) '
+        f'SELECT course_id, date, {counts} FROM attendance GROUP BY course_id, date'
+    )
+    op.execute(
+        f'INSERT INTO attendance_monthly (student_id, course_id, month, {columns}) '
+        f'SELECT student_id, course_id, {month}, {counts} FROM attendance '
+        f'GROUP BY student_id, course_id, {month}'
+    )
+
+
+def upgrade():
+    op.create_table(
+        'attendance_daily',
+        sa.Column('course_id', sa.Integer(), sa.ForeignKey('courses.id'), primary_key=True),
+        sa.Column('date', sa.Date(), primary_key=True),
+        *_counts()
+    )
+    op.create_index('idx_attendance_daily_date', 'attendance_daily', ['date'])
+    op.create_table(
+        'attendance_monthly',
+        sa.Column('student_id', sa.Integer(), sa.ForeignKey('students.id'), primary_key=True),
+        sa.Column('course_id', sa.Integer(), sa.ForeignKey('courses.id'), primary_key=True),
+        sa.Column('month', sa.Date(), primary_key=True),
+        *_counts()
+    )
+    _backfill()
+
+
+def downgrade():
+    op.drop_table('attendance_monthly')
+    op.drop_index('idx_attendance_daily_date', table_name='attendance_daily')
+    op.drop_table('attendance_daily')
@@ -0,0 +1,39 @@
+"""Кэши ҳисоботҳо дар reports: cache_key, content_hash, гуруҳ ва давра
+
+Транскриптҳои пештар нигоҳдошташуда бе invalidation буданд ва метавонанд
+кӯҳна бошанд - нест карда мешаванд ва ҳангоми дархости аввал аз нав
+сохта мешаванд.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ('group_id', 'period_start', 'period_end', 'cache_key', 'content_hash')
+
+
+def upgrade():
+    op.execute("DELETE FROM reports WHERE report_type = 'transcript'")
+    with op.batch_alter_table('reports') as batch:
+        batch.add_column(sa.Column('group_id', sa.Integer(), sa.ForeignKey('groups.id', name='fk_reports_group_id')))
+        batch.add_column(sa.Column('period_start', sa.Date()))
+        batch.add_column(sa.Column('period_end', sa.Date()))
+        batch.add_column(sa.Column('cache_key', sa.String(64)))
+        batch.add_column(sa.Column('content_hash', sa.String(64)))
+    op.create_index('idx_reports_type_group', 'reports', ['report_type', 'group_id', 'period_start'])
+    op.create_index('uq_reports_cache_key', 'reports', ['cache_key'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_reports_cache_key', table_name='reports')
+    op.drop_index('idx_reports_type_group', table_name='reports')
+    with op.batch_alter_table('reports') as batch:
+        for name in reversed(COLUMNS):
+            batch.drop_column(name)
@@ -0,0 +1,47 @@
+"""Навбати корҳои фонӣ: ҷадвали jobs
+
+Як кори фаъол ('queued', 'running') барои параметрҳои якхела - индекси
+UNIQUE-и қисмӣ; worker корҳоро бо (status, id) мегирад.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+ACTIVE = sa.text("status IN ('queued', 'running')")
+
+
+def upgrade():
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('job_type', sa.String(50), nullable=False),
+        sa.Column('params', sa.JSON(), nullable=False),
+        sa.Column('params_key', sa.String(64), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('progress', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Integer()),
+        sa.Column('result', sa.JSON()),
+        sa.Column('error', sa.Text()),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('worker', sa.String(100)),
+        sa.Column('created_by', sa.Integer(), sa.ForeignKey('users.id')),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('started_at', sa.DateTime()),
+        sa.Column('heartbeat_at', sa.DateTime()),
+        sa.Column('finished_at', sa.DateTime())
+    )
+    op.create_index('idx_jobs_status_id', 'jobs', ['status', 'id'])
+    op.create_index('uq_jobs_active_params', 'jobs', ['params_key'], unique=True,
+                    postgresql_where=ACTIVE, sqlite_where=ACTIVE)
+
+
+def downgrade():
+    op.drop_table('jobs')
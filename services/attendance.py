@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from database.models import db, Attendance
+from services.rollups import refresh_rollups
+
+
+def dialect_insert(model):
+    """INSERT бо дастгирии ON CONFLICT барои диалекти ҷорӣ"""
+    if db.engine.dialect.name == 'sqlite':
+        return sqlite.insert(model)
+    return postgresql.insert(model)
+
+
+def upsert_attendance(course_id, date, rows, user):
+    """Сабти якбораи ҳузури тамоми рӯйхат бо як INSERT ... ON CONFLICT
+
+    `rows` - рӯйхати dict бо калидҳои student_id, status, activity_score, comments.
+    Равзанаи таҳрир (Attendance.can_edit) дар худи SQL санҷида мешавад:
+    сабтҳои мавҷуда танҳо ҳангоми `date >= cutoff` навсозӣ мешаванд.
+    Натиҷа: {'saved': [...], 'rejected': [...]} - рақамҳои student_id.
+    Ҷамъбастҳои ҳузур (services/rollups.py) дар ҳамон транзаксия нав мешаванд.
+    """
+    # Як донишҷӯ дар як дархост - як сатр (охиринаш ғолиб)
+    by_student = {}
+    for item in rows:
+        student_id = item.get('student_id')
+        if student_id is None:
+            continue
+        by_student[int(student_id)] = item
+
+    if not by_student:
+        return {'saved': [], 'rejected': []}
+
+    cutoff = Attendance.edit_cutoff(user)
+    # Ҳамаи сатрҳо як сана доранд, пас сатрҳои нав низ якбора рад мешаванд
+    if cutoff is None or date < cutoff:
+        return {'saved': [], 'rejected': sorted(by_student)}
+
+    now = datetime.utcnow()
+    values = []
+    for student_id, item in by_student.items():
+        activity_score = item.get('activity_score')
+        values.append({
+            'course_id': int(course_id),
+            'student_id': student_id,
+            'date': date,
+            'status': item.get('status') or 'absent',
+            'activity_score': float(activity_score) if activity_score else None,
+            'comments': item.get('comments', ''),
+            'created_by': user.id,
+            'created_at': now,
+            'updated_at': now,
+        })
+
+    stmt = dialect_insert(Attendance).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['course_id', 'student_id', 'date'],
+        set_={
+            'status': stmt.excluded.status,
+            'activity_score': stmt.excluded.activity_score,
+            'comments': stmt.excluded.comments,
+            'updated_at': stmt.excluded.updated_at,
+        },
+        where=Attendance.date >= cutoff,
+    ).returning(Attendance.student_id)
+
+    saved = {row.student_id for row in db.session.execute(stmt)}
+    refresh_rollups(course_id, date, saved)
+    return {
+        'saved': sorted(saved),
+        'rejected': sorted(set(by_student) - saved),
+    }
@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class VersionedCache:
+    """Кэши дохилипроцессӣ бо TTL ва версияи ҷадвалҳо
+
+    Ҳар сабт ба рӯйхати ҷадвалҳо вобаста аст. invalidate('attendance')
+    версияи ҷадвалро зиёд мекунад ва ҳамаи сабтҳои вобаста кӯҳна мешаванд,
+    бе он ки TTL-ро интизор шавем. Калидҳое, ки дигар хонда намешаванд
+    (масалан бо санаи дирӯза), дар set() нест мешаванд: сабтҳои мӯҳлаташон
+    гузашта на камтар аз як бор дар TTL, ва зиёда аз max_entries - кӯҳнатарин
+    аз рӯи истифода (LRU).
+
+    Кэш дохилипроцессӣ аст: invalidate() танҳо ҳамин процессро навсозӣ
+    мекунад; дигар worker-ҳои веб то гузаштани TTL маълумоти кӯҳнаро медиҳанд.
+    """
+
+    def __init__(self, ttl=60, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._purge_at = 0
+
+    def versions(self, tables):
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+    def get(self, key, tables=()):
+        versions = self.versions(tables)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry_versions, expires_at, value = entry
+            if entry_versions != versions or expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, tables=(), ttl=None, versions=None):
+        if versions is None:
+            versions = self.versions(tables)
+        now = time.monotonic()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (versions, expires_at, value)
+            self._entries.move_to_end(key)
+            if now >= self._purge_at:
+                self._purge(now)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _purge(self, now):
+        """Сабтҳои мӯҳлаташон гузашта; дар дохили _lock"""
+        for key in [key for key, (_, expires_at, _) in self._entries.items() if expires_at < now]:
+            del self._entries[key]
+        self._purge_at = now + self.ttl
+
+    def get_or_compute(self, key, tables, compute, ttl=None):
+        value = self.get(key, tables)
+        if value is not None:
+            return value
+        # Версияҳо пеш аз ҳисоб гирифта мешаванд: агар ҳангоми ҳисоб сабт
+        # рух диҳад, натиҷа фавран кӯҳна ҳисобида мешавад
+        versions = self.versions(tables)
+        value = compute()
+        self.set(key, value, ttl=ttl, versions=versions)
+        return value
+
+    def invalidate(self, *tables):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
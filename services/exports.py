@@ -0,0 +1,263 @@
+"""Содироти ҳузур ва баҳоҳо ба CSV ё XLSX бо ҷараён (streaming)
+
+Сатрҳо бо курсори серверӣ (yield_per; дар PostgreSQL - named cursor) қисм-қисм
+хонда мешаванд ва ҳамон замон ба CSV ё XLSX навишта шуда ба ҷавоб фиристода
+мешаванд. Дар хотира танҳо як қисм (EXPORT_BATCH_SIZE сатр) ва буфери
+баромад нигоҳ дошта мешавад, бинобар ин хотираи worker аз андозаи давра
+вобаста нест. XLSX бе openpyxl сохта мешавад: zipfile ба ҷараёни
+бе seek менависад. CSV метавонад ҳангоми фиристодан бо gzip фишурда шавад.
+"""
+import csv
+import io
+import re
+import zipfile
+import zlib
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from flask import current_app
+from sqlalchemy import select
+
+from database.models import db, Attendance, Course, Grade, Group, Student, Subject, User
+
+# Андозаи буфер пеш аз фиристодан ба client
+FLUSH_BYTES = 64 * 1024
+
+ATTENDANCE_COLUMNS = (
+    'date', 'group', 'course_number', 'subject', 'student_id', 'full_name',
+    'status', 'activity_score', 'comments'
+)
+GRADE_COLUMNS = (
+    'group', 'course_number', 'subject', 'student_id', 'full_name',
+    'grade_type', 'score', 'max_score', 'date_taken', 'comments'
+)
+
+MIMETYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def _scope(query, group_ids=None, course_number=None, course_ids=None):
+    """Филтрҳои умумӣ; course_ids - дарсҳои муаллим (None - ҳама)"""
+    if group_ids:
+        query = query.where(Course.group_id.in_(group_ids))
+    if course_number:
+        query = query.where(Group.course_number == course_number)
+    if course_ids is not None:
+        query = query.where(Course.id.in_(course_ids))
+    return query
+
+
+def attendance_rows(start=None, end=None, group_ids=None, course_number=None, course_ids=None):
+    """Дархости ҳузур бо тартиби калиди (course_id, student_id, date)
+
+    Дар PostgreSQL (partition-ҳои моҳ) ин Incremental Sort-и гуруҳҳои хурд
+    аст; тартиби аз рӯи сана sort-и пурраро ба диск мебарад.
+    """
+    query = select(
+        Attendance.date, Group.name, Group.course_number, Subject.name, Student.student_id,
+        User.last_name, User.first_name, User.middle_name,
+        Attendance.status, Attendance.activity_score, Attendance.comments
+    ).join(Course, Course.id == Attendance.course_id) \
+        .join(Group, Group.id == Course.group_id) \
+        .join(Subject, Subject.id == Course.subject_id) \
+        .join(Student, Student.id == Attendance.student_id) \
+        .join(User, User.id == Student.user_id)
+    if start:
+        query = query.where(Attendance.date >= start)
+    if end:
+        query = query.where(Attendance.date <= end)
+    query = _scope(query, group_ids, course_number, course_ids)
+    return query.order_by(Attendance.course_id, Attendance.student_id, Attendance.date)
+
+
+def grade_rows(start=None, end=None, group_ids=None, course_number=None, course_ids=None):
+    """Дархости баҳоҳо бо тартиби uq_grades_course_student_type"""
+    query = select(
+        Group.name, Group.course_number, Subject.name, Student.student_id,
+        User.last_name, User.first_name, User.middle_name,
+        Grade.grade_type, Grade.score, Grade.max_score, Grade.date_taken, Grade.comments
+    ).join(Course, Course.id == Grade.course_id) \
+        .join(Group, Group.id == Course.group_id) \
+        .join(Subject, Subject.id == Course.subject_id) \
+        .join(Student, Student.id == Grade.student_id) \
+        .join(User, User.id == Student.user_id)
+    if start:
+        query = query.where(Grade.date_taken >= start)
+    if end:
+        query = query.where(Grade.date_taken <= end)
+    query = _scope(query, group_ids, course_number, course_ids)
+    return query.order_by(Grade.course_id, Grade.student_id, Grade.grade_type)
+
+
+def _attendance_record(row):
+    date, group, course_number, subject, code, last, first, middle, status, activity, comments = row
+    return (date, group, course_number, subject, code, User.format_full_name(last, first, middle),
+            status, activity, comments)
+
+
+def _grade_record(row):
+    group, course_number, subject, code, last, first, middle, grade_type, score, max_score, taken, comments = row
+    return (group, course_number, subject, code, User.format_full_name(last, first, middle),
+            grade_type, score, max_score, taken, comments)
+
+
+EXPORTS = {
+    'attendance': (attendance_rows, _attendance_record, ATTENDANCE_COLUMNS),
+    'grades': (grade_rows, _grade_record, GRADE_COLUMNS),
+}
+
+
+def _records(query, record):
+    """Сатрҳо аз курсори серверӣ, EXPORT_BATCH_SIZE-то дар як вақт"""
+    result = db.session.execute(query.execution_options(yield_per=current_app.config['EXPORT_BATCH_SIZE']))
+    try:
+        for row in result:
+            yield record(row)
+    finally:
+        result.close()
+
+
+# Матне, ки Excel/LibreOffice ҳамчун формула мехонад (CSV/formula injection)
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _safe_text(value):
+    """Матни озод (шарҳ, ном) бо `'` дар аввал, агар ҳамчун формула хонда шавад"""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv(columns, records):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM: Excel ҳуруфи кирилиро дуруст мекушояд
+    buffer.write('\ufeff')
+    writer.writerow(columns)
+    for record in records:
+        writer.writerow(['' if value is None else _safe_text(value) for value in record])
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+class _Sink(io.RawIOBase):
+    """Ҷараёни бе seek барои zipfile: навиштаҳо то drain() ҷамъ мешаванд"""
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        self.size = 0
+        return data
+
+
+# Рамзҳои идоракунӣ, ки дар XML иҷозат нестанд
+_XML_INVALID = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_cell(value):
+    if value is None:
+        return '<c/>'
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    text = _XML_INVALID.sub('', _safe_text(value) if isinstance(value, str) else str(value))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return '<row>' + ''.join(_xlsx_cell(value) for value in values) + '</row>'
+
+
+def _xlsx(columns, records, sheet_name):
+    """XLSX-и ҳадди ақал (як варақ, сатрҳои inlineStr) бо zipfile ба ҷараён"""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_PARTS.items():
+            archive.writestr(name, content)
+        archive.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{escape(sheet_name)}" sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>'
+        ))
+        yield sink.drain()
+
+        # force_zip64: андозаи варақ пешакӣ маълум нест
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                + _xlsx_row(columns)
+            ).encode('utf-8'))
+            for record in records:
+                sheet.write(_xlsx_row(record).encode('utf-8'))
+                if sink.size >= FLUSH_BYTES:
+                    yield sink.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+
+def gzip_chunks(chunks):
+    """Фишурдани gzip ҳангоми фиристодан (Content-Encoding: gzip)"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(kind, file_format, **filters):
+    """Қисмҳои файли содирот (bytes) барои Response-и ҷараёнӣ"""
+    build, record, columns = EXPORTS[kind]
+    records = _records(build(**filters), record)
+    if file_format == 'xlsx':
+        return _xlsx(columns, records, kind)
+    return _csv(columns, records)
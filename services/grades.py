@@ -0,0 +1,102 @@
+from datetime import datetime, time
+
+from database.models import db, Grade, Student
+from services.attendance import dialect_insert
+
+MAX_SCORE = 100
+
+
+def validate_grades(course, grade_type, rows):
+    """Санҷиши пешакии тамоми рӯйхат пеш аз навиштан
+
+    Натиҷа: ({student_id: сатр}, errors); errors - рӯйхати
+    {'index', 'student_id', 'error'}. Агар хато бошад, ҳеҷ чиз навишта намешавад.
+    """
+    if grade_type not in Grade.GRADE_TYPES:
+        return {}, [{'index': None, 'student_id': None, 'error': 'Навъи баҳо нодуруст аст'}]
+
+    errors = []
+    by_student = {}
+    for index, item in enumerate(rows):
+        student_id = item.get('student_id') if isinstance(item, dict) else None
+        try:
+            student_id = int(student_id)
+        except (TypeError, ValueError):
+            errors.append({'index': index, 'student_id': student_id, 'error': 'student_id нодуруст аст'})
+            continue
+
+        score = item.get('score')
+        if score not in (None, ''):
+            try:
+                score = float(score)
+            except (TypeError, ValueError):
+                score = None
+                errors.append({'index': index, 'student_id': student_id, 'error': 'Баҳо рақам нест'})
+            else:
+                if not 0 <= score <= MAX_SCORE:
+                    errors.append({'index': index, 'student_id': student_id,
+                                   'error': f'Баҳо бояд аз 0 то {MAX_SCORE} бошад'})
+        else:
+            score = None
+        # Як донишҷӯ дар як дархост - як сатр (охиринаш ғолиб)
+        by_student[student_id] = {'score': score, 'comments': item.get('comments', ''), 'index': index}
+
+    # Донишҷӯён бояд аз гуруҳи дарс бошанд (як дархост)
+    members = {row.id for row in db.session.query(Student.id).filter(
+        Student.id.in_(list(by_student)),
+        Student.group_id == course.group_id
+    )} if by_student else set()
+    for student_id, item in by_student.items():
+        if student_id not in members:
+            errors.append({'index': item['index'], 'student_id': student_id,
+                           'error': 'Донишҷӯ дар гуруҳи ин дарс нест'})
+
+    errors.sort(key=lambda e: e['index'])
+    return by_student, errors
+
+
+def upsert_grades(course, grade_type, by_student, user):
+    """Сабти баҳоҳои рӯйхат бо як INSERT ... ON CONFLICT
+
+    `by_student` - натиҷаи validate_grades. Равзанаи таҳрир (Grade.can_edit)
+    дар худи SQL санҷида мешавад: баҳои мавҷуда танҳо ҳангоми
+    `created_at >= cutoff` навсозӣ мешавад, баҳои нав ҳамеша сабт мешавад.
+    Натиҷа: {'saved': [...], 'rejected': [...]} - рақамҳои student_id.
+    """
+    if not by_student:
+        return {'saved': [], 'rejected': []}
+
+    cutoff = Grade.edit_cutoff(user)
+    if cutoff is None:
+        return {'saved': [], 'rejected': sorted(by_student)}
+
+    now = datetime.utcnow()
+    values = [{
+        'course_id': course.id,
+        'student_id': student_id,
+        'grade_type': grade_type,
+        'score': item['score'],
+        'comments': item['comments'],
+        'date_taken': now.date(),
+        'created_by': user.id,
+        'created_at': now,
+        'updated_at': now,
+    } for student_id, item in by_student.items()]
+
+    stmt = dialect_insert(Grade).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['course_id', 'student_id', 'grade_type'],
+        set_={
+            'score': stmt.excluded.score,
+            'comments': stmt.excluded.comments,
+            'date_taken': stmt.excluded.date_taken,
+            'updated_at': stmt.excluded.updated_at,
+        },
+        where=Grade.created_at >= datetime.combine(cutoff, time.min),
+    ).returning(Grade.student_id)
+
+    saved = {row.student_id for row in db.session.execute(stmt)}
+    return {
+        'saved': sorted(saved),
+        'rejected': sorted(set(by_student) - saved),
+    }
@@ -0,0 +1,70 @@
+import numpy as np
+from flask import current_app
+
+
+def calculate_final_grade(attendance_percentage, grades, config=None):
+    """Ҳисоби баҳои ниҳоӣ аз рӯи коэффициентҳо"""
+    if config is None:
+        config = current_app.config['GRADE_SYSTEM']
+
+    total = 0
+
+    # Ҳузур (30%)
+    attendance_grade = min(attendance_percentage / 100 * 100, 100)
+    total += attendance_grade * config['attendance_weight']
+
+    # Фаъолият (20%) - аз рӯи миёнаи балҳои фаъолият
+    if 'activity' in grades:
+        total += grades['activity'] * config['activity_weight']
+
+    # Рейтинги миёна (25%)
+    if 'midterm_1' in grades and 'midterm_2' in grades:
+        midterm_avg = (grades['midterm_1'] + grades['midterm_2']) / 2
+        total += midterm_avg * config['midterm_weight']
+
+    # Имтиҳони ниҳоӣ (25%)
+    if 'final' in grades:
+        total += grades['final'] * config['final_weight']
+
+    return total
+
+
+def final_grades(attendance, activity, midterm_1, midterm_2, final, config=None):
+    """Векторӣ calculate_final_grade барои массивҳои донишҷӯ×дарс
+
+    Баҳои мавҷуднабуда - NaN. Амалҳо бо ҳамон тартиби функсияи скалярӣ
+    иҷро мешаванд, бинобар ин натиҷаҳо айнан мувофиқ меоянд.
+    """
+    if config is None:
+        config = current_app.config['GRADE_SYSTEM']
+
+    total = np.minimum(attendance / 100 * 100, 100) * config['attendance_weight']
+
+    total = total + np.where(np.isnan(activity), 0.0, activity * config['activity_weight'])
+
+    midterm_avg = (midterm_1 + midterm_2) / 2
+    total = total + np.where(np.isnan(midterm_avg), 0.0, midterm_avg * config['midterm_weight'])
+
+    total = total + np.where(np.isnan(final), 0.0, final * config['final_weight'])
+
+    return total
+
+
+def credit_weighted_gpa(student_index, final, credits, students_count):
+    """GPA-и вазннок аз рӯи кредитҳо барои ҳар донишҷӯ
+
+    Мисли транскрипт танҳо дарсҳое ба ҳисоб мераванд, ки баҳо ва кредит доранд.
+    """
+    counted = (final != 0) & (credits > 0)
+    points = np.bincount(student_index, weights=np.where(counted, final * credits, 0.0),
+                         minlength=students_count)
+    total_credits = np.bincount(student_index, weights=np.where(counted, credits, 0),
+                                minlength=students_count).astype(np.int64)
+    gpa = np.divide(points, total_credits, out=np.zeros(students_count), where=total_credits > 0)
+    return gpa, total_credits
+
+
+def competition_rank(values):
+    """Ҷой аз рӯи камшавӣ (1, 2, 2, 4): қиматҳои баробар ҷойи якхела мегиранд"""
+    ordered = np.sort(-values)
+    return np.searchsorted(ordered, -values, side='left') + 1
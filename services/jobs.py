@@ -0,0 +1,284 @@
+"""Навбати корҳои фонӣ дар ҷадвали jobs (бе broker-и беруна)
+
+enqueue() кор месозад ё кори фаъоли ҳамон параметрҳоро бармегардонад
+(индекси UNIQUE-и қисмии uq_jobs_active_params). Worker (`flask jobs-worker`)
+корро бо UPDATE ... WHERE id = (SELECT ... FOR UPDATE SKIP LOCKED) мегирад,
+бинобар ин якчанд worker як корро ду бор намегиранд. Пешрафт ва heartbeat
+пас аз ҳар қисм навишта мешаванд; кори 'running'-е, ки JOBS_STALE_AFTER
+сония heartbeat надорад (worker қатъ шуд), ба навбат бармегардад. Корҳои
+анҷомёфта пас аз JOBS_RESULT_TTL бо файлҳои натиҷаашон нест мешаванд
+(expire_jobs: worker соате як бор ва `flask jobs-expire`).
+"""
+import logging
+import os
+import signal
+import socket
+import time
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, select, update
+
+from database.models import db, Job, User
+from services.attendance import dialect_insert
+from services.printing import print_output_dir, print_student_ids, print_title, write_transcripts
+from services.report_cache import cached_attendance_summary, cached_transcripts, params_key, summary_scope
+from services.transcripts import load_students
+
+logger = logging.getLogger(__name__)
+
+# Worker корҳои кӯҳнаро на зудтар аз ин (сония) нест мекунад
+EXPIRE_EVERY = 3600
+
+# Ролҳое, ки кори ин навъро месозанд ва натиҷаашро мебинанд
+JOB_ROLES = {
+    'attendance_summary': ('dean', 'vice_dean', 'teacher'),
+    'transcripts': ('dean', 'vice_dean'),
+    'transcripts_print': ('dean', 'vice_dean'),
+}
+
+
+def _chunks(items, size):
+    """(шумораи тайёр пас аз қисм, қисм)"""
+    for start in range(0, len(items), size):
+        chunk = items[start:start + size]
+        yield start + len(chunk), chunk
+
+
+def run_attendance_summary(params, user, progress):
+    """Хулосаи ҳузур қисм-қисм аз рӯи гуруҳҳо (ҳамон шакли ҷавоби endpoint)"""
+    start = date.fromisoformat(params['start_date'])
+    end = date.fromisoformat(params['end_date'])
+    scope = summary_scope(params.get('group_ids'), params.get('course'))
+    progress(0, len(scope))
+
+    data, groups = [], []
+    for done, chunk in _chunks(scope, current_app.config['JOBS_CHUNK_SIZE']):
+        report_data, chunk_groups, _, _ = cached_attendance_summary(start, end, group_ids=chunk, user=user)
+        data += report_data
+        groups += chunk_groups
+        progress(done, len(scope))
+
+    return {
+        'data': data,
+        'groups': groups,
+        'period': {'start_date': params['start_date'], 'end_date': params['end_date']}
+    }
+
+
+def run_transcripts(params, user, progress):
+    """Транскриптҳои гуруҳ, курс ё рӯйхати донишҷӯён қисм-қисм"""
+    student_ids = [s.id for s in load_students(
+        student_ids=params.get('student_ids'),
+        group_id=params.get('group_id'),
+        course_number=params.get('course')
+    )]
+    progress(0, len(student_ids))
+
+    data = []
+    for done, chunk in _chunks(student_ids, current_app.config['JOBS_CHUNK_SIZE']):
+        # Ҳар қисм аз нав бор карда мешавад: commit-и кэш объектҳоро кӯҳна мекунад
+        reports, _ = cached_transcripts(load_students(student_ids=chunk), user)
+        data += [{'id': student_id, **reports[student_id].data} for student_id in chunk]
+        progress(done, len(student_ids))
+
+    return {'data': data}
+
+
+def run_transcripts_print(params, user, progress):
+    """Ҳуҷҷати чопии транскриптҳо ба файл; натиҷа - роҳ барои /api/jobs/<id>/result"""
+    student_ids = print_student_ids(params.get('group_id'), params.get('course'), params.get('student_ids'))
+    progress(0, len(student_ids))
+    pdf = params.get('format') == 'pdf'
+    path = write_transcripts(student_ids, print_title(params.get('group_id'), params.get('course')),
+                             pdf=pdf, progress=progress, user=user)
+    return {
+        'file': path,
+        'filename': 'transcripts.pdf' if pdf else 'transcripts.html',
+        'mimetype': 'application/pdf' if pdf else 'text/html',
+        'count': len(student_ids)
+    }
+
+
+HANDLERS = {
+    'attendance_summary': run_attendance_summary,
+    'transcripts': run_transcripts,
+    'transcripts_print': run_transcripts_print,
+}
+
+
+def enqueue(job_type, params, user=None):
+    """Кори нав ё кори фаъоли ҳамон параметрҳо: (job, created)"""
+    key = params_key(job_type, **params)
+    for _ in range(3):
+        stmt = dialect_insert(Job).values(
+            job_type=job_type,
+            params=params,
+            params_key=key,
+            status='queued',
+            created_by=user.id if user else None,
+            created_at=datetime.utcnow()
+        )
+        job_id = db.session.execute(stmt.on_conflict_do_nothing(
+            index_elements=['params_key'],
+            index_where=Job.status.in_(Job.ACTIVE)
+        ).returning(Job.id)).scalar()
+        created = job_id is not None
+        if not created:
+            job_id = db.session.execute(select(Job.id).where(
+                Job.params_key == key, Job.status.in_(Job.ACTIVE)
+            )).scalar()
+        db.session.commit()
+        if job_id is not None:
+            return db.session.get(Job, job_id), created
+    # Кори фаъол байни INSERT ва SELECT анҷом ёфт - такрор
+    raise RuntimeError('Кор ба навбат гузошта нашуд')
+
+
+def can_view(job, user):
+    if user.role not in JOB_ROLES.get(job.job_type, ()):
+        return False
+    if job.job_type == 'attendance_summary' and user.role == 'teacher':
+        # Хулосаи тамоми факултет танҳо барои декан ва замдекан
+        return bool(job.params.get('group_ids') or job.params.get('course'))
+    return True
+
+
+def job_status(job):
+    return {
+        'job_id': job.id,
+        'job_type': job.job_type,
+        'status': job.status,
+        'progress': job.progress,
+        'total': job.total,
+        'error': job.error,
+        'attempts': job.attempts,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
+
+
+def _requeue_stale(now):
+    """Корҳои worker-ҳои қатъшуда: ба навбат ё 'failed' пас аз JOBS_MAX_ATTEMPTS"""
+    stale = (Job.status == 'running') & (Job.heartbeat_at < now - timedelta(seconds=current_app.config['JOBS_STALE_AFTER']))
+    max_attempts = current_app.config['JOBS_MAX_ATTEMPTS']
+    db.session.execute(update(Job).where(stale, Job.attempts >= max_attempts).values(
+        status='failed', error='Worker ҷавоб намедиҳад', finished_at=now
+    ))
+    db.session.execute(update(Job).where(stale, Job.attempts < max_attempts).values(status='queued', worker=None))
+
+
+def claim(worker):
+    """Кори навбатиро ба worker медиҳад; None - навбат холӣ"""
+    now = datetime.utcnow()
+    _requeue_stale(now)
+    candidate = select(Job.id).where(Job.status == 'queued').order_by(Job.id).limit(1) \
+        .with_for_update(skip_locked=True).scalar_subquery()
+    job_id = db.session.execute(update(Job).where(Job.id == candidate, Job.status == 'queued').values(
+        status='running',
+        worker=worker,
+        attempts=Job.attempts + 1,
+        started_at=now,
+        heartbeat_at=now
+    ).returning(Job.id)).scalar()
+    db.session.commit()
+    return job_id
+
+
+def _update(job_id, worker, **values):
+    db.session.execute(update(Job).where(
+        Job.id == job_id, Job.status == 'running', Job.worker == worker
+    ).values(heartbeat_at=datetime.utcnow(), **values))
+    db.session.commit()
+
+
+def run_job(job_id, worker):
+    """Иҷрои кори гирифташуда; True - бомуваффақият"""
+    job = db.session.get(Job, job_id)
+    job_type, params = job.job_type, dict(job.params)
+    user = db.session.get(User, job.created_by) if job.created_by else None
+
+    def progress(done, total):
+        _update(job_id, worker, progress=done, total=total)
+
+    try:
+        result = HANDLERS[job_type](params, user, progress)
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('Кори %s (%s) бо хато анҷом ёфт', job_id, job_type)
+        _update(job_id, worker, status='failed', error=str(e), finished_at=datetime.utcnow())
+        return False
+
+    _update(job_id, worker, status='done', result=result, finished_at=datetime.utcnow())
+    return True
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def expire_jobs(now=None):
+    """Нест кардани корҳои анҷомёфтаи кӯҳнатар аз JOBS_RESULT_TTL ва файлҳои онҳо
+
+    Файлҳои PRINT_OUTPUT_DIR, ки ба ягон кор тааллуқ надоранд (worker дар
+    мобайни чоп қатъ шуд) ва аз ҳамон муҳлат кӯҳнатаранд, низ нест мешаванд.
+    Натиҷа: (корҳо, файлҳо).
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(seconds=current_app.config['JOBS_RESULT_TTL'])
+    expired = db.session.execute(select(Job.id, Job.result).where(
+        Job.status.in_(('done', 'failed')), Job.finished_at < cutoff
+    )).all()
+    files = sum(_remove(row.result['file']) for row in expired if row.result and row.result.get('file'))
+    if expired:
+        db.session.execute(delete(Job).where(Job.id.in_([row.id for row in expired])))
+    db.session.commit()
+
+    directory = print_output_dir()
+    if os.path.isdir(directory):
+        kept = {
+            os.path.abspath(result['file'])
+            for result in db.session.execute(select(Job.result).where(Job.job_type == 'transcripts_print')).scalars()
+            if result and result.get('file')
+        }
+        for entry in os.scandir(directory):
+            if (entry.is_file() and os.path.abspath(entry.path) not in kept
+                    and datetime.utcfromtimestamp(entry.stat().st_mtime) < cutoff):
+                files += _remove(entry.path)
+    return len(expired), files
+
+
+def work(once=False, poll_interval=None, worker=None):
+    """Давраи worker: корҳоро то SIGTERM/SIGINT иҷро мекунад (once - то холӣ шудани навбат)"""
+    worker = worker or f'{socket.gethostname()}:{os.getpid()}'
+    poll_interval = poll_interval or current_app.config['JOBS_POLL_INTERVAL']
+    stopping = []
+
+    def stop(*_):
+        # Кори ҷорӣ анҷом меёбад, нави гирифта намешавад
+        stopping.append(True)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    processed = 0
+    expired_at = 0
+    while not stopping:
+        job_id = claim(worker)
+        if job_id is None:
+            if time.monotonic() - expired_at >= EXPIRE_EVERY:
+                expire_jobs()
+                expired_at = time.monotonic()
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_job(job_id, worker)
+        processed += 1
+        db.session.remove()
+    return processed
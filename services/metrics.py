@@ -0,0 +1,180 @@
+"""Метрикаҳои /metrics: вақти дархост ва шумораи SQL барои ҳар route, N+1 дар лог
+
+education_crm/api/metrics.py ҳамин кодро бо type hint-ҳо дорад (барномаҳо
+якдигарро ворид карда наметавонанд: пакетҳои database/api ҳамноманд).
+Тағйири statement_shape, histogram ё формати Prometheus бояд дар ҳарду ҷо
+якхела бошад, то панелҳои мониторинг барои ҳарду хизмат кор кунанд.
+"""
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+
+# Сарҳадҳои histogram-и вақти дархост (сония)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# "IN (?, ?, ?)" ва "VALUES (...), (...)" ба як шакл оварда мешаванд
+_PARAM_LISTS = re.compile(r'\(\s*(?:\?|%\([^)]*\)s|%s|\$\d+)(?:\s*,\s*(?:\?|%\([^)]*\)s|%s|\$\d+))*\s*\)')
+_VALUES_ROWS = re.compile(r'(\(\?\))(?:\s*,\s*\(\?\))+')
+
+
+def statement_shape(statement):
+    """Шакли SQL бе рӯйхати параметрҳо (барои ёфтани N+1)"""
+    shape = _PARAM_LISTS.sub('(?)', statement)
+    return _VALUES_ROWS.sub(r'\1', ' '.join(shape.split()))
+
+
+class RequestMetrics:
+    """Ченакҳои ҳар роут: вақти дархост, шумора ва вақти SQL, сатрҳои баргашта"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._latency = defaultdict(lambda: [[0] * (len(self.buckets) + 1), 0.0])
+        self._requests = Counter()
+        self._sql_statements = Counter()
+        self._sql_seconds = Counter()
+        self._sql_rows = Counter()
+        self._n_plus_one = Counter()
+
+    def observe(self, route, method, status, seconds, sql):
+        with self._lock:
+            counts, total = self._latency[(route, method)]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._latency[(route, method)][1] = total + seconds
+            self._requests[(route, method, str(status))] += 1
+            self._sql_statements[route] += sql.statements
+            self._sql_seconds[route] += sql.seconds
+            self._sql_rows[route] += sql.rows
+
+    def flag_n_plus_one(self, route):
+        with self._lock:
+            self._n_plus_one[route] += 1
+
+    def render(self, prefix='app'):
+        """Матн дар формати Prometheus (text exposition 0.0.4)"""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} {kind}')
+            for suffix, labels, value in samples:
+                label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels)
+                lines.append(f'{prefix}_{name}{suffix}{{{label_text}}} {value:g}'
+                             if label_text else f'{prefix}_{name}{suffix} {value:g}')
+
+        with self._lock:
+            latency = []
+            for (route, method), (counts, total) in sorted(self._latency.items()):
+                labels = (('route', route), ('method', method))
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                    latency.append(('_bucket', labels + (('le', le),), cumulative))
+                latency.append(('_sum', labels, total))
+                latency.append(('_count', labels, cumulative))
+            metric('http_request_duration_seconds', 'histogram', 'Request latency per route.', latency)
+            metric('http_requests_total', 'counter', 'Requests per route, method and status.',
+                   [('', (('route', r), ('method', m), ('status', s)), v)
+                    for (r, m, s), v in sorted(self._requests.items())])
+            for name, help_text, values in (
+                ('sql_statements_total', 'SQL statements executed per route.', self._sql_statements),
+                ('sql_duration_seconds_total', 'Time spent in SQL per route.', self._sql_seconds),
+                ('sql_rows_total', 'Rows returned by SQL statements per route.', self._sql_rows),
+                ('sql_n_plus_one_total', 'Requests flagged for a repeated statement shape.', self._n_plus_one),
+            ):
+                metric(name, 'counter', help_text,
+                       [('', (('route', route),), value) for route, value in sorted(values.items())])
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+class _RequestSQL:
+    """SQL-и як дархост (дар g нигоҳ дошта мешавад)"""
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.shapes = Counter()
+
+
+def _current_sql():
+    if not has_request_context():
+        return None
+    return g.get('_request_sql')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_sql() is not None:
+        conn.info.setdefault('_query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    sql = _current_sql()
+    started = conn.info.get('_query_started')
+    if sql is None or not started:
+        return
+    sql.seconds += time.perf_counter() - started.pop()
+    sql.statements += 1
+    sql.shapes[statement_shape(statement)] += 1
+    # rowcount-и SELECT-ро psycopg2/asyncpg медиҳанд; sqlite3 -1 бармегардонад
+    if cursor.description is not None and cursor.rowcount > 0:
+        sql.rows += cursor.rowcount
+
+
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get('_query_started') if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def init_metrics(app, engine):
+    """Ченакҳо барои app: hook-ҳои дархост, рӯйдодҳои engine ва /metrics"""
+    metrics = RequestMetrics()
+    app.extensions['metrics'] = metrics
+    threshold = app.config['METRICS_N_PLUS_ONE_THRESHOLD']
+
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+
+    @app.before_request
+    def start_request_metrics():
+        g._request_started = time.perf_counter()
+        g._request_sql = _RequestSQL()
+
+    @app.after_request
+    def record_request_metrics(response):
+        sql = g.pop('_request_sql', None)
+        if sql is None:
+            return response
+        elapsed = time.perf_counter() - g.pop('_request_started')
+        route = request.url_rule.rule if request.url_rule else '<unmatched>'
+        metrics.observe(route, request.method, response.status_code, elapsed, sql)
+
+        repeated = [(shape, count) for shape, count in sql.shapes.items() if count > threshold]
+        if repeated:
+            metrics.flag_n_plus_one(route)
+            for shape, count in repeated:
+                current_app.logger.warning('N+1 дар %s %s: як шакли SQL %d маротиба иҷро шуд: %s',
+                                           request.method, route, count, shape[:300])
+        return response
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+    return metrics
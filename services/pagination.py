@@ -0,0 +1,76 @@
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(last_id, position=None):
+    """Курсори ношаффоф аз рақами охирини саҳифа (ва мавқеи он дар натиҷаи ҷустуҷӯ)"""
+    data = {'id': last_id} if position is None else {'id': last_id, 'at': position}
+    raw = json.dumps(data, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _decode(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        return int(data['id']), int(data.get('at', 0))
+    except (KeyError, TypeError, ValueError, AttributeError, UnicodeDecodeError, base64.binascii.Error) as exc:
+        raise ValueError('Курсори нодуруст') from exc
+
+
+def decode_cursor(cursor):
+    """Рақами охирини саҳифаи қаблӣ; ValueError агар курсор нодуруст бошад"""
+    if not cursor:
+        return None
+    return _decode(cursor)[0]
+
+
+def page_size(raw, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Андозаи саҳифа аз ?limit= (1..maximum); ValueError агар рақам набошад"""
+    if not raw:
+        return default
+    try:
+        return max(1, min(int(raw), maximum))
+    except (TypeError, ValueError) as exc:
+        raise ValueError('Андозаи саҳифа нодуруст') from exc
+
+
+def keyset_page(query, column, cursor, limit):
+    """Саҳифаи keyset: (сатрҳо, next_cursor) бо тартиби устувор аз рӯи column"""
+    after = decode_cursor(cursor)
+    if after is not None:
+        query = query.filter(column > after)
+    rows = query.order_by(column).limit(limit + 1).all()
+    next_cursor = encode_cursor(getattr(rows[limit - 1], column.key)) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def ranked_page(search, cursor, limit):
+    """Саҳифа аз натиҷаи ҷустуҷӯ бо тартиби аҳамият
+
+    search(n) - n рақами аввали натиҷа. Курсор мавқеи охирини саҳифаи қаблиро
+    дорад, бинобар ин саҳифаи k-ум танҳо k * limit + 1 рақам мехонад (на тамоми
+    натиҷа). Агар рақами курсор дар ҷояш набошад (натиҷа тағйир ёфт), дар
+    ҳамон қисм ҷустуҷӯ мешавад; набудан - ValueError. Натиҷа: (рақамҳои
+    саҳифа, next_cursor).
+    """
+    start = 0
+    if cursor:
+        after, start = _decode(cursor)
+        if start < 1:
+            raise ValueError('Курсори нодуруст')
+    fetched = start + limit + 1
+    ids = search(fetched)
+    if cursor and (start > len(ids) or ids[start - 1] != after):
+        try:
+            start = ids.index(after) + 1
+        except ValueError as exc:
+            raise ValueError('Курсори нодуруст') from exc
+        if start + limit + 1 > fetched:
+            ids = search(start + limit + 1)
+    page = ids[start:start + limit]
+    next_cursor = encode_cursor(page[-1], start + len(page)) if len(ids) > start + limit else None
+    return page, next_cursor
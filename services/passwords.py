@@ -0,0 +1,85 @@
+"""Ҳисоби hash-и паролҳо дар pool-и маҳдуд (вуруд, воридоти донишҷӯён)
+
+education_crm/api/passwords.py ҳамин PasswordPool ва HashingBusy-ро барои
+bcrypt (passlib) дорад; ин ҷо - werkzeug (scrypt). Ду барнома якдигарро ворид
+карда наметавонанд (пакетҳои ҳамном), бинобар ин рафтори навбат ва timeout-ро
+дар ҳарду модул якхела нигоҳ доред.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import generate_password_hash
+
+
+class HashingBusy(Exception):
+    """Навбати ҳисоби паролҳо пур аст"""
+
+
+class PasswordPool:
+    """Ҳисоби hash-и паролҳо дар шумораи маҳдуди thread-ҳо
+
+    scrypt/bcrypt GIL-ро озод мекунанд, бинобар ин то `workers` ҳисоб
+    ҳамзамон иҷро мешаванд. Дар як вақт на зиёда аз `workers + queue_size`
+    дархост интизор мешавад; дигарон баъди `timeout` сония HashingBusy
+    мегиранд, то ки ҳангоми ворид шудани оммавӣ дигар саҳифаҳо банд нашаванд.
+    """
+
+    def __init__(self, workers, queue_size, timeout):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HashingBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def password_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = current_app.config
+                _pool = PasswordPool(config['PASSWORD_HASH_WORKERS'],
+                                     config['PASSWORD_HASH_QUEUE'],
+                                     config['PASSWORD_HASH_TIMEOUT'])
+    return _pool
+
+
+def hash_many(passwords, method):
+    """Барои ProcessPool: hash-и як қисми паролҳо дар як супориш"""
+    return [generate_password_hash(password, method=method) for password in passwords]
+
+
+def hash_password(user, password):
+    """user.set_password бо усули ҷорӣ аз PASSWORD_HASH_METHOD"""
+    method = current_app.config['PASSWORD_HASH_METHOD']
+    password_pool().run(user.set_password, password, method)
+
+
+def verify_password(user, password):
+    """Санҷиши парол; агар усули hash кӯҳна бошад, парол аз нав hash мешавад
+
+    Hash-и нав танҳо ба объект навишта мешавад - commit аз тарафи даъваткунанда.
+    """
+    if not password_pool().run(user.check_password, password):
+        return False
+    method = current_app.config['PASSWORD_HASH_METHOD']
+    if user.password_needs_rehash(method):
+        password_pool().run(user.set_password, password, method)
+    return True
@@ -0,0 +1,112 @@
+from flask import current_app, g
+from flask_login import current_user
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from database.models import db, User, Student, Teacher, Course
+from services.cache import VersionedCache
+
+principal_cache = VersionedCache()
+
+# Ҷадвалҳое, ки маълумоти principal аз онҳо гирифта мешавад. Роҳҳои сабт
+# (донишҷӯи нав, воридот, login) invalidate_principal-ро даъват мекунанд
+PRINCIPAL_TABLES = ('users', 'teachers', 'courses', 'students')
+
+
+class Principal:
+    """Корбари ҷорӣ бо доираи дастрасии пешакӣ ҳисобшуда
+
+    Як бор дар як дархост сохта мешавад ва байни дархостҳо бо TTL кэш
+    мешавад. Ҳамаи санҷишҳои дастрасӣ аз ҳамин объект мехонанд, на аз
+    дархостҳои нав ба teachers/courses.
+    """
+
+    def __init__(self, user, teacher_id=None, courses=(), student_id=None, student_group_id=None):
+        self.user = user
+        self.teacher_id = teacher_id
+        # (course_id, group_id, is_active) барои дарсҳои муаллим
+        self.courses = tuple(courses)
+        self.student_id = student_id
+        self.student_group_id = student_group_id
+
+        self.course_ids = frozenset(course_id for course_id, _, _ in self.courses)
+        self.group_ids = frozenset(group_id for _, group_id, _ in self.courses)
+        self.active_course_ids = frozenset(
+            course_id for course_id, _, is_active in self.courses if is_active
+        )
+        self.active_group_ids = frozenset(
+            group_id for _, group_id, is_active in self.courses if is_active
+        )
+
+    @property
+    def id(self):
+        return self.user.id
+
+    @property
+    def role(self):
+        return self.user.role
+
+    def teaches(self, course):
+        """Оё муаллим ин дарсро мегузаронад (бе дархост ба пойгоҳ)"""
+        return self.teacher_id is not None and course.teacher_id == self.teacher_id
+
+    def can_manage_course(self, course):
+        """Декан ва замдекан - ҳамаи дарсҳо, муаллим - танҳо дарсҳои худ"""
+        if self.role in ['dean', 'vice_dean']:
+            return True
+        return self.role == 'teacher' and self.teaches(course)
+
+
+def _build_principal(user_id):
+    user = db.session.get(User, user_id)
+    if user is None:
+        return None
+
+    teacher_id = None
+    courses = ()
+    student_id = None
+    student_group_id = None
+
+    if user.role == 'teacher':
+        teacher_id = db.session.query(Teacher.id).filter_by(user_id=user.id).scalar()
+        if teacher_id is not None:
+            courses = db.session.query(Course.id, Course.group_id, Course.is_active) \
+                .filter_by(teacher_id=teacher_id).order_by(Course.id).all()
+    elif user.role == 'student':
+        row = db.session.query(Student.id, Student.group_id).filter_by(user_id=user.id).first()
+        if row:
+            student_id, student_group_id = row
+
+    # Нусхаи ҷудошуда барои кэш; ҳар дархост онро ба session-и худ merge мекунад
+    snapshot = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+    make_transient_to_detached(snapshot)
+    return Principal(snapshot, teacher_id, [tuple(c) for c in courses], student_id, student_group_id)
+
+
+def load_principal(user_id):
+    """Principal аз кэш (ё сохтани нав) ва User-и пайвасти session-и ҷорӣ"""
+    ttl = current_app.config.get('PRINCIPAL_CACHE_TTL')
+    principal = principal_cache.get_or_compute(
+        ('principal', user_id), PRINCIPAL_TABLES, lambda: _build_principal(user_id), ttl
+    )
+    if principal is None:
+        return None
+
+    g.principal = principal
+    return db.session.merge(principal.user, load=False)
+
+
+def current_principal():
+    principal = g.get('principal')
+    if principal is None or principal.id != current_user.id:
+        load_principal(current_user.id)
+        principal = g.principal
+    return principal
+
+
+def invalidate_principal(user_id=None):
+    """Тоза кардани principal-и як корбар ё (бе user_id) ҳамаи корбарон"""
+    if user_id is None:
+        principal_cache.invalidate(*PRINCIPAL_TABLES)
+    else:
+        principal_cache.delete(('principal', user_id))
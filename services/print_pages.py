@@ -0,0 +1,31 @@
+"""Сохтани саҳифаҳои чопӣ дар процессҳои ProcessPool
+
+Танҳо jinja2 ворид карда мешавад: процесси spawn-шуда database.models ва
+Flask-ро бор намекунад.
+"""
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+DOCUMENT_TEMPLATE = 'print/transcripts.html'
+PAGE_TEMPLATE = 'print/transcript_page.html'
+
+_environments = {}
+
+
+def environment(template_folder):
+    """Jinja бе Flask: дар процессҳои ProcessPool низ кор мекунад"""
+    env = _environments.get(template_folder)
+    if env is None:
+        env = _environments[template_folder] = Environment(
+            loader=FileSystemLoader(template_folder),
+            autoescape=select_autoescape(['html'])
+        )
+    return env
+
+
+def render_pages(template_folder, pages, generated_at):
+    """HTML-и як қисми саҳифаҳо"""
+    template = environment(template_folder).get_template(PAGE_TEMPLATE)
+    return ''.join(
+        template.render(t=page, group_name=page['group_name'], generated_at=generated_at)
+        for page in pages
+    )
@@ -0,0 +1,190 @@
+"""Чопи якҷояи транскриптҳо: як ҳуҷҷати HTML барои гуруҳ ё курс
+
+Маълумот қисм-қисм (PRINT_CHUNK_SIZE донишҷӯ) аз кэши транскриптҳо
+(cached_transcripts) гирифта мешавад, саҳифаҳо дар ProcessPool бо шаблонҳои
+templates/print/ сохта мешаванд ва бо тартиби донишҷӯён, ҳангоми тайёр
+шудан, фиристода мешаванд. Дар як вақт на зиёда аз ду қисм барои ҳар
+процесс интизор аст, бинобар ин хотира аз андозаи курс вобаста нест.
+Pool яктост барои тамоми процесси веб (PRINT_PROCESSES процесс): дархостҳои
+ҳамзамон навбат мегиранд, процессҳои нав намесозанд.
+"""
+import multiprocessing
+import os
+import shlex
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from flask import current_app
+from markupsafe import Markup
+
+from database.models import db, Group
+from services.print_pages import DOCUMENT_TEMPLATE, environment, render_pages
+from services.report_cache import cached_transcripts
+from services.transcripts import load_students
+
+# Ҷойи саҳифаҳо дар шаблони ҳуҷҷат: сар ва охир алоҳида фиристода мешаванд
+_PAGES = '\x00pages\x00'
+
+# Ҳангоми табдил ба PDF progress (heartbeat-и кор) ҳар ин қадар сония даъват
+# мешавад: табдили дароз аз JOBS_STALE_AFTER кори "қатъшуда" ҳисоб намешавад
+PDF_HEARTBEAT = 10
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _print_pool():
+    """ProcessPool-и умумӣ, ки бори аввал сохта мешавад"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(current_app.config['PRINT_PROCESSES'],
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _reset_pool(pool):
+    """Pool-и вайроншуда (процесс қатъ шуд) бо дархости навбатӣ аз нав сохта мешавад"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def print_output_dir():
+    return os.path.join(current_app.root_path, current_app.config['PRINT_OUTPUT_DIR'])
+
+
+def print_title(group_id=None, course_number=None):
+    if group_id:
+        group = db.session.get(Group, group_id)
+        return f'Транскриптҳо - гуруҳи {group.name}' if group else 'Транскриптҳо'
+    if course_number:
+        return f'Транскриптҳо - курси {course_number}'
+    return 'Транскриптҳо'
+
+
+def print_student_ids(group_id=None, course_number=None, student_ids=None):
+    return [s.id for s in load_students(student_ids=student_ids, group_id=group_id, course_number=course_number)]
+
+
+def render_transcripts(student_ids, title, progress=None, user=None, chunk_size=None, processes=None):
+    """Қисмҳои ҳуҷҷат: сар, саҳифаҳо бо тартиби `student_ids`, охир
+
+    progress(done, total) пас аз ҳар қисми фиристодашуда даъват мешавад.
+    """
+    config = current_app.config
+    chunk_size = chunk_size or config['PRINT_CHUNK_SIZE']
+    processes = processes or config['PRINT_PROCESSES']
+    if len(student_ids) < config['PRINT_PARALLEL_MIN']:
+        processes = 1
+    template_folder = os.path.join(current_app.root_path, current_app.template_folder)
+    generated_at = datetime.now().strftime('%Y-%m-%d %H:%M')
+    groups = dict(db.session.query(Group.id, Group.name))
+
+    document = environment(template_folder).get_template(DOCUMENT_TEMPLATE).render(
+        title=title, pages=Markup(_PAGES)
+    )
+    head, tail = document.split(_PAGES)
+    yield head
+
+    # Ҳуҷҷати хурд бе ProcessPool: қисмҳо дар навбати pool-и умумӣ интизор намешаванд
+    pool = _print_pool() if processes > 1 else None
+    pending = deque()
+    done = 0
+    try:
+        for start in range(0, len(student_ids), chunk_size):
+            chunk = student_ids[start:start + chunk_size]
+            reports, _ = cached_transcripts(load_students(student_ids=chunk), user)
+            pages = [
+                {**reports[student_id].data, 'group_name': groups.get(reports[student_id].data['group_id'], '')}
+                for student_id in chunk
+            ]
+            if pool is None:
+                yield render_pages(template_folder, pages, generated_at)
+                done += len(chunk)
+                if progress:
+                    progress(done, len(student_ids))
+                continue
+
+            pending.append((len(chunk), pool.submit(render_pages, template_folder, pages, generated_at)))
+            # Қисмҳои тайёр бо тартиб; навбат аз 2 * processes зиёд намешавад
+            while pending and (len(pending) > 2 * processes or pending[0][1].done()):
+                count, future = pending.popleft()
+                yield future.result()
+                done += count
+                if progress:
+                    progress(done, len(student_ids))
+
+        while pending:
+            count, future = pending.popleft()
+            yield future.result()
+            done += count
+            if progress:
+                progress(done, len(student_ids))
+    except BrokenProcessPool:
+        _reset_pool(pool)
+        raise
+    finally:
+        # Client рафт ё хато: қисмҳои ин ҳуҷҷат аз навбати pool бароварда мешаванд
+        for _, future in pending:
+            future.cancel()
+
+    yield tail
+
+
+def _convert(command, timeout, heartbeat):
+    """subprocess.run(check=True, timeout=...) бо heartbeat() ҳар PDF_HEARTBEAT сония"""
+    deadline = time.monotonic() + timeout
+    with subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE) as process:
+        while True:
+            try:
+                _, stderr = process.communicate(timeout=max(0, min(PDF_HEARTBEAT, deadline - time.monotonic())))
+                break
+            except subprocess.TimeoutExpired:
+                if time.monotonic() >= deadline:
+                    process.kill()
+                    process.communicate()
+                    raise subprocess.TimeoutExpired(command, timeout)
+                heartbeat()
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, command, stderr=stderr)
+
+
+def write_transcripts(student_ids, title, pdf=False, progress=None, user=None):
+    """Ҳуҷҷат ба файл дар PRINT_OUTPUT_DIR (PDF бо PRINT_PDF_COMMAND); роҳи файл"""
+    config = current_app.config
+    directory = print_output_dir()
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, f'transcripts-{uuid.uuid4().hex}')
+    html_path = base + '.part.html'
+
+    try:
+        with open(html_path, 'w', encoding='utf-8') as output:
+            for part in render_transcripts(student_ids, title, progress=progress, user=user):
+                output.write(part)
+        if not pdf:
+            os.replace(html_path, base + '.html')
+            return base + '.html'
+
+        command = [
+            arg.format(input=html_path, output=base + '.pdf')
+            for arg in shlex.split(config['PRINT_PDF_COMMAND'])
+        ]
+
+        def heartbeat():
+            if progress:
+                progress(len(student_ids), len(student_ids))
+
+        _convert(command, config['PRINT_PDF_TIMEOUT'], heartbeat)
+        return base + '.pdf'
+    finally:
+        if os.path.exists(html_path):
+            os.remove(html_path)
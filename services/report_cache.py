@@ -0,0 +1,216 @@
+"""Кэши ҳисоботҳо дар ҷадвали reports
+
+Хулосаи ҳузури ҳар гуруҳ барои давра ва транскрипти ҳар донишҷӯ - як сабт:
+cache_key - hash-и параметрҳо, content_hash - hash-и data (ETag).
+Сабт танҳо то тағйири ҳузур ё баҳоҳои асосаш зинда аст: endpoint-ҳои
+навиштан сабтҳои вобастаро дар ҳамон транзаксия нест мекунанд
+(invalidate_summaries, invalidate_transcripts). Дар PostgreSQL навиштан ва
+пур кардани кэши як гуруҳ бо advisory lock пайдарпай мешаванд, бинобар ин
+ҳисоботе, ки пеш аз commit-и навиштан ҳисоб шудааст, нигоҳ дошта намешавад.
+"""
+import hashlib
+import json
+from datetime import datetime
+
+from flask import request
+from sqlalchemy import select, text
+
+from database.models import db, Report, Group
+from services.attendance import dialect_insert
+from services.reports import attendance_summary
+from services.transcripts import build_transcripts, transcript_to_json
+
+CACHE_HEADER = 'X-Report-Cache'
+# pg_advisory_xact_lock(REPORT_LOCK, group_id): навиштан - истисноӣ, пур кардан - муштарак
+REPORT_LOCK = 0x7265706f
+
+
+def params_key(report_type, **params):
+    """Калиди кэш аз навъ ва параметрҳои ҳисобот"""
+    payload = json.dumps([report_type, params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def content_hash(data):
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _lock_groups(group_ids, shared=False):
+    if db.engine.dialect.name != 'postgresql':
+        return
+    group_ids = sorted({int(g) for g in group_ids if g})
+    if not group_ids:
+        return
+    function = 'pg_advisory_xact_lock_shared' if shared else 'pg_advisory_xact_lock'
+    # Ҳама бо як дархост, бо тартиби id (бе deadlock байни дархостҳо)
+    db.session.execute(text(
+        f'SELECT count({function}(:lock, g)) FROM '
+        '(SELECT unnest(CAST(:group_ids AS integer[])) AS g ORDER BY 1) AS ids'
+    ), {'lock': REPORT_LOCK, 'group_ids': group_ids})
+
+
+def _store(rows):
+    """Сабтҳои кэш бо INSERT ... ON CONFLICT (cache_key)"""
+    if not rows:
+        return
+    stmt = dialect_insert(Report).values(rows)
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=['cache_key'],
+        set_={name: stmt.excluded[name] for name in ('data', 'content_hash', 'generated_by', 'generated_at')}
+    ))
+
+
+def invalidate_summaries(group_ids, day=None):
+    """Хулосаҳои ҳузури гуруҳҳо (бо `day` - танҳо давраҳое, ки ин рӯзро доранд)"""
+    group_ids = sorted({g for g in group_ids if g})
+    if not group_ids:
+        return
+    _lock_groups(group_ids)
+    query = Report.query.filter(
+        Report.report_type == 'attendance_summary',
+        Report.group_id.in_(group_ids)
+    )
+    if day is not None:
+        query = query.filter(Report.period_start <= day, Report.period_end >= day)
+    query.delete(synchronize_session=False)
+
+
+def invalidate_transcripts(group_id, student_ids):
+    """Транскриптҳои донишҷӯёни гуруҳ пас аз тағйири ҳузур ё баҳо"""
+    student_ids = sorted(set(student_ids))
+    if not student_ids:
+        return
+    _lock_groups([group_id])
+    Report.query.filter(
+        Report.report_type == 'transcript',
+        Report.student_id.in_(student_ids)
+    ).delete(synchronize_session=False)
+
+
+def _cached(report_type, owner, keys):
+    """Сабтҳои кэш ҳамчун сатрҳо (на объектҳои ORM, ки commit онҳоро кӯҳна мекунад)"""
+    keys = list(keys)
+    if not keys:
+        return []
+    return db.session.execute(
+        select(owner, Report.data, Report.content_hash, Report.generated_at)
+        .where(Report.report_type == report_type, Report.cache_key.in_(keys))
+    ).all()
+
+
+def clear_reports():
+    """Ҳамаи хулосаҳо ва транскриптҳо (пас аз тағйири attendance бе барнома)"""
+    Report.query.filter(
+        Report.report_type.in_(['attendance_summary', 'transcript'])
+    ).delete(synchronize_session=False)
+
+
+def invalidate_attendance(course, day, student_ids):
+    """Пас аз сабти ҳузури дарс дар рӯзи `day`"""
+    invalidate_summaries([course.group_id], day)
+    invalidate_transcripts(course.group_id, student_ids)
+
+
+def summary_scope(group_ids=None, course_number=None):
+    """id-ҳои гуруҳҳои хулосаи ҳузур бо тартиби ҳисобот"""
+    query = db.session.query(Group.id)
+    if group_ids:
+        query = query.filter(Group.id.in_(group_ids))
+    if course_number:
+        query = query.filter(Group.course_number == course_number)
+    return [row.id for row in query.order_by(Group.id)]
+
+
+def cached_attendance_summary(start, end, group_ids=None, course_number=None, user=None):
+    """attendance_summary аз кэш: ҳар гуруҳ - сабти алоҳида
+
+    Гуруҳҳои бе сабт бо як дархост ҳисоб ва нигоҳ дошта мешаванд.
+    Натиҷа: (report_data, groups, etag, hit).
+    """
+    scope = summary_scope(group_ids, course_number)
+    _lock_groups(scope, shared=True)
+    keys = {
+        group_id: params_key('attendance_summary', group_id=group_id, start=start, end=end)
+        for group_id in scope
+    }
+    reports = {
+        report.group_id: report
+        for report in _cached('attendance_summary', Report.group_id, keys.values())
+    }
+
+    missing = [group_id for group_id in scope if group_id not in reports]
+    if missing:
+        now = datetime.utcnow()
+        report_data, groups = attendance_summary(start, end, group_ids=missing)
+        pieces = {group_id: {'students': [], 'group': None} for group_id in missing}
+        for row in report_data:
+            pieces[row['group_id']]['students'].append(row)
+        for group in groups:
+            pieces[group['group_id']]['group'] = group
+
+        rows = [{
+            'report_type': 'attendance_summary',
+            'cache_key': keys[group_id],
+            'group_id': group_id,
+            'period_start': start,
+            'period_end': end,
+            'data': data,
+            'content_hash': content_hash(data),
+            'generated_by': user.id if user else None,
+            'generated_at': now
+        } for group_id, data in pieces.items()]
+        _store(rows)
+        db.session.commit()
+        reports.update({row['group_id']: Report(**row) for row in rows})
+
+    ordered = [reports[group_id] for group_id in scope]
+    report_data = [row for report in ordered for row in report.data['students']]
+    groups = [report.data['group'] for report in ordered if report.data['group']]
+    etag = content_hash([report.content_hash for report in ordered])
+    return report_data, groups, etag, not missing
+
+
+def cached_transcripts(students, user=None):
+    """Транскриптҳои донишҷӯён аз кэш; набудаҳо бо build_transcripts
+
+    Натиҷа: ({student.id: Report}, hit).
+    """
+    students = list(students)
+    _lock_groups([s.group_id for s in students], shared=True)
+    keys = {s.id: params_key('transcript', student_id=s.id) for s in students}
+    reports = {
+        report.student_id: report
+        for report in _cached('transcript', Report.student_id, keys.values())
+    }
+
+    missing = [s for s in students if s.id not in reports]
+    if missing:
+        now = datetime.utcnow()
+        rows = []
+        for student_id, transcript_data in build_transcripts(missing).items():
+            data = transcript_to_json(transcript_data)
+            rows.append({
+                'report_type': 'transcript',
+                'cache_key': keys[student_id],
+                'student_id': student_id,
+                'group_id': transcript_data['student'].group_id,
+                'data': data,
+                'content_hash': content_hash(data),
+                'generated_by': user.id if user else None,
+                'generated_at': now
+            })
+        _store(rows)
+        db.session.commit()
+        reports.update({row['student_id']: Report(**row) for row in rows})
+
+    return reports, not missing
+
+
+def mark_response(response, hit, etag=None):
+    """Сарлавҳаи hit/miss ва ETag (барои If-None-Match)"""
+    response.headers[CACHE_HEADER] = 'hit' if hit else 'miss'
+    if etag:
+        response.set_etag(etag)
+        response = response.make_conditional(request)
+    return response
@@ -0,0 +1,85 @@
+from sqlalchemy import func, select
+
+from database.models import db, User, Student, Group
+from services.rollups import attendance_counts
+
+
+def _rate(part, total):
+    return round(part / total * 100, 2) if total > 0 else 0
+
+
+def attendance_summary(start, end, group_ids=None, course_number=None):
+    """Хулосаи ҳузур барои гуруҳҳо, курс ё тамоми факултет бо як дархост
+
+    Шумораҳо аз ҷамъбастҳои ҳузур (services/rollups.py) гирифта мешаванд;
+    донишҷӯёни бе сабти ҳузур низ бо сифрҳо бармегарданд.
+    """
+    students = select(Student.id).join(Group, Group.id == Student.group_id) \
+        .where(Student.status == 'active')
+    if group_ids:
+        students = students.where(Student.group_id.in_(group_ids))
+    if course_number:
+        students = students.where(Group.course_number == course_number)
+
+    counts = attendance_counts(start, end, student_ids=students)
+    query = db.session.query(
+        Student.id,
+        Student.student_id,
+        User.first_name,
+        User.last_name,
+        User.middle_name,
+        Group.id.label('group_id'),
+        Group.name.label('group_name'),
+        *(func.coalesce(column, 0).label(column.name) for column in counts.c if column.name != 'student_id')
+    ).join(User, User.id == Student.user_id) \
+     .join(Group, Group.id == Student.group_id) \
+     .outerjoin(counts, counts.c.student_id == Student.id) \
+     .filter(Student.status == 'active')
+
+    if group_ids:
+        query = query.filter(Student.group_id.in_(group_ids))
+    if course_number:
+        query = query.filter(Group.course_number == course_number)
+
+    rows = query.order_by(Group.id, Student.id).all()
+
+    report_data = []
+    groups = {}
+    for row in rows:
+        total = row.total
+        report_data.append({
+            'student_id': row.student_id,
+            'full_name': User.format_full_name(row.last_name, row.first_name, row.middle_name),
+            'group_id': row.group_id,
+            'group_name': row.group_name,
+            'total_classes': total,
+            'present_classes': row.present,
+            'absent_classes': total - row.present,
+            'late_classes': row.late,
+            'excused_classes': row.excused,
+            'attendance_rate': _rate(row.present, total),
+            'late_rate': _rate(row.late, total),
+            'excused_rate': _rate(row.excused, total)
+        })
+
+        # Ҷамъбасти гуруҳ аз ҳамон сатрҳо, бе дархости иловагӣ
+        group = groups.setdefault(row.group_id, {
+            'group_id': row.group_id,
+            'group_name': row.group_name,
+            'students': 0,
+            'total_classes': 0,
+            'present_classes': 0,
+            'late_classes': 0,
+            'excused_classes': 0
+        })
+        group['students'] += 1
+        group['total_classes'] += total
+        group['present_classes'] += row.present
+        group['late_classes'] += row.late
+        group['excused_classes'] += row.excused
+
+    for group in groups.values():
+        group['absent_classes'] = group['total_classes'] - group['present_classes']
+        group['attendance_rate'] = _rate(group['present_classes'], group['total_classes'])
+
+    return report_data, list(groups.values())
@@ -0,0 +1,156 @@
+"""Ҷамъбастҳои ҳузур: attendance_daily (дарс, рӯз) ва attendance_monthly (донишҷӯ, дарс, моҳ)
+
+Ҳар навиштан ба attendance (upsert_attendance) ҷамъбастҳои ҳамон дарс,
+рӯз ва моҳро дар ҳамон транзаксия аз нав ҳисоб мекунад (refresh_rollups).
+Фоизҳои ҳузур аз ҷамъбастҳо хонда мешаванд: моҳҳои пурра аз
+attendance_monthly, танҳо рӯзҳои моҳҳои нопурраи канори давра аз attendance.
+Partition-ҳои ҷудошуда (detach) дар ҷамъбастҳо боқӣ мемонанд.
+"""
+from datetime import timedelta
+
+from sqlalchemy import case, cast, func, insert, literal, select, text, union_all
+
+from database.models import db, Attendance, AttendanceDaily, AttendanceMonthly
+from database.partitions import add_months, month_start
+
+STATUSES = ('present', 'late', 'absent', 'excused')
+COUNTS = ('total',) + STATUSES
+# pg_advisory_xact_lock(ROLLUP_LOCK, course_id): ҳисоби ҷамъбастҳои як дарс пайдарпай
+ROLLUP_LOCK = 0x726f6c6c
+
+
+def _counts(status):
+    """total ва шумораи ҳар ҳолат аз сатрҳои attendance"""
+    return [func.count().label('total')] + [
+        func.coalesce(func.sum(case((status == name, 1), else_=0)), 0).label(name)
+        for name in STATUSES
+    ]
+
+
+def _month_of(column, dialect):
+    """Рӯзи 1-уми моҳи сана дар SQL"""
+    if dialect.name == 'sqlite':
+        return func.date(column, 'start of month')
+    return cast(func.date_trunc('month', column), db.Date)
+
+
+def refresh_rollups(course_id, day, student_ids):
+    """Ҷамъбастҳои дарс дар рӯзи `day` ва моҳи он барои `student_ids` аз нав
+
+    Дар транзаксияи навиштан пас аз тағйири attendance даъват мешавад.
+    Ҳисоб аз сатрҳои худи attendance аст (на фарқият), бинобар ин такрор
+    ё хатои пештара ҷамъбастро вайрон намекунад.
+    """
+    course_id = int(course_id)
+    student_ids = sorted(student_ids)
+    if not student_ids:
+        return
+
+    if db.engine.dialect.name == 'postgresql':
+        # Навиштанҳои ҳамзамони як дарс: ҳисоби дуюм пас аз commit-и аввал
+        # сатрҳои ӯро мебинад (READ COMMITTED)
+        db.session.execute(text('SELECT pg_advisory_xact_lock(:lock, :course_id)'),
+                           {'lock': ROLLUP_LOCK, 'course_id': course_id})
+
+    db.session.execute(AttendanceDaily.__table__.delete().where(
+        AttendanceDaily.course_id == course_id, AttendanceDaily.date == day
+    ))
+    db.session.execute(insert(AttendanceDaily).from_select(
+        ['course_id', 'date', *COUNTS],
+        select(Attendance.course_id, Attendance.date, *_counts(Attendance.status))
+        .where(Attendance.course_id == course_id, Attendance.date == day)
+        .group_by(Attendance.course_id, Attendance.date)
+    ))
+
+    month = month_start(day)
+    db.session.execute(AttendanceMonthly.__table__.delete().where(
+        AttendanceMonthly.course_id == course_id,
+        AttendanceMonthly.month == month,
+        AttendanceMonthly.student_id.in_(student_ids)
+    ))
+    db.session.execute(insert(AttendanceMonthly).from_select(
+        ['student_id', 'course_id', 'month', *COUNTS],
+        select(Attendance.student_id, Attendance.course_id, literal(month, db.Date),
+               *_counts(Attendance.status))
+        .where(Attendance.course_id == course_id,
+               Attendance.student_id.in_(student_ids),
+               Attendance.date >= month,
+               Attendance.date < add_months(month, 1))
+        .group_by(Attendance.student_id, Attendance.course_id)
+    ))
+
+
+def rebuild_rollups(conn):
+    """Ҷамъбастҳо аз тамоми attendance (пур кардани аввалин ё ислоҳ)
+
+    `conn` - Connection ё Session; натиҷа - (сатрҳои рӯзона, сатрҳои моҳона).
+    """
+    dialect = conn.dialect if hasattr(conn, 'dialect') else conn.get_bind().dialect
+    month = _month_of(Attendance.date, dialect)
+
+    conn.execute(AttendanceDaily.__table__.delete())
+    conn.execute(AttendanceMonthly.__table__.delete())
+    daily = conn.execute(insert(AttendanceDaily).from_select(
+        ['course_id', 'date', *COUNTS],
+        select(Attendance.course_id, Attendance.date, *_counts(Attendance.status))
+        .group_by(Attendance.course_id, Attendance.date)
+    ))
+    monthly = conn.execute(insert(AttendanceMonthly).from_select(
+        ['student_id', 'course_id', 'month', *COUNTS],
+        select(Attendance.student_id, Attendance.course_id, month, *_counts(Attendance.status))
+        .group_by(Attendance.student_id, Attendance.course_id, month)
+    ))
+    return daily.rowcount, monthly.rowcount
+
+
+def _full_months(start, end):
+    """Моҳҳое, ки пурра дар [start, end] ҳастанд: [first, stop); None - бе ҳад"""
+    first = None
+    if start is not None:
+        first = start if start.day == 1 else add_months(start, 1)
+    stop = month_start(end + timedelta(days=1)) if end is not None else None
+    return first, stop
+
+
+def attendance_counts(start=None, end=None, student_ids=None, course_ids=None, by_course=False):
+    """Subquery: шумораҳои ҳузур барои ҳар донишҷӯ (ва дарс) дар давраи [start, end]
+
+    Сутунҳо: student_id, [course_id], total, present, late, absent, excused.
+    student_ids ва course_ids - рӯйхат ё select-и id-ҳо; None - ҳама.
+    """
+    def scoped(model, query):
+        if student_ids is not None:
+            query = query.where(model.student_id.in_(student_ids))
+        if course_ids is not None:
+            query = query.where(model.course_id.in_(course_ids))
+        return query
+
+    def raw(*criteria):
+        return scoped(Attendance, select(Attendance.student_id, Attendance.course_id, *_counts(Attendance.status))
+                      .where(*criteria)).group_by(Attendance.student_id, Attendance.course_id)
+
+    first, stop = _full_months(start, end)
+    if first is not None and stop is not None and first >= stop:
+        # Давра моҳи пурра надорад: танҳо сатрҳои attendance
+        parts = [raw(Attendance.date.between(start, end))]
+    else:
+        monthly = scoped(AttendanceMonthly, select(
+            AttendanceMonthly.student_id, AttendanceMonthly.course_id,
+            *(AttendanceMonthly.__table__.c[name] for name in COUNTS)
+        ))
+        if first is not None:
+            monthly = monthly.where(AttendanceMonthly.month >= first)
+        if stop is not None:
+            monthly = monthly.where(AttendanceMonthly.month < stop)
+        parts = [monthly]
+        # Рӯзҳои моҳҳои нопурраи аввал ва охир
+        if start is not None and start < first:
+            parts.append(raw(Attendance.date >= start, Attendance.date < first))
+        if end is not None and stop <= end:
+            parts.append(raw(Attendance.date >= stop, Attendance.date <= end))
+
+    rows = (union_all(*parts) if len(parts) > 1 else parts[0]).subquery()
+    keys = [rows.c.student_id] + ([rows.c.course_id] if by_course else [])
+    # SUM аз bigint дар PostgreSQL numeric (Decimal) медиҳад
+    return select(*keys, *(cast(func.sum(rows.c[name]), db.Integer).label(name) for name in COUNTS)) \
+        .group_by(*keys).subquery()
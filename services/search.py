@@ -0,0 +1,267 @@
+import heapq
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from database.models import db, User, Student
+
+# Ҳарфҳои хоси тоҷикӣ ба муодили русиашон: "Ҳасан" ва "Хасан" як хел ёфт мешаванд
+TAJIK_FOLDING = str.maketrans({
+    'ғ': 'г',
+    'ӣ': 'и',
+    'қ': 'к',
+    'ӯ': 'у',
+    'ҳ': 'х',
+    'ҷ': 'ч',
+    'ё': 'е',
+})
+
+
+def fold(text):
+    """Матн барои ҷустуҷӯ: ҳарфҳои хурд, ҳарфҳои тоҷикӣ ба русӣ, фосилаҳои ягона"""
+    return ' '.join((text or '').lower().translate(TAJIK_FOLDING).split())
+
+
+def build_search_key(user, student_id):
+    if user is None:
+        return fold(student_id)
+    return fold(f'{user.last_name} {user.first_name} {user.middle_name or ""} {student_id}')
+
+
+def _grams(word):
+    """Триграммаҳои калима ва префиксҳои кӯтоҳ (барои дархостҳои 1-2 ҳарфӣ)"""
+    grams = {'^' + word[:1], '^' + word[:2]}
+    grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+class StudentSearchIndex:
+    """Индекси n-грамма дар хотираи процесс барои ҷустуҷӯи донишҷӯён
+
+    Калид - students.search_key (насаб, ном, номи падар ва рақами донишҷӯ
+    баъд аз fold). Ҳар калимаи дархост бояд ҳамчун зерсатр дар калид бошад;
+    калимаҳои 1-2 ҳарфӣ аз рӯи аввали калимаҳо ёфт мешаванд.
+    """
+
+    def __init__(self):
+        self._keys = {}
+        self._groups = {}
+        self._student_ids = {}
+        self._postings = {}
+        self._lock = threading.Lock()
+        self.loaded_at = None
+
+    def __len__(self):
+        return len(self._keys)
+
+    def load(self, rows):
+        """rows: (id, student_id, group_id, search_key); индекси нав пас аз сохтан иваз мешавад"""
+        fresh = StudentSearchIndex()
+        for row in rows:
+            fresh._add(*row)
+        with self._lock:
+            self._keys = fresh._keys
+            self._groups = fresh._groups
+            self._student_ids = fresh._student_ids
+            self._postings = fresh._postings
+            self.loaded_at = time.monotonic()
+
+    def update(self, student_id_pk, student_id, group_id, key):
+        with self._lock:
+            self._remove(student_id_pk)
+            self._add(student_id_pk, student_id, group_id, key)
+
+    def remove(self, student_id_pk):
+        with self._lock:
+            self._remove(student_id_pk)
+
+    def _add(self, pk, student_id, group_id, key):
+        key = key or fold(student_id)
+        self._keys[pk] = key
+        self._groups[pk] = group_id
+        self._student_ids[pk] = fold(student_id)
+        for word in key.split(' '):
+            for gram in _grams(word):
+                self._postings.setdefault(gram, set()).add(pk)
+
+    def _remove(self, pk):
+        key = self._keys.pop(pk, None)
+        if key is None:
+            return
+        self._groups.pop(pk, None)
+        self._student_ids.pop(pk, None)
+        for word in key.split(' '):
+            for gram in _grams(word):
+                posting = self._postings.get(gram)
+                if posting is not None:
+                    posting.discard(pk)
+
+    def _candidates(self, token):
+        if len(token) < 3:
+            return self._postings.get('^' + token, set())
+        postings = [self._postings.get(token[i:i + 3], set()) for i in range(len(token) - 2)]
+        postings.sort(key=len)
+        return set.intersection(*postings)
+
+    def search(self, text, group_ids=None, limit=20):
+        """Рақамҳои донишҷӯён (students.id) бо тартиби аҳамият
+
+        Тартиб: рақами донишҷӯ айнан, аввали насаб, аввали ягон калима, боқимонда.
+        """
+        folded = fold(text)
+        if not folded:
+            return []
+
+        tokens = folded.split(' ')
+        with self._lock:
+            keys = self._keys
+            matches = None
+            for token in tokens:
+                found = self._candidates(token)
+                matches = found if matches is None else matches & found
+                if not matches:
+                    return []
+
+            if group_ids is not None:
+                group_ids = set(group_ids)
+                groups = self._groups
+                matches = [pk for pk in matches if groups.get(pk) in group_ids]
+
+            # Триграммаҳо танҳо номзадҳоро медиҳанд: зерсатри пурраро месанҷем
+            for token in tokens:
+                if len(token) > 3:
+                    matches = [pk for pk in matches if token in keys[pk]]
+
+            # Гурӯҳҳои аҳамият бо list comprehension (бе tuple барои ҳар номзад)
+            exact = [pk for pk in matches if self._student_ids[pk] == folded]
+            rest = [pk for pk in matches if self._student_ids[pk] != folded]
+            last_name = [pk for pk in rest if keys[pk].startswith(folded)]
+            rest = [pk for pk in rest if not keys[pk].startswith(folded)]
+            prefix = ' ' + folded
+            word = [pk for pk in rest if prefix in keys[pk]]
+            rest = [pk for pk in rest if prefix not in keys[pk]]
+
+            ranked = []
+            for bucket in (exact, last_name, word, rest):
+                if limit is None:
+                    ranked.extend(sorted(bucket, key=keys.__getitem__))
+                    continue
+                ranked.extend(heapq.nsmallest(limit - len(ranked), bucket, key=keys.__getitem__))
+                if len(ranked) >= limit:
+                    break
+        return ranked
+
+
+student_index = StudentSearchIndex()
+_refresh_lock = threading.Lock()
+
+
+def _index_rows():
+    return db.session.query(Student.id, Student.student_id, Student.group_id, Student.search_key) \
+        .yield_per(5000)
+
+
+def ensure_index():
+    """Индекс дар дархости аввал сохта мешавад ва баъди SEARCH_INDEX_TTL аз нав
+
+    Навиштаҳои ҳамин процесс фавран ба индекс дохил мешаванд; TTL танҳо
+    тағйиротро аз процессҳои дигар (workers) меорад.
+    """
+    ttl = current_app.config.get('SEARCH_INDEX_TTL', 300)
+    loaded_at = student_index.loaded_at
+    if loaded_at is not None:
+        # Индекси кӯҳна то анҷоми навсозӣ дар дигар thread истифода мешавад
+        if time.monotonic() - loaded_at < ttl or not _refresh_lock.acquire(blocking=False):
+            return student_index
+    else:
+        _refresh_lock.acquire()
+    try:
+        if student_index.loaded_at is loaded_at:
+            student_index.load(_index_rows())
+    finally:
+        _refresh_lock.release()
+    return student_index
+
+
+def search_student_ids(text, group_ids=None, limit=20):
+    return ensure_index().search(text, group_ids=group_ids, limit=limit)
+
+
+def load_ranked(query, ids):
+    """Донишҷӯёни ёфтшуда бо ҳамон тартиби аҳамият"""
+    if not ids:
+        return []
+    by_id = {s.id: s for s in query.filter(Student.id.in_(ids)).all()}
+    return [by_id[pk] for pk in ids if pk in by_id]
+
+
+def rebuild_search_keys(batch_size=1000):
+    """Пур кардани search_key барои сабтҳои мавҷуда"""
+    updated = 0
+    last_id = 0
+    while True:
+        rows = db.session.query(Student.id, Student.student_id, User.last_name,
+                                User.first_name, User.middle_name) \
+            .join(User, User.id == Student.user_id) \
+            .filter(Student.id > last_id) \
+            .order_by(Student.id).limit(batch_size).all()
+        if not rows:
+            break
+        db.session.bulk_update_mappings(Student, [{
+            'id': row.id,
+            'search_key': fold(f'{row.last_name} {row.first_name} {row.middle_name or ""} {row.student_id}')
+        } for row in rows])
+        db.session.commit()
+        updated += len(rows)
+        last_id = rows[-1].id
+    student_index.loaded_at = None
+    return updated
+
+
+@event.listens_for(Session, 'before_flush')
+def _sync_search_keys(session, flush_context, instances):
+    """Навсозии search_key ҳангоми сохтан ё тағйири донишҷӯ ва номи корбар"""
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Student):
+            obj.search_key = build_search_key(obj.user, obj.student_id)
+        elif isinstance(obj, User) and _name_changed(obj):
+            for student in obj.student_profile:
+                student.search_key = build_search_key(obj, student.student_id)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_search_changes(session, flush_context):
+    # Қиматҳо ҳоло гирифта мешаванд: баъди commit объектҳо expire мешаванд
+    changes = session.info.setdefault('search_changes', [])
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Student):
+            changes.append((obj.id, obj.student_id, obj.group_id, obj.search_key))
+    for obj in session.deleted:
+        if isinstance(obj, Student):
+            changes.append((obj.id, None, None, None))
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_search_changes(session):
+    changes = session.info.pop('search_changes', None)
+    if not changes or student_index.loaded_at is None:
+        return
+    for pk, student_id, group_id, key in changes:
+        if student_id is None:
+            student_index.remove(pk)
+        else:
+            student_index.update(pk, student_id, group_id, key)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_search_changes(session):
+    session.info.pop('search_changes', None)
+
+
+def _name_changed(user):
+    state = db.inspect(user)
+    return any(state.attrs[name].history.has_changes()
+               for name in ('first_name', 'last_name', 'middle_name'))
@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import case, func, select
+
+from database.models import db, Student, Teacher, Group, Subject, AttendanceDaily
+from services.cache import VersionedCache
+from services.rollups import attendance_counts
+
+stats_cache = VersionedCache()
+
+# Ҷадвалҳое, ки барнома ба онҳо менависад ва статистикаи нақш аз онҳо вобаста
+# аст (invalidate_statistics дар роҳҳои навиштан). teachers, groups, subjects
+# ва courses дар барнома навишта намешаванд: тағйири онҳо (ва навиштан дар
+# процессҳои дигар - кэш дохилипроцессӣ аст) пас аз STATS_CACHE_TTL намоён мешавад.
+DEAN_TABLES = ('students', 'attendance')
+TEACHER_TABLES = ('students',)
+STUDENT_TABLES = ('students', 'attendance')
+
+
+def invalidate_statistics(*tables):
+    """Барои навиштан ба ҷадвалҳо: версияро зиёд мекунад"""
+    stats_cache.invalidate(*tables)
+
+
+def _count(model, *criteria):
+    return select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+
+def _rate(part, total):
+    return (part / total * 100) if total > 0 else 0
+
+
+def dean_statistics():
+    """Ҳамаи ҳисобҳои декан бо як дархости SQL"""
+    week_ago = datetime.now().date() - timedelta(days=7)
+
+    by_year = [
+        func.coalesce(func.sum(case((Group.course_number == i, 1), else_=0)), 0)
+        for i in range(1, 5)
+    ]
+    groups = select(func.count(), *by_year).where(Group.is_active == True).subquery()
+    attendance = select(
+        func.coalesce(func.sum(AttendanceDaily.total), 0).label('total'),
+        func.coalesce(func.sum(AttendanceDaily.present), 0).label('present')
+    ).where(AttendanceDaily.date >= week_ago).subquery()
+
+    row = db.session.execute(select(
+        _count(Student, Student.status == 'active'),
+        _count(Teacher),
+        _count(Subject, Subject.is_active == True),
+        attendance.c.total,
+        attendance.c.present,
+        *groups.c
+    ).select_from(groups).join(attendance, db.true())).one()
+
+    total_students, total_teachers, total_subjects, total_attendance, present_count = row[:5]
+    total_groups = row[5]
+    courses = row[6:]
+
+    return {
+        'total_students': total_students,
+        'total_teachers': total_teachers,
+        'total_groups': total_groups,
+        'total_subjects': total_subjects,
+        'attendance_rate': _rate(present_count, total_attendance),
+        'courses_by_year': {f'course_{i}': count for i, count in enumerate(courses, start=1)}
+    }
+
+
+def teacher_statistics(principal):
+    stats = {}
+    if principal.teacher_id:
+        # Дарсҳои муаллим аз principal (бе дархости иловагӣ)
+        group_ids = list(principal.active_group_ids)
+        stats['my_courses_count'] = len(principal.active_course_ids)
+
+        # Донишҷӯёни ман
+        stats['my_students_count'] = Student.query.filter(
+            Student.group_id.in_(group_ids),
+            Student.status == 'active'
+        ).count() if group_ids else 0
+    return stats
+
+
+def student_statistics(user):
+    stats = {}
+    row = db.session.query(Student.id, Group.name, Group.course_number) \
+        .outerjoin(Group, Group.id == Student.group_id) \
+        .filter(Student.user_id == user.id).first()
+    if row:
+        # Маълумоти донишҷӯ
+        stats['my_group'] = row.name or ''
+        stats['my_course'] = row.course_number or 0
+
+        # Ҳузури ман (моҳи охир)
+        month_ago = datetime.now().date() - timedelta(days=30)
+        counts = attendance_counts(month_ago, student_ids=[row.id])
+        total, present = db.session.query(
+            func.coalesce(func.sum(counts.c.total), 0),
+            func.coalesce(func.sum(counts.c.present), 0)
+        ).one()
+
+        stats['my_attendance_rate'] = _rate(present, total)
+    return stats
+
+
+def dashboard_statistics_for(principal):
+    """Статистикаи dashboard аз кэш; ҳангоми набудан ҳисоб карда мешавад"""
+    user = principal.user
+    ttl = current_app.config.get('STATS_CACHE_TTL')
+    today = datetime.now().date()
+
+    if user.role in ['dean', 'vice_dean']:
+        # Барои декан ва замдекан маълумот якхела аст
+        return stats_cache.get_or_compute(('dashboard', 'dean', today), DEAN_TABLES, dean_statistics, ttl)
+    elif user.role == 'teacher':
+        return stats_cache.get_or_compute(('dashboard', 'teacher', user.id), TEACHER_TABLES,
+                                          lambda: teacher_statistics(principal), ttl)
+    elif user.role == 'student':
+        return stats_cache.get_or_compute(('dashboard', 'student', user.id, today), STUDENT_TABLES,
+                                          lambda: student_statistics(user), ttl)
+    return {}
@@ -0,0 +1,287 @@
+"""Воридоти якбораи донишҷӯён аз CSV/XLSX (/api/students/import, `flask import-students`)
+
+Ҳамтои ин модул дар education_crm - api/importer.py: хондани файл
+(iter_rows, _iter_xlsx) ва қубури StudentImport дар он ҳамин аст, фарқ танҳо
+дар сутунҳо ва моделҳост. Нусхабардорӣ қасдан аст: ҳарду барнома пакетҳои
+ҳамноми database ва api доранд ва аз решаҳои гуногун оғоз мешаванд, бинобар
+ин якдигарро ворид карда наметавонанд. Ислоҳи хондани файл ё навиштани
+қисмҳоро дар ҳарду файл кунед.
+"""
+import codecs
+import csv
+import multiprocessing
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from database.models import db, User, Student, Group
+from services.passwords import hash_many
+from services.principal import invalidate_principal
+from services.report_cache import invalidate_summaries
+from services.search import fold, student_index
+from services.stats import invalidate_statistics
+
+COLUMNS = ('email', 'password', 'first_name', 'last_name', 'middle_name', 'phone', 'address',
+           'student_id', 'group', 'admission_year', 'birth_date', 'passport_number')
+REQUIRED = ('email', 'password', 'first_name', 'last_name', 'student_id', 'group')
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+def iter_rows(stream, filename):
+    """Сатрҳои файл ҳамчун dict (рақами сатр, маълумот) - бе хондани пурраи файл"""
+    if filename.lower().endswith('.xlsx'):
+        yield from _iter_xlsx(stream)
+    else:
+        yield from _iter_csv(stream)
+
+
+def _iter_csv(stream):
+    # codecs reader сатрҳоро аз stream-и бинарӣ қисм-қисм мехонад
+    reader = csv.DictReader(codecs.getreader('utf-8-sig')(stream))
+    for line_no, row in enumerate(reader, start=2):
+        yield line_no, {key.strip().lower(): (value or '').strip()
+                        for key, value in row.items() if key}
+
+
+def _iter_xlsx(stream):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError('Барои файлҳои XLSX бастаи openpyxl лозим аст')
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell or '').strip().lower() for cell in next(rows, ())]
+        for line_no, values in enumerate(rows, start=2):
+            if not any(values):
+                continue
+            yield line_no, {key: _cell(value) for key, value in zip(header, values) if key}
+    finally:
+        workbook.close()
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+class StudentImport:
+    """Воридоти оммавии донишҷӯён аз CSV/XLSX
+
+    Сатрҳо ҳангоми хондан санҷида мешаванд ва қисм-қисм (IMPORT_CHUNK_SIZE)
+    навишта мешаванд: паролҳо дар ProcessPool hash мешаванд, users ва
+    students бо як INSERT-и бисёрсатра барои ҳар қисм. Дар ҳолати dry_run
+    ҳамаи санҷишҳо иҷро мешаванд, вале ба пойгоҳ чизе навишта намешавад.
+    """
+
+    def __init__(self, dry_run=False, chunk_size=None, processes=None, method=None):
+        config = current_app.config
+        self.dry_run = dry_run
+        self.chunk_size = chunk_size or config['IMPORT_CHUNK_SIZE']
+        self.processes = processes or config['IMPORT_HASH_PROCESSES']
+        self.method = method or config['IMPORT_PASSWORD_HASH_METHOD']
+        self.total = 0
+        self.imported = 0
+        self.errors = []
+        self._groups = self._load_groups()
+        self._emails = set()
+        self._student_ids = set()
+
+    def report(self):
+        return {
+            'dry_run': self.dry_run,
+            'total': self.total,
+            'imported': 0 if self.dry_run else self.imported,
+            'valid': self.total - len(self.errors),
+            'errors': sorted(self.errors, key=lambda error: error['row'])
+        }
+
+    def run(self, rows):
+        pool = None
+        if not self.dry_run:
+            pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context('spawn'))
+        # Ҳангоми навиштани як қисм паролҳои қисми баъдӣ hash мешаванд
+        pending = deque()
+        try:
+            chunk = []
+            for line_no, row in rows:
+                self.total += 1
+                record = self._validate(line_no, row)
+                if record is None:
+                    continue
+                chunk.append(record)
+                if len(chunk) >= self.chunk_size:
+                    pending.append(self._prepare(chunk, pool))
+                    chunk = []
+                    if len(pending) > 1:
+                        self._write(*pending.popleft())
+            if chunk:
+                pending.append(self._prepare(chunk, pool))
+            while pending:
+                self._write(*pending.popleft())
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        return self.report()
+
+    def _load_groups(self):
+        groups = {}
+        for group_id, name in db.session.query(Group.id, Group.name):
+            groups[str(group_id)] = group_id
+            groups[fold(name)] = group_id
+        return groups
+
+    def _error(self, line_no, messages):
+        self.errors.append({'row': line_no, 'errors': messages})
+
+    def _validate(self, line_no, row):
+        record = {column: row.get(column, '') for column in COLUMNS}
+        if not record['group'] and row.get('group_id'):
+            record['group'] = row['group_id']
+
+        messages = [f'Майдони "{column}" холӣ аст' for column in REQUIRED if not record[column]]
+        email = record['email'].lower()
+        record['email'] = email
+        if email and not EMAIL_RE.match(email):
+            messages.append('Почтаи электронӣ нодуруст аст')
+        elif email in self._emails:
+            messages.append('Почтаи электронӣ дар файл такрор шудааст')
+        if record['student_id'] in self._student_ids:
+            messages.append('Рақами донишҷӯ дар файл такрор шудааст')
+
+        if record['group']:
+            record['group_id'] = self._groups.get(fold(record['group']))
+            if record['group_id'] is None:
+                messages.append(f'Гуруҳи "{record["group"]}" ёфт нашуд')
+
+        try:
+            record['admission_year'] = int(record['admission_year']) if record['admission_year'] else None
+        except ValueError:
+            messages.append('Соли дохилшавӣ бояд рақам бошад')
+        try:
+            record['birth_date'] = datetime.strptime(record['birth_date'], '%Y-%m-%d').date() \
+                if record['birth_date'] else None
+        except ValueError:
+            messages.append('Санаи таваллуд бояд дар шакли YYYY-MM-DD бошад')
+
+        if messages:
+            self._error(line_no, messages)
+            return None
+        self._emails.add(email)
+        self._student_ids.add(record['student_id'])
+        record['line_no'] = line_no
+        return record
+
+    def _prepare(self, chunk, pool):
+        chunk = self._exclude_existing(chunk)
+        if pool is None or not chunk:
+            return chunk, None
+        # Як супориш барои ҳар процесс, на барои ҳар парол
+        passwords = [record.pop('password') for record in chunk]
+        step = -(-len(passwords) // self.processes)
+        futures = [pool.submit(hash_many, passwords[i:i + step], self.method)
+                   for i in range(0, len(passwords), step)]
+        return chunk, futures
+
+    def _exclude_existing(self, chunk):
+        """Сатрҳое, ки email ё рақами донишҷӯяшон аллакай дар пойгоҳ ҳаст"""
+        emails = {email for (email,) in db.session.query(User.email)
+                  .filter(User.email.in_([r['email'] for r in chunk]))}
+        student_ids = {sid for (sid,) in db.session.query(Student.student_id)
+                       .filter(Student.student_id.in_([r['student_id'] for r in chunk]))}
+        fresh = []
+        for record in chunk:
+            messages = []
+            if record['email'] in emails:
+                messages.append('Корбар бо ин почтаи электронӣ аллакай вуҷуд дорад')
+            if record['student_id'] in student_ids:
+                messages.append('Донишҷӯ бо ин рақам аллакай вуҷуд дорад')
+            if messages:
+                self._error(record['line_no'], messages)
+            else:
+                fresh.append(record)
+        return fresh
+
+    def _write(self, chunk, futures):
+        if futures is None:
+            return
+        hashes = [password_hash for future in futures for password_hash in future.result()]
+        for record, password_hash in zip(chunk, hashes):
+            record['password_hash'] = password_hash
+        try:
+            inserted = self._insert(chunk)
+            db.session.commit()
+            self._index(inserted)
+        except IntegrityError:
+            # Сабти ҳамзамон аз ҷои дигар: сатрҳоро алоҳида месанҷем
+            db.session.rollback()
+            for record in chunk:
+                try:
+                    inserted = self._insert([record])
+                    db.session.commit()
+                    self._index(inserted)
+                except IntegrityError as e:
+                    db.session.rollback()
+                    self._error(record['line_no'], [f'Хатои пойгоҳ: {e.orig}'])
+
+    def _insert(self, chunk):
+        user_rows = [{
+            'email': r['email'],
+            'password_hash': r['password_hash'],
+            'first_name': r['first_name'],
+            'last_name': r['last_name'],
+            'middle_name': r['middle_name'] or None,
+            'phone': r['phone'] or None,
+            'address': r['address'] or None,
+            'role': 'student',
+        } for r in chunk]
+        user_ids = dict(db.session.execute(
+            User.__table__.insert().returning(User.email, User.id), user_rows
+        ).all())
+
+        student_rows = [{
+            'user_id': user_ids[r['email']],
+            'student_id': r['student_id'],
+            'group_id': r['group_id'],
+            'admission_year': r['admission_year'],
+            'birth_date': r['birth_date'],
+            'passport_number': r['passport_number'] or None,
+            'search_key': fold(f'{r["last_name"]} {r["first_name"]} {r["middle_name"]} {r["student_id"]}'),
+        } for r in chunk]
+        inserted = db.session.execute(
+            Student.__table__.insert().returning(Student.id, Student.student_id,
+                                                 Student.group_id, Student.search_key),
+            student_rows
+        ).all()
+        self.imported += len(inserted)
+        invalidate_summaries({group_id for _, _, group_id, _ in inserted})
+        return inserted
+
+    def _index(self, inserted):
+        # INSERT-и Core event-ҳои ORM-ро иҷро намекунад - индексро худамон нав мекунем
+        if student_index.loaded_at is None:
+            return
+        for pk, student_id, group_id, key in inserted:
+            student_index.update(pk, student_id, group_id, key)
+
+    def finish(self):
+        if not self.dry_run and self.imported:
+            invalidate_statistics('students')
+            invalidate_principal()
+
+
+def import_students(stream, filename, dry_run=False, **options):
+    importer = StudentImport(dry_run=dry_run, **options)
+    importer.run(iter_rows(stream, filename))
+    importer.finish()
+    return importer.report()
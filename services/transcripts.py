@@ -0,0 +1,198 @@
+import numpy as np
+from flask import current_app
+
+from database.loading import load_profile
+from database.models import db, Student, Group, Course, Grade
+from services import grading
+from services.grading import calculate_final_grade
+from services.rollups import attendance_counts
+
+
+def load_students(student_ids=None, group_id=None, course_number=None):
+    """Донишҷӯён бо профили корбар дар як дархост"""
+    query = Student.query.options(*load_profile('roster'))
+    if student_ids is not None:
+        query = query.filter(Student.id.in_(student_ids))
+    if group_id is not None:
+        query = query.filter(Student.group_id == group_id, Student.status == 'active')
+    if course_number is not None:
+        query = query.join(Group, Group.id == Student.group_id).filter(
+            Group.course_number == course_number,
+            Student.status == 'active'
+        )
+    return query.order_by(Student.id).all()
+
+
+def fetch_course_data(students):
+    """Дарсҳо, ҳузур ва баҳоҳои донишҷӯён бо се дархост
+
+    Бармегардонад (courses_by_group, attendance, grades), ки дар онҳо
+    attendance[(student_id, course_id)] = (ҳозир, ҳамагӣ) ва
+    grades[(student_id, course_id)] = {grade_type: score}.
+    """
+    group_ids = {s.group_id for s in students if s.group_id}
+    if not group_ids:
+        return {}, {}, {}
+
+    courses = Course.query.options(*load_profile('transcript')).filter(
+        Course.group_id.in_(group_ids),
+        Course.is_active == True
+    ).order_by(Course.id).all()
+
+    courses_by_group = {}
+    for course in courses:
+        courses_by_group.setdefault(course.group_id, []).append(course)
+
+    student_ids = [s.id for s in students]
+    course_ids = [c.id for c in courses]
+
+    attendance = {}
+    grades = {}
+    if not course_ids:
+        return courses_by_group, attendance, grades
+
+    counts = attendance_counts(student_ids=student_ids, course_ids=course_ids, by_course=True)
+    attendance_rows = db.session.query(counts.c.student_id, counts.c.course_id, counts.c.total, counts.c.present)
+
+    for student_id, course_id, total, present in attendance_rows:
+        attendance[(student_id, course_id)] = (present, total)
+
+    grade_rows = db.session.query(
+        Grade.student_id, Grade.course_id, Grade.grade_type, Grade.score
+    ).filter(
+        Grade.student_id.in_(student_ids),
+        Grade.course_id.in_(course_ids),
+        Grade.score.isnot(None)
+    ).order_by(Grade.id)
+
+    for student_id, course_id, grade_type, score in grade_rows:
+        grades.setdefault((student_id, course_id), {})[grade_type] = float(score)
+
+    return courses_by_group, attendance, grades
+
+
+def build_transcripts(students):
+    """Транскрипти якчанд донишҷӯ бо шумораи собити дархостҳо
+
+    Новобаста аз шумораи донишҷӯён ва фанҳо: дарсҳо бо фанҳо (1),
+    ҳисоби ҳузур (1) ва баҳоҳо (1). Натиҷа - {student.id: transcript_data}.
+    """
+    students = list(students)
+    courses_by_group, attendance, grades = fetch_course_data(students)
+
+    return {
+        s.id: _transcript(s, courses_by_group.get(s.group_id, []), attendance, grades)
+        for s in students
+    }
+
+
+def rank_cohort(students):
+    """Баҳои ниҳоӣ, GPA ва ҷойи донишҷӯён дар курс/гуруҳ (векторӣ)
+
+    Натиҷа бо build_transcripts мувофиқ аст: ҷуфтҳои донишҷӯ×дарс бо ҳамон
+    тартиб ба массивҳо ҷамъ мешаванд ва ба grading.final_grades дода мешаванд.
+    """
+    students = list(students)
+    courses_by_group, attendance, grades = fetch_course_data(students)
+
+    columns = {name: [] for name in ('attendance', 'activity', 'midterm_1', 'midterm_2', 'final')}
+    student_index = []
+    credits = []
+
+    for index, student in enumerate(students):
+        for course in courses_by_group.get(student.group_id, []):
+            present, total = attendance.get((student.id, course.id), (0, 0))
+            course_grades = grades.get((student.id, course.id), {})
+
+            student_index.append(index)
+            credits.append((course.subject.credits if course.subject else None) or 0)
+            columns['attendance'].append((present / total * 100) if total > 0 else 0)
+            for grade_type in Grade.GRADE_TYPES:
+                columns[grade_type].append(course_grades.get(grade_type, np.nan))
+
+    final = grading.final_grades(
+        np.array(columns['attendance'], dtype=float),
+        np.array(columns['activity'], dtype=float),
+        np.array(columns['midterm_1'], dtype=float),
+        np.array(columns['midterm_2'], dtype=float),
+        np.array(columns['final'], dtype=float),
+        current_app.config['GRADE_SYSTEM']
+    )
+    gpa, total_credits = grading.credit_weighted_gpa(
+        np.array(student_index, dtype=np.intp),
+        final,
+        np.array(credits, dtype=np.int64),
+        len(students)
+    )
+    rank = grading.competition_rank(gpa)
+
+    return [{
+        'id': student.id,
+        'student_id': student.student_id,
+        'full_name': student.user.full_name if student.user else '',
+        'group_id': student.group_id,
+        'total_credits': int(total_credits[index]),
+        'total_gpa': round(float(gpa[index]), 2),
+        'rank': int(rank[index])
+    } for index, student in sorted(enumerate(students), key=lambda item: rank[item[0]])]
+
+
+def _transcript(student, courses, attendance, grades):
+    config = current_app.config['GRADE_SYSTEM']
+
+    transcript_data = {
+        'student': student,
+        'courses': [],
+        'total_credits': 0,
+        'total_gpa': 0
+    }
+
+    total_points = 0
+    total_credits = 0
+
+    for course in courses:
+        present, total = attendance.get((student.id, course.id), (0, 0))
+        attendance_percentage = (present / total * 100) if total > 0 else 0
+
+        course_grades = grades.get((student.id, course.id), {})
+        final_grade = calculate_final_grade(attendance_percentage, course_grades, config)
+
+        transcript_data['courses'].append({
+            'course': course,
+            'attendance_percentage': attendance_percentage,
+            'grades': course_grades,
+            'final_grade': final_grade
+        })
+
+        credits = course.subject.credits if course.subject else None
+        if final_grade and credits:
+            total_points += final_grade * credits
+            total_credits += credits
+
+    transcript_data['total_credits'] = total_credits
+    transcript_data['total_gpa'] = (total_points / total_credits) if total_credits > 0 else 0
+
+    return transcript_data
+
+
+def transcript_to_json(transcript_data):
+    """Шакли JSON-и транскрипт барои ҷадвали reports"""
+    student = transcript_data['student']
+    return {
+        'student_id': student.student_id,
+        'full_name': student.user.full_name if student.user else '',
+        'group_id': student.group_id,
+        'courses': [{
+            'course_id': item['course'].id,
+            'subject': item['course'].subject.name if item['course'].subject else '',
+            'code': item['course'].subject.code if item['course'].subject else '',
+            'credits': item['course'].subject.credits if item['course'].subject else None,
+            'semester': item['course'].semester,
+            'academic_year': item['course'].academic_year,
+            'attendance_percentage': round(item['attendance_percentage'], 2),
+            'grades': item['grades'],
+            'final_grade': round(item['final_grade'], 2)
+        } for item in transcript_data['courses']],
+        'total_credits': transcript_data['total_credits'],
+        'total_gpa': round(transcript_data['total_gpa'], 2)
+    }